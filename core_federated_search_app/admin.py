@@ -13,6 +13,7 @@ from oauth2_provider.models import (
 
 from core_federated_search_app.components.instance.models import Instance
 from core_federated_search_app.utils.model_admin import (
+    InstanceAdmin,
     OAuth2ApplicationAdmin,
     ReadOnlyModelAdmin,
 )
@@ -38,6 +39,11 @@ admin_urls = [
         staff_member_required(admin_ajax.EditRepositoryView.as_view()),
         name="core_federated_search_app_repositories_edit",
     ),
+    re_path(
+        r"^repositories/refresh_all",
+        admin_ajax.refresh_repositories,
+        name="core_federated_search_app_repositories_refresh_all",
+    ),
     re_path(
         r"^repositories/refresh",
         admin_ajax.refresh_repository,
@@ -50,7 +56,7 @@ admin_urls = [
     ),
 ]
 
-admin.site.register(Instance)
+admin.site.register(Instance, InstanceAdmin)
 
 # Remove unused django-oauth-toolkit models.
 admin.site.unregister(get_id_token_model())
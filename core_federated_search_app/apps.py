@@ -1,5 +1,7 @@
 """Apps file for setting core package when app is ready."""
 
+import sys
+
 from django.apps import AppConfig
 
 
@@ -8,3 +10,15 @@ class CoreFederatedSearchAppConfig(AppConfig):
 
     name = "core_federated_search_app"
     verbose_name = "Core Federated Search App"
+
+    def ready(self):
+        """Run once at startup"""
+        from core_federated_search_app import checks  # noqa: F401
+        from core_federated_search_app.components.instance import signals
+
+        signals.connect()
+
+        if "migrate" not in sys.argv:
+            from core_federated_search_app import discover
+
+            discover.init_periodic_tasks()
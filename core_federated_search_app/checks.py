@@ -0,0 +1,40 @@
+"""System checks of the federated search app"""
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# cache backends not shared between the processes of a deployment
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """Check that the default cache is shared between processes.
+
+    The instance registry version is stored in the default cache: with a
+    cache local to each process, instance changes made by a process are not
+    seen by the others until they restart.
+
+    Args:
+        app_configs:
+        **kwargs:
+
+    Returns:
+        list of warnings
+
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            "The default cache is not shared between processes.",
+            hint="The instance registry relies on a shared default cache "
+            "(e.g. Redis or Memcached) to propagate instance changes to "
+            "all the processes.",
+            id="core_federated_search_app.W001",
+        )
+    ]
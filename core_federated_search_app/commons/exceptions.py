@@ -8,3 +8,14 @@ class ExploreFederatedSearchAjaxError(Exception):
 
     def __init__(self, message):
         self.message = message
+
+
+class InstanceUnavailableError(Exception):
+    """
+    Exception raised when a request is not sent to a remote instance whose
+    circuit is open.
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
@@ -1,17 +1,56 @@
 """Instance api"""
 
-import json
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
-from core_explore_common_app.utils.protocols.oauth2 import (
-    post_request_token,
+import requests
+from django.db import connection, transaction
+
+from core_federated_search_app.commons.exceptions import (
+    InstanceUnavailableError,
+)
+from core_federated_search_app.components.instance.circuit_breaker import (
+    circuit_breakers,
+)
+from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.components.instance.registry import (
+    instance_registry,
+)
+from core_federated_search_app.components.instance.remote import (
     post_refresh_token,
+    post_request_token,
     send_get_request as send_get_request_with_token,
+    send_head_request as send_head_request_with_token,
 )
-from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.components.instance.token_store import (
+    TokenGrant,
+    get_token_store,
+)
+from core_federated_search_app.settings import (
+    INSTANCE_TOKEN_EXPIRY_MARGIN,
+    INSTANCE_TOKEN_REFRESH_JITTER,
+    INSTANCE_TOKEN_REFRESH_MAX_WORKERS,
+    INSTANCE_TOKEN_REFRESH_TIMEOUT,
+    INSTANCE_TOKEN_REFRESH_WINDOW,
+    NEGATIVE_CACHE_MAX_ENTRIES,
+    NEGATIVE_CACHE_TTL,
+)
+from core_federated_search_app.utils.negative_cache import NegativeCache
+from core_federated_search_app.utils.single_flight import SingleFlight
 from core_main_app.commons.exceptions import ApiError
 from core_main_app.utils.datetime import datetime_now, datetime_timedelta
 
+logger = logging.getLogger(__name__)
+
+# token refreshes in flight in this process, by instance id
+_token_refresh_flights = SingleFlight()
+
+# remote urls answered with 404, by instance id and url
+_missing_blobs = NegativeCache(NEGATIVE_CACHE_MAX_ENTRIES, NEGATIVE_CACHE_TTL)
+
 
 def get_all():
     """List all instance.
@@ -22,6 +61,16 @@ def get_all():
     return Instance.get_all()
 
 
+def get_all_registered():
+    """List all instances from the in-memory registry snapshot, without
+    querying the database.
+
+    Returns: list of instances
+
+    """
+    return instance_registry.get_all()
+
+
 def get_by_id(instance_id):
     """Return instance object with the given id.
 
@@ -31,7 +80,7 @@ def get_by_id(instance_id):
     Returns: instance object
 
     """
-    return Instance.get_by_id(instance_id)
+    return instance_registry.get_by_id(instance_id)
 
 
 def get_by_name(instance_name):
@@ -43,7 +92,44 @@ def get_by_name(instance_name):
     Returns: instance object
 
     """
-    return Instance.get_by_name(instance_name)
+    return instance_registry.get_by_name(instance_name)
+
+
+def get_by_ids(instance_ids):
+    """Return the instances with the given ids.
+
+    Args:
+        instance_ids:
+
+    Returns: dict of instances keyed by id, list of ids not found
+
+    """
+    return instance_registry.get_by_ids(instance_ids)
+
+
+def get_by_names(instance_names):
+    """Return the instances with the given names.
+
+    Args:
+        instance_names:
+
+    Returns: dict of instances keyed by name, list of names not found
+
+    """
+    return instance_registry.get_by_names(instance_names)
+
+
+def get_by_endpoints(instance_endpoints):
+    """Return the instances with the given endpoints.
+
+    Args:
+        instance_endpoints:
+
+    Returns: dict of instances keyed by normalized endpoint, list of
+        endpoints not found
+
+    """
+    return instance_registry.get_by_endpoints(instance_endpoints)
 
 
 def get_by_endpoint_starting_with(instance_endpoint):
@@ -55,7 +141,20 @@ def get_by_endpoint_starting_with(instance_endpoint):
     Returns: instance object
 
     """
-    return Instance.get_by_endpoint_starting_with(instance_endpoint)
+    return instance_registry.get_by_endpoint_starting_with(instance_endpoint)
+
+
+def get_by_url(url):
+    """Return the instance owning the given url, using a longest-prefix match
+    on the normalized endpoints.
+
+    Args:
+        url:
+
+    Returns: instance object
+
+    """
+    return instance_registry.get_by_url(url)
 
 
 def delete(instance):
@@ -119,7 +218,13 @@ def add_instance(
     # Request the remote
     if is_private_repo:
         response = post_request_token(
-            endpoint_url, client_id, client_secret, timeout, username, password
+            endpoint_url,
+            client_id,
+            client_secret,
+            timeout,
+            username,
+            password,
+            instance_name=name,
         )
 
         if response.status_code != 200:
@@ -131,6 +236,9 @@ def add_instance(
         instance = _create_instance_object_from_request_response(
             name, endpoint_url, response.content
         )
+        # keep the client credentials to refresh the token unattended
+        instance.client_id = client_id
+        instance.client_secret = client_secret
     else:
         instance = Instance(name=name, endpoint=endpoint_url)
 
@@ -139,9 +247,37 @@ def add_instance(
     return instance
 
 
-def refresh_instance_token(instance, client_id, client_secret, timeout):
+def refresh_instance_token(
+    instance, client_id=None, client_secret=None, timeout=None
+):
     """Refresh the instance token.
 
+    The client credentials stored with the instance are used when none are
+    given. Credentials given explicitly are stored once the refresh succeeds.
+
+    Args:
+        instance:
+        client_id:
+        client_secret:
+        timeout:
+
+    Returns:
+
+    """
+    # concurrent callers in this process share the refresh in flight
+    return _token_refresh_flights.do(
+        instance.pk,
+        _refresh_instance_token,
+        instance,
+        client_id,
+        client_secret,
+        timeout,
+    )
+
+
+def _refresh_instance_token(instance, client_id, client_secret, timeout):
+    """Refresh the instance token while holding a lock on its row.
+
     Args:
         instance:
         client_id:
@@ -151,13 +287,61 @@ def refresh_instance_token(instance, client_id, client_secret, timeout):
     Returns:
 
     """
+    token_store = get_token_store()
+    with transaction.atomic():
+        locked_instance = Instance.get_by_id_for_update(instance.pk)
+        if (
+            locked_instance.refresh_token
+            != token_store.get(instance).refresh_token
+        ):
+            # another worker refreshed the token while we waited for the lock
+            token_store.set(
+                locked_instance, TokenGrant.from_instance(locked_instance)
+            )
+            return locked_instance
+        return _request_instance_token_refresh(
+            locked_instance, client_id, client_secret, timeout
+        )
+
+
+def _request_instance_token_refresh(
+    instance, client_id, client_secret, timeout
+):
+    """Request a new token from the remote and save it.
+
+    Args:
+        instance:
+        client_id:
+        client_secret:
+        timeout:
+
+    Returns:
+
+    """
+    if client_id is None and client_secret is None:
+        client_id = instance.client_id
+        client_secret = instance.client_secret
+    if not client_id or not client_secret:
+        raise ApiError(
+            "No client credentials are available to refresh the token."
+        )
+    if timeout is None:
+        timeout = INSTANCE_TOKEN_REFRESH_TIMEOUT
+
+    circuit_breaker = circuit_breakers.get(instance)
+    if circuit_breaker.is_open():
+        raise _get_unavailable_error(instance)
+
     # Request the remote
-    response = post_refresh_token(
+    response = _send_through_circuit_breaker(
+        circuit_breaker,
+        post_refresh_token,
         instance.endpoint,
         client_id,
         client_secret,
         timeout,
         instance.refresh_token,
+        instance_name=instance.name,
     )
 
     if response.status_code != 200:
@@ -165,33 +349,407 @@ def refresh_instance_token(instance, client_id, client_secret, timeout):
             "Unable to get access to the remote instance using these parameters."
         )
 
-    # create the instance from a request
-    instance = _update_instance_object_from_request_response(
-        instance, response.content
+    # store the new token
+    get_token_store().set(
+        instance, TokenGrant.from_response_content(response.content)
     )
-
-    # upsert the instance
-    upsert(instance)
+    # keep the credentials used, if they changed
+    if (client_id, client_secret) != (
+        instance.client_id,
+        instance.client_secret,
+    ):
+        instance.client_id = client_id
+        instance.client_secret = client_secret
+        instance.save(update_fields=["client_id", "client_secret"])
     return instance
 
 
-def get_blob_response_from_url(url_base, url):
+def get_instances_with_expiring_token(window=None):
+    """Return the instances whose token can be refreshed unattended and
+    expires within the given window.
+
+    Args:
+        window: number of seconds, INSTANCE_TOKEN_REFRESH_WINDOW by default
+
+    Returns:
+
+    """
+    if window is None:
+        window = INSTANCE_TOKEN_REFRESH_WINDOW
+    token_store = get_token_store()
+    expiring_instances = []
+    for instance in get_all():
+        grant = token_store.get(instance)
+        if _can_refresh_token(instance, grant) and (
+            grant.expires is None or grant.is_expiring(int(window))
+        ):
+            expiring_instances.append(instance)
+    return expiring_instances
+
+
+def refresh_expiring_tokens(
+    window=None, max_workers=None, jitter=None, timeout=None
+):
+    """Refresh, concurrently, the tokens expiring within the given window.
+
+    Args:
+        window: number of seconds, INSTANCE_TOKEN_REFRESH_WINDOW by default
+        max_workers: INSTANCE_TOKEN_REFRESH_MAX_WORKERS by default
+        jitter: INSTANCE_TOKEN_REFRESH_JITTER by default
+        timeout: INSTANCE_TOKEN_REFRESH_TIMEOUT by default
+
+    Returns:
+        list of refresh results
+
+    """
+    return _refresh_instance_tokens(
+        get_instances_with_expiring_token(window),
+        max_workers=(
+            INSTANCE_TOKEN_REFRESH_MAX_WORKERS
+            if max_workers is None
+            else max_workers
+        ),
+        jitter=INSTANCE_TOKEN_REFRESH_JITTER if jitter is None else jitter,
+        timeout=timeout,
+    )
+
+
+def refresh_all_tokens(instances=None, max_workers=None, timeout=None):
+    """Refresh, concurrently, the tokens of the given instances.
+
+    The total time is bounded by the slowest remote instance rather than by
+    the sum of their response times.
+
+    Args:
+        instances: instances to refresh, all the instances whose token can be
+            refreshed unattended by default
+        max_workers: INSTANCE_TOKEN_REFRESH_MAX_WORKERS by default
+        timeout: timeout of each refresh request,
+            INSTANCE_TOKEN_REFRESH_TIMEOUT by default
+
+    Returns:
+        list of refresh results
+
+    """
+    if instances is None:
+        token_store = get_token_store()
+        instances = [
+            instance
+            for instance in get_all()
+            if _can_refresh_token(instance, token_store.get(instance))
+        ]
+    return _refresh_instance_tokens(
+        instances,
+        max_workers=(
+            INSTANCE_TOKEN_REFRESH_MAX_WORKERS
+            if max_workers is None
+            else max_workers
+        ),
+        timeout=timeout,
+    )
+
+
+def _refresh_instance_tokens(instances, max_workers, jitter=0, timeout=None):
+    """Refresh the tokens of the instances on a bounded pool of threads.
+
+    Args:
+        instances:
+        max_workers: maximum number of concurrent refreshes
+        jitter: maximum random delay (in seconds) before each refresh
+        timeout:
+
+    Returns:
+        list of refresh results, one per instance:
+        {"id": ..., "name": ..., "status": "success"|"error", "message": ...}
+
+    """
+    if not instances:
+        return []
+
+    def _refresh(instance):
+        if jitter:
+            time.sleep(random.uniform(0, jitter))
+        try:
+            refresh_instance_token(instance, timeout=timeout)
+            return _get_refresh_result(instance, "success")
+        except Exception as exception:
+            logger.error(
+                "Unable to refresh the token of %s: %s",
+                instance.name,
+                str(exception),
+            )
+            return _get_refresh_result(instance, "error", str(exception))
+        finally:
+            # connections are opened per thread
+            connection.close()
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(int(max_workers), len(instances)))
+    ) as executor:
+        return list(executor.map(_refresh, instances))
+
+
+def _get_refresh_result(instance, refresh_status, message=""):
+    """Build the result of a token refresh.
+
+    Args:
+        instance:
+        refresh_status:
+        message:
+
+    Returns:
+
+    """
+    return {
+        "id": instance.pk,
+        "name": instance.name,
+        "status": refresh_status,
+        "message": message,
+    }
+
+
+def get_blob_response_from_url(url_base, url, stream=False, headers=None):
     """Get the blob response from an url
 
     Args:
-        url_base: {uri.scheme}://{uri.netloc}
+        url_base: {uri.scheme}://{uri.netloc}, kept for compatibility
         url: full URL
+        stream: if True, the content is not downloaded until it is read, and
+            the caller must close the response
+        headers: additional request headers (e.g. conditional headers)
+
+    Returns:
+
+    """
+    return _send_blob_request(
+        send_get_request_with_token, url, stream=stream, headers=headers
+    )
+
+
+def get_blob_head_response_from_url(url, headers=None):
+    """Get the headers of the blob at an url, without its content
+
+    Args:
+        url: full URL
+        headers: additional request headers
+
+    Returns:
+
+    """
+    return _send_blob_request(
+        send_head_request_with_token, url, headers=headers
+    )
+
+
+def send_get_request_to_instance(instance, url, **kwargs):
+    """Send a GET request to an instance with its token, refreshing the token
+    if needed.
+
+    Args:
+        instance:
+        url: full URL, on the instance
+        **kwargs: passed to `requests` (params, headers, timeout...)
 
     Returns:
 
     """
-    # get instance from endpoint
-    instance = get_by_endpoint_starting_with(url_base)
-    if instance.endpoint in url:
-        # here we are sure that our given url is one of our known instances
-        return send_get_request_with_token(
-            url=url, access_token=instance.access_token
+    return _send_instance_request(
+        send_get_request_with_token, instance, url, **kwargs
+    )
+
+
+def _send_blob_request(send_request, url, **kwargs):
+    """Send a request for a blob with the token of the instance owning its
+    url.
+
+    Blobs the remote recently answered 404 for are not requested again.
+
+    Args:
+        send_request: function sending the request with a token
+        url: full URL
+        **kwargs: passed to the send function
+
+    Returns:
+
+    """
+    # get the instance owning the url
+    instance = get_by_url(url)
+
+    # the remote recently answered 404 for this url
+    registry_version = instance_registry.get_snapshot().version
+    if _missing_blobs.get((instance.pk, url), registry_version):
+        return _get_not_found_response(url)
+
+    response = _send_instance_request(send_request, instance, url, **kwargs)
+    if response.status_code == 404:
+        _missing_blobs.add((instance.pk, url), registry_version)
+    return response
+
+
+def _send_instance_request(send_request, instance, url, **kwargs):
+    """Send a request with the token of an instance, refreshing the token if
+    needed.
+
+    Args:
+        send_request: function sending the request with a token
+        instance:
+        url: full URL
+        **kwargs: passed to the send function
+
+    Returns:
+
+    """
+    # the remote is failing: do not wait for its timeout
+    circuit_breaker = circuit_breakers.get(instance)
+    if not circuit_breaker.allow_request():
+        raise _get_unavailable_error(instance)
+
+    grant = get_token_store().get(instance)
+    # refresh the token beforehand if it is about to expire
+    if _can_refresh_token(instance, grant) and grant.is_expiring(
+        INSTANCE_TOKEN_EXPIRY_MARGIN
+    ):
+        grant = _try_refresh_instance_token(instance, grant)
+
+    response = _send_through_circuit_breaker(
+        circuit_breaker,
+        send_request,
+        url=url,
+        access_token=grant.access_token,
+        instance_name=instance.name,
+        **kwargs,
+    )
+
+    # the token may have been revoked or expired in the meantime: refresh it
+    # and retry once
+    if response.status_code == 401 and _can_refresh_token(instance, grant):
+        refreshed_grant = _try_refresh_instance_token(instance, grant)
+        if refreshed_grant.access_token != grant.access_token:
+            response.close()
+            response = _send_through_circuit_breaker(
+                circuit_breaker,
+                send_request,
+                url=url,
+                access_token=refreshed_grant.access_token,
+                instance_name=instance.name,
+                **kwargs,
+            )
+
+    return response
+
+
+def get_circuit_state(instance):
+    """Return the circuit state of an instance, in this process.
+
+    Args:
+        instance:
+
+    Returns:
+        "closed", "open" or "half-open"
+
+    """
+    return circuit_breakers.get_state(instance)
+
+
+def _send_through_circuit_breaker(
+    circuit_breaker, send_request, *args, **kwargs
+):
+    """Send a request to an instance, recording its outcome in the circuit
+    breaker of the instance.
+
+    Connection errors, timeouts and 5xx responses are failures.
+
+    Args:
+        circuit_breaker:
+        send_request: function sending the request
+        *args: passed to the send function
+        **kwargs: passed to the send function
+
+    Returns:
+
+    """
+    try:
+        response = send_request(*args, **kwargs)
+    except requests.RequestException:
+        circuit_breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        circuit_breaker.record_failure()
+    else:
+        circuit_breaker.record_success()
+    return response
+
+
+def _get_unavailable_error(instance):
+    """Return the error raised instead of requesting an instance whose
+    circuit is open.
+
+    Args:
+        instance:
+
+    Returns:
+        InstanceUnavailableError
+
+    """
+    return InstanceUnavailableError(
+        f"The instance {instance.name} is unavailable, retry later."
+    )
+
+
+def _get_not_found_response(url):
+    """Return a 404 response, as sent by a remote instance, without content.
+
+    Args:
+        url:
+
+    Returns:
+        requests.Response
+
+    """
+    response = requests.Response()
+    response.status_code = 404
+    response.reason = "Not Found"
+    response.url = url
+    response._content = b""
+    response._content_consumed = True
+    return response
+
+
+def _can_refresh_token(instance, grant):
+    """Check if the token of the instance can be refreshed unattended.
+
+    Args:
+        instance:
+        grant:
+
+    Returns:
+
+    """
+    return bool(
+        grant.refresh_token and instance.client_id and instance.client_secret
+    )
+
+
+def _try_refresh_instance_token(instance, grant):
+    """Refresh the instance token, keeping the current one on failure.
+
+    Args:
+        instance:
+        grant: current token grant
+
+    Returns:
+        refreshed token grant, or the given grant if the refresh failed
+
+    """
+    try:
+        return TokenGrant.from_instance(refresh_instance_token(instance))
+    except Exception as exception:
+        logger.warning(
+            "Unable to refresh the token of %s: %s",
+            instance.name,
+            str(exception),
         )
+        return grant
 
 
 def _create_instance_object_from_request_response(name, endpoint, content):
@@ -205,18 +763,10 @@ def _create_instance_object_from_request_response(name, endpoint, content):
     Returns:
 
     """
-    # Calculate the expiration date
-    now = datetime_now()
-    delta = datetime_timedelta(seconds=int(json.loads(content)["expires_in"]))
-    expires = now + delta
     # Create an instance with the response given by the remote server
-    return Instance(
-        name=name,
-        endpoint=endpoint,
-        access_token=json.loads(content)["access_token"],
-        refresh_token=json.loads(content)["refresh_token"],
-        expires=expires,
-    )
+    instance = Instance(name=name, endpoint=endpoint)
+    TokenGrant.from_response_content(content).apply_to(instance)
+    return instance
 
 
 def _update_instance_object_from_request_response(instance, content):
@@ -229,14 +779,8 @@ def _update_instance_object_from_request_response(instance, content):
     Returns:
 
     """
-    # Calculate the expiration date
-    now = datetime_now()
-    delta = datetime_timedelta(seconds=int(json.loads(content)["expires_in"]))
-    expires = now + delta
     # Update an return the instance object
-    instance.access_token = json.loads(content)["access_token"]
-    instance.refresh_token = json.loads(content)["refresh_token"]
-    instance.expires = expires
+    TokenGrant.from_response_content(content).apply_to(instance)
     return instance
 
 
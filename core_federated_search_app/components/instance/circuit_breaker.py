@@ -0,0 +1,205 @@
+"""Circuit breakers of the remote instances
+
+Each instance has a circuit breaker recording the outcome of its recent
+requests. When too many of them fail, the circuit opens and the requests to
+the instance fail immediately instead of waiting for their timeout. After a
+cooldown, the circuit is half-open: a single trial request is let through,
+closing the circuit if it succeeds and opening it again if it fails. The
+circuits are kept in the memory of each process.
+"""
+
+import threading
+import time
+from collections import deque
+
+from core_federated_search_app.settings import (
+    CIRCUIT_BREAKER_COOLDOWN,
+    CIRCUIT_BREAKER_FAILURE_RATE,
+    CIRCUIT_BREAKER_MIN_REQUESTS,
+    CIRCUIT_BREAKER_WINDOW,
+)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Circuit breaker of an instance"""
+
+    def __init__(
+        self,
+        window=None,
+        min_requests=None,
+        failure_rate=None,
+        cooldown=None,
+    ):
+        """Initialize a closed circuit.
+
+        Args:
+            window: number of recent outcomes the failure rate is computed
+                on, CIRCUIT_BREAKER_WINDOW by default
+            min_requests: number of outcomes required to open the circuit,
+                CIRCUIT_BREAKER_MIN_REQUESTS by default
+            failure_rate: failure rate opening the circuit, between 0 and 1,
+                CIRCUIT_BREAKER_FAILURE_RATE by default
+            cooldown: number of seconds before an open circuit lets a trial
+                request through, CIRCUIT_BREAKER_COOLDOWN by default
+        """
+        self._lock = threading.Lock()
+        self._outcomes = deque(
+            maxlen=int(CIRCUIT_BREAKER_WINDOW if window is None else window)
+        )
+        self.min_requests = (
+            CIRCUIT_BREAKER_MIN_REQUESTS
+            if min_requests is None
+            else min_requests
+        )
+        self.failure_rate = (
+            CIRCUIT_BREAKER_FAILURE_RATE
+            if failure_rate is None
+            else failure_rate
+        )
+        self.cooldown = (
+            CIRCUIT_BREAKER_COOLDOWN if cooldown is None else cooldown
+        )
+        self.state = STATE_CLOSED
+        self._opened_at = None
+        self._trial_started_at = None
+
+    def allow_request(self):
+        """Check if a request may be sent, starting the trial request of an
+        open circuit whose cooldown is over.
+
+        A trial that never reported its outcome is replaced after a cooldown.
+
+        Returns:
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN:
+                if now - self._opened_at < self.cooldown:
+                    return False
+                self.state = STATE_HALF_OPEN
+            elif now - self._trial_started_at < self.cooldown:
+                # the trial request is in flight
+                return False
+            self._trial_started_at = now
+            return True
+
+    def is_open(self):
+        """Check if the circuit is open and still cooling down, without
+        starting a trial request.
+
+        Returns:
+
+        """
+        with self._lock:
+            return (
+                self.state == STATE_OPEN
+                and time.monotonic() - self._opened_at < self.cooldown
+            )
+
+    def record_success(self):
+        """Record a successful request.
+
+        A success closes a half-open circuit. Successes recorded while the
+        circuit is open, from requests sent before it opened, are ignored.
+
+        Returns:
+
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                self._outcomes.append(True)
+            elif self.state == STATE_HALF_OPEN:
+                self.state = STATE_CLOSED
+                self._trial_started_at = None
+                self._outcomes.clear()
+
+    def record_failure(self):
+        """Record a failed request.
+
+        Returns:
+
+        """
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._open()
+            elif self.state == STATE_CLOSED:
+                self._outcomes.append(False)
+                failures = self._outcomes.count(False)
+                if (
+                    len(self._outcomes) >= self.min_requests
+                    and failures / len(self._outcomes) >= self.failure_rate
+                ):
+                    self._open()
+
+    def _open(self):
+        """Open the circuit (lock held).
+
+        Returns:
+
+        """
+        self.state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._trial_started_at = None
+        self._outcomes.clear()
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers, by instance id"""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._circuit_breakers = {}
+
+    def get(self, instance):
+        """Return the circuit breaker of an instance, creating it if needed.
+
+        Args:
+            instance:
+
+        Returns:
+            CircuitBreaker
+
+        """
+        with self._lock:
+            circuit_breaker = self._circuit_breakers.get(instance.pk)
+            if circuit_breaker is None:
+                circuit_breaker = self._circuit_breakers[instance.pk] = (
+                    CircuitBreaker()
+                )
+            return circuit_breaker
+
+    def get_state(self, instance):
+        """Return the circuit state of an instance.
+
+        Args:
+            instance:
+
+        Returns:
+            STATE_CLOSED, STATE_OPEN or STATE_HALF_OPEN
+
+        """
+        with self._lock:
+            circuit_breaker = self._circuit_breakers.get(instance.pk)
+        return (
+            STATE_CLOSED if circuit_breaker is None else circuit_breaker.state
+        )
+
+    def reset(self):
+        """Close all the circuits.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._circuit_breakers = {}
+
+
+circuit_breakers = CircuitBreakerRegistry()
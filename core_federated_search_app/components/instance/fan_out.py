@@ -0,0 +1,282 @@
+"""Federated fan-out
+
+Send a request to several instances concurrently, within a global deadline
+and a timeout per instance. The results are tagged with their instance, and
+instances too slow or failing are reported instead of failing the whole
+fan-out: latency is the one of the slowest instance, capped by the deadline.
+"""
+
+import logging
+import posixpath
+import time
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+import core_federated_search_app.components.instance.api as instance_api
+from core_federated_search_app.components.instance.latency import (
+    get_adaptive_timeout,
+)
+from core_federated_search_app.components.instance.remote import (
+    get_session_config,
+)
+from core_federated_search_app.settings import (
+    FAN_OUT_ALLOWED_PATHS,
+    FAN_OUT_DEADLINE,
+    FAN_OUT_INSTANCE_TIMEOUT,
+    FAN_OUT_MAX_WORKERS,
+)
+from core_federated_search_app.utils.concurrency import iter_as_completed
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+
+
+class InstanceResult:
+    """Outcome of the request sent to an instance"""
+
+    __slots__ = ("instance", "status", "result", "error", "elapsed")
+
+    def __init__(self, instance, status, result=None, error=None, elapsed=0):
+        """Instance outcome.
+
+        Args:
+            instance:
+            status: STATUS_OK, STATUS_ERROR or STATUS_TIMEOUT
+            result: value returned for the instance, None on failure
+            error: error message, None on success
+            elapsed: number of seconds since the fan-out started
+        """
+        self.instance = instance
+        self.status = status
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        """Check if the instance answered in time."""
+        return self.status == STATUS_OK
+
+
+class FanOutResult:
+    """Outcome of a fan-out, per instance"""
+
+    __slots__ = ("results", "elapsed")
+
+    def __init__(self, results, elapsed):
+        """Fan-out outcome.
+
+        Args:
+            results: list of InstanceResult, in completion order
+            elapsed: duration of the fan-out, in seconds
+        """
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        """Results of the instances that answered in time."""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def timed_out(self):
+        """Instances that did not answer in time."""
+        return [
+            result.instance
+            for result in self.results
+            if result.status == STATUS_TIMEOUT
+        ]
+
+    @property
+    def failed(self):
+        """Results of the instances whose request failed."""
+        return [
+            result for result in self.results if result.status == STATUS_ERROR
+        ]
+
+
+def fan_out(instances, request, deadline=None, timeout=None, max_workers=None):
+    """Send a request to several instances concurrently, and collect what
+    arrived before the deadline.
+
+    Args:
+        instances:
+        request: function called with an instance and the number of seconds
+            its request may take, returning the result of the instance
+        deadline: number of seconds to wait for all the instances,
+            FAN_OUT_DEADLINE by default
+        timeout: number of seconds a single instance may take, or function
+            returning it for an instance, by default the adaptive timeout of
+            the instance, up to FAN_OUT_INSTANCE_TIMEOUT
+        max_workers: FAN_OUT_MAX_WORKERS by default
+
+    Returns:
+        FanOutResult
+
+    """
+    start = time.monotonic()
+    results = list(
+        iter_fan_out(
+            instances,
+            request,
+            deadline=deadline,
+            timeout=timeout,
+            max_workers=max_workers,
+        )
+    )
+    return FanOutResult(results, time.monotonic() - start)
+
+
+def iter_fan_out(
+    instances, request, deadline=None, timeout=None, max_workers=None
+):
+    """Send a request to several instances concurrently, yielding the result
+    of each instance as it completes.
+
+    The instances still running when the deadline expires are yielded last,
+    as timed out.
+
+    Args:
+        instances:
+        request: function called with an instance and the number of seconds
+            its request may take, returning the result of the instance
+        deadline: number of seconds to wait for all the instances,
+            FAN_OUT_DEADLINE by default
+        timeout: number of seconds a single instance may take, or function
+            returning it for an instance, by default the adaptive timeout of
+            the instance, up to FAN_OUT_INSTANCE_TIMEOUT
+        max_workers: FAN_OUT_MAX_WORKERS by default
+
+    Returns:
+        generator of InstanceResult
+
+    """
+    deadline = FAN_OUT_DEADLINE if deadline is None else deadline
+    timeout = get_instance_timeout if timeout is None else timeout
+    start = time.monotonic()
+
+    def _request(instance):
+        instance_timeout = timeout(instance) if callable(timeout) else timeout
+        # a request never outlives the deadline
+        remaining = deadline - (time.monotonic() - start)
+        return request(instance, max(0.001, min(instance_timeout, remaining)))
+
+    for task_result in iter_as_completed(
+        _request,
+        instances,
+        max_workers=(
+            FAN_OUT_MAX_WORKERS if max_workers is None else max_workers
+        ),
+        timeout=deadline,
+    ):
+        instance = task_result.item
+        elapsed = time.monotonic() - start
+        exception = task_result.exception
+        if exception is None:
+            yield InstanceResult(
+                instance, STATUS_OK, result=task_result.result, elapsed=elapsed
+            )
+        elif isinstance(exception, (TimeoutError, requests.Timeout)):
+            yield InstanceResult(
+                instance, STATUS_TIMEOUT, error=str(exception), elapsed=elapsed
+            )
+        else:
+            logger.warning(
+                "Request to %s failed: %s", instance.name, str(exception)
+            )
+            yield InstanceResult(
+                instance, STATUS_ERROR, error=str(exception), elapsed=elapsed
+            )
+
+
+def get_instance_timeout(instance):
+    """Return the number of seconds an instance may take to answer a fan-out,
+    adapted to its observed latency.
+
+    Args:
+        instance:
+
+    Returns:
+
+    """
+    return get_adaptive_timeout(
+        instance.name,
+        get_session_config(instance.name),
+        FAN_OUT_INSTANCE_TIMEOUT,
+    )
+
+
+def is_allowed_path(path, allowed_paths=None):
+    """Check if a path can be requested on the instances, with their tokens.
+
+    The path must be relative to the instance endpoints, without query,
+    fragment or dot segments, and start with one of the allowed prefixes.
+
+    Args:
+        path: path relative to the instance endpoint
+        allowed_paths: allowed path prefixes, FAN_OUT_ALLOWED_PATHS by
+            default
+
+    Returns:
+
+    """
+    if allowed_paths is None:
+        allowed_paths = FAN_OUT_ALLOWED_PATHS
+    if path.startswith("//") or "\\" in path:
+        return False
+    split_path = urlsplit(path)
+    if (
+        split_path.scheme
+        or split_path.netloc
+        or split_path.query
+        or split_path.fragment
+    ):
+        return False
+    # reject dot segments, even percent-encoded
+    segments = unquote(split_path.path).split("/")
+    if any(segment in (".", "..") for segment in segments):
+        return False
+    relative_path = split_path.path.lstrip("/")
+    return any(
+        relative_path == allowed_path.rstrip("/")
+        or relative_path.startswith(posixpath.join(allowed_path, ""))
+        for allowed_path in allowed_paths
+    )
+
+
+def get_request(path, params=None, headers=None):
+    """Return a fan-out request sending a GET to the same path on each
+    instance, with its token.
+
+    Responses with an error status are reported as failures.
+
+    Args:
+        path: path relative to the instance endpoint
+        params: query parameters
+        headers: request headers
+
+    Returns:
+        function returning the `requests` response of an instance
+
+    """
+
+    def _get(instance, timeout):
+        response = instance_api.send_get_request_to_instance(
+            instance,
+            f"{instance.endpoint.rstrip('/')}/{path.lstrip('/')}",
+            params=params,
+            headers=headers,
+            timeout=timeout,
+        )
+        if response.status_code >= 400:
+            raise requests.HTTPError(
+                f"Remote responded with status {response.status_code}.",
+                response=response,
+            )
+        return response
+
+    return _get
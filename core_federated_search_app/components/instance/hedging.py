@@ -0,0 +1,215 @@
+"""Hedged requests to the remote instances
+
+An idempotent request still unanswered after the usual latency of its
+instance (e.g. stuck on a stalled backend behind a load balancer) is sent a
+second time: the first response wins, and the other one is discarded. The
+extra requests are limited by a budget, a fraction of the requests sent to
+each instance.
+
+The first and the extra requests are sent by two bounded pools of threads,
+shared by the process, so that a first request never waits behind the extra
+ones. When all the threads sending first requests are busy, requests are sent
+by the calling thread, without hedging.
+"""
+
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from core_federated_search_app.settings import (
+    HEDGED_REQUESTS_MAX_PRIMARY_WORKERS,
+    HEDGED_REQUESTS_MAX_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+_executors = {}
+_executor_lock = threading.Lock()
+_primary_slots = threading.Semaphore(HEDGED_REQUESTS_MAX_PRIMARY_WORKERS)
+
+
+class HedgingBudget:
+    """Number of requests and hedged requests, by instance name
+
+    Counts are halved each time an instance reaches `window` requests, so
+    that the budget follows the recent traffic.
+    """
+
+    def __init__(self, window=1000):
+        """Initialize an empty budget.
+
+        Args:
+            window: number of requests after which counts are halved
+        """
+        self._lock = threading.Lock()
+        self._counts = {}
+        self.window = window
+
+    def record_request(self, instance_name):
+        """Record a request that may be hedged.
+
+        Args:
+            instance_name:
+
+        Returns:
+
+        """
+        with self._lock:
+            requests_count, hedges_count = self._counts.get(
+                instance_name, (0.0, 0.0)
+            )
+            requests_count += 1
+            if requests_count > self.window:
+                requests_count /= 2
+                hedges_count /= 2
+            self._counts[instance_name] = (requests_count, hedges_count)
+
+    def try_hedge(self, instance_name, ratio):
+        """Take a hedged request from the budget of an instance.
+
+        Args:
+            instance_name:
+            ratio: maximum number of hedged requests per request
+
+        Returns:
+            True if the request may be hedged
+
+        """
+        with self._lock:
+            requests_count, hedges_count = self._counts.get(
+                instance_name, (0.0, 0.0)
+            )
+            if hedges_count + 1 > ratio * requests_count:
+                return False
+            self._counts[instance_name] = (requests_count, hedges_count + 1)
+            return True
+
+    def reset(self):
+        """Forget all the recorded requests.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._counts = {}
+
+
+def send_hedged_request(send, delay, can_hedge):
+    """Send a request, and send it again if it is not answered in time.
+
+    The first request is sent by the pool of primary workers, or directly if
+    none is free, the second one by the pool of hedge workers. The first
+    successful response is returned; the other request is cancelled if it
+    was not sent yet, or its response is closed as soon as it arrives. The
+    first error is raised if both requests fail.
+
+    Args:
+        send: function sending the request and returning its response
+        delay: number of seconds to wait before hedging the request
+        can_hedge: function checking if the request may be hedged
+
+    Returns:
+
+    """
+    primary = _submit_primary(send)
+    if primary is None:
+        return send()
+    done, _ = wait([primary], timeout=delay)
+    if done or not can_hedge():
+        return primary.result()
+
+    logger.debug("Hedging a request not answered after %.3fs.", delay)
+    hedge = _get_executor(
+        "hedged-request", HEDGED_REQUESTS_MAX_WORKERS
+    ).submit(send)
+    futures = [primary, hedge]
+    pending = set(futures)
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner = next(
+            (
+                future
+                for future in futures
+                if future in done and future.exception() is None
+            ),
+            None,
+        )
+        if winner is not None:
+            for future in futures:
+                if future is not winner:
+                    _discard(future)
+            return winner.result()
+        if error is None:
+            error = next(
+                future.exception() for future in futures if future in done
+            )
+    raise error
+
+
+def _submit_primary(send):
+    """Send a request by the pool of primary workers, if one is free.
+
+    Args:
+        send: function sending the request and returning its response
+
+    Returns:
+        Future of the response, None if all the primary workers are busy
+
+    """
+    if not _primary_slots.acquire(blocking=False):
+        return None
+    future = _get_executor(
+        "primary-request", HEDGED_REQUESTS_MAX_PRIMARY_WORKERS
+    ).submit(send)
+    # the slot is also freed if the request is cancelled
+    future.add_done_callback(lambda _: _primary_slots.release())
+    return future
+
+
+def _discard(future):
+    """Cancel a request, or close its response once it arrives.
+
+    Args:
+        future:
+
+    Returns:
+
+    """
+    if not future.cancel():
+        future.add_done_callback(_close_response)
+
+
+def _close_response(future):
+    """Close the response of a discarded request.
+
+    Args:
+        future:
+
+    Returns:
+
+    """
+    if future.exception() is None:
+        future.result().close()
+
+
+def _get_executor(name, max_workers):
+    """Return a pool of threads sending requests, starting it if needed.
+
+    Args:
+        name: name of the pool, prefix of its thread names
+        max_workers: maximum number of threads of the pool
+
+    Returns:
+        ThreadPoolExecutor
+
+    """
+    with _executor_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=name
+            )
+        return _executors[name]
+
+
+hedging_budget = HedgingBudget()
@@ -0,0 +1,229 @@
+"""Latency of the remote instances
+
+The response times of the requests sent to each instance are kept in a
+decaying histogram, from which adaptive timeouts are derived: fast instances
+get tight timeouts, slow instances get more headroom. The histograms are kept
+in the memory of each process.
+"""
+
+import math
+import threading
+
+# latency of the first histogram bucket, in seconds
+MIN_LATENCY = 0.001
+
+# ratio between the upper bounds of two consecutive buckets
+BUCKET_FACTOR = 1.2
+
+# number of buckets, the last one holding latencies above ~10 minutes
+BUCKET_COUNT = 74
+
+
+class LatencyHistogram:
+    """Streaming histogram of latencies, with logarithmic buckets
+
+    Bucket counts are halved each time the histogram holds more than `window`
+    samples, so that old samples weigh less and less.
+    """
+
+    __slots__ = ("counts", "total", "samples", "ewma", "window", "alpha")
+
+    def __init__(self, window=1000, alpha=0.1):
+        """Initialize an empty histogram.
+
+        Args:
+            window: number of samples after which counts are halved
+            alpha: smoothing factor of the moving average
+        """
+        self.counts = [0.0] * BUCKET_COUNT
+        self.total = 0.0
+        self.samples = 0
+        self.ewma = None
+        self.window = window
+        self.alpha = alpha
+
+    def add(self, latency):
+        """Add a latency sample.
+
+        Args:
+            latency: number of seconds
+
+        Returns:
+
+        """
+        self.counts[_get_bucket(latency)] += 1
+        self.total += 1
+        self.samples += 1
+        self.ewma = (
+            latency
+            if self.ewma is None
+            else self.alpha * latency + (1 - self.alpha) * self.ewma
+        )
+        if self.total > self.window:
+            self.counts = [count / 2 for count in self.counts]
+            self.total /= 2
+
+    def get_percentile(self, percentile):
+        """Return an upper bound of the latency percentile.
+
+        Args:
+            percentile: between 0 and 100
+
+        Returns:
+            number of seconds, None if the histogram is empty
+
+        """
+        if not self.total:
+            return None
+        threshold = self.total * percentile / 100
+        cumulative = 0.0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= threshold:
+                return _get_bucket_upper_bound(index)
+        return _get_bucket_upper_bound(BUCKET_COUNT - 1)
+
+
+class LatencyTracker:
+    """Latency histograms, by instance name"""
+
+    def __init__(self):
+        """Initialize an empty tracker."""
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def record(self, instance_name, latency):
+        """Record the response time of a request sent to an instance.
+
+        Args:
+            instance_name:
+            latency: number of seconds
+
+        Returns:
+
+        """
+        with self._lock:
+            histogram = self._histograms.get(instance_name)
+            if histogram is None:
+                histogram = self._histograms[instance_name] = (
+                    LatencyHistogram()
+                )
+            histogram.add(latency)
+
+    def get_percentile(self, instance_name, percentile, min_samples=1):
+        """Return the latency percentile of an instance.
+
+        Args:
+            instance_name:
+            percentile: between 0 and 100
+            min_samples: minimum number of samples to compute the percentile
+
+        Returns:
+            number of seconds, None if there are not enough samples
+
+        """
+        with self._lock:
+            histogram = self._histograms.get(instance_name)
+            if histogram is None or histogram.samples < min_samples:
+                return None
+            return histogram.get_percentile(percentile)
+
+    def get_stats(self, instance_name):
+        """Return the latency statistics of an instance.
+
+        Args:
+            instance_name:
+
+        Returns:
+            dict, None if no request was recorded
+
+        """
+        with self._lock:
+            histogram = self._histograms.get(instance_name)
+            if histogram is None:
+                return None
+            return {
+                "samples": histogram.samples,
+                "average": histogram.ewma,
+                "p50": histogram.get_percentile(50),
+                "p95": histogram.get_percentile(95),
+                "p99": histogram.get_percentile(99),
+            }
+
+    def reset(self):
+        """Forget all the recorded latencies.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._histograms = {}
+
+
+def get_adaptive_timeout(instance_name, config, default):
+    """Return the timeout of a request to an instance, derived from its
+    observed latency.
+
+    The timeout is the configured percentile of the latency times the
+    configured multiplier, clamped between `adaptive_timeout_min` and the
+    default. The default is returned if adaptive timeouts are disabled, or
+    the instance was not requested enough yet.
+
+    Args:
+        instance_name:
+        config: session configuration of the instance
+        default: timeout when no adaptive timeout is available, and maximum
+            adaptive timeout
+
+    Returns:
+        number of seconds
+
+    """
+    if not config["adaptive_timeout"] or instance_name is None:
+        return default
+    percentile = latency_tracker.get_percentile(
+        instance_name,
+        float(config["adaptive_timeout_percentile"]),
+        min_samples=int(config["adaptive_timeout_min_samples"]),
+    )
+    if percentile is None:
+        return default
+    return min(
+        default,
+        max(
+            float(config["adaptive_timeout_min"]),
+            percentile * float(config["adaptive_timeout_multiplier"]),
+        ),
+    )
+
+
+def _get_bucket(latency):
+    """Return the histogram bucket of a latency.
+
+    Args:
+        latency:
+
+    Returns:
+
+    """
+    if latency <= MIN_LATENCY:
+        return 0
+    return min(
+        BUCKET_COUNT - 1,
+        math.ceil(math.log(latency / MIN_LATENCY, BUCKET_FACTOR)),
+    )
+
+
+def _get_bucket_upper_bound(index):
+    """Return the highest latency of a histogram bucket.
+
+    Args:
+        index:
+
+    Returns:
+
+    """
+    return MIN_LATENCY * BUCKET_FACTOR**index
+
+
+latency_tracker = LatencyTracker()
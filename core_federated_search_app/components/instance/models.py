@@ -8,8 +8,25 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.core.validators import RegexValidator
 from django.db import models, IntegrityError
 
+from core_federated_search_app.utils.fields import EncryptedTextField
+from core_federated_search_app.utils.url import (
+    get_path_prefixes,
+    normalize_url,
+)
+
 logger = logging.getLogger(__name__)
 
+# columns owned by the token store
+TOKEN_FIELDS = ("access_token", "refresh_token", "expires")
+
+# columns derived from the endpoint, for url lookups
+ENDPOINT_FIELDS = (
+    "endpoint_scheme",
+    "endpoint_host",
+    "endpoint_port",
+    "endpoint_path",
+)
+
 
 class Instance(models.Model):
     """Represents an instance of a remote project"""
@@ -30,6 +47,48 @@ class Instance(models.Model):
     access_token = models.CharField(blank=True, null=True, max_length=200)
     refresh_token = models.CharField(blank=True, null=True, max_length=200)
     expires = models.DateTimeField(blank=True, null=True)
+    client_id = EncryptedTextField(blank=True, null=True)
+    client_secret = EncryptedTextField(blank=True, null=True)
+    endpoint_scheme = models.CharField(blank=True, default="", max_length=16)
+    endpoint_host = models.CharField(blank=True, default="", max_length=255)
+    endpoint_port = models.PositiveIntegerField(blank=True, null=True)
+    endpoint_path = models.CharField(blank=True, default="", max_length=200)
+
+    class Meta:
+        """Meta"""
+
+        indexes = [
+            models.Index(
+                fields=[
+                    "endpoint_host",
+                    "endpoint_port",
+                    "endpoint_scheme",
+                    "endpoint_path",
+                ],
+                name="instance_endpoint_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the token columns as loaded, to only save them if they
+        were changed.
+
+        Args:
+            db:
+            field_names:
+            values:
+
+        Returns:
+
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_tokens = {
+            name: instance.__dict__[name]
+            for name in TOKEN_FIELDS
+            if name in instance.__dict__
+        }
+        return instance
 
     @staticmethod
     def get_all():
@@ -59,6 +118,27 @@ class Instance(models.Model):
         except Exception as ex:
             raise exceptions.ModelError(str(ex))
 
+    @staticmethod
+    def get_by_id_for_update(instance_id):
+        """Return the object with the given id, locking its row until the end
+        of the current transaction.
+
+        Args:
+            instance_id:
+
+        Returns:
+            Instance (obj): Instance object with the given id
+
+        """
+        try:
+            return Instance.objects.select_for_update().get(
+                pk=str(instance_id)
+            )
+        except ObjectDoesNotExist as exception:
+            raise exceptions.DoesNotExist(str(exception))
+        except Exception as ex:
+            raise exceptions.ModelError(str(ex))
+
     @staticmethod
     def get_by_name(instance_name):
         """Return the object with the given name.
@@ -97,6 +177,58 @@ class Instance(models.Model):
         except Exception as ex:
             raise exceptions.ModelError(str(ex))
 
+    @staticmethod
+    def get_by_url(url):
+        """Return the instance whose endpoint is the longest prefix of the url.
+
+        Args:
+            url:
+
+        Returns:
+            Instance (obj): Instance object owning the url
+
+        """
+        try:
+            normalized_url = normalize_url(url)
+            candidates = Instance.objects.filter(
+                endpoint_host=normalized_url.host,
+                endpoint_port=normalized_url.port,
+                endpoint_scheme=normalized_url.scheme,
+                endpoint_path__in=get_path_prefixes(normalized_url.path),
+            )
+            instance = max(
+                candidates,
+                key=lambda candidate: len(candidate.endpoint_path),
+                default=None,
+            )
+        except Exception as ex:
+            raise exceptions.ModelError(str(ex))
+
+        if instance is None:
+            raise exceptions.DoesNotExist(
+                "No instance registered for the given url."
+            )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save the instance, with its normalized endpoint.
+
+        The normalized endpoint is filled in on every save (admin, REST API
+        or `save_object`), so that `get_by_url` finds all the instances.
+
+        Args:
+            *args:
+            **kwargs:
+
+        Returns:
+
+        """
+        self.normalize_endpoint()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "endpoint" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *ENDPOINT_FIELDS}
+        return super().save(*args, **kwargs)
+
     def save_object(self):
         """Custom save.
 
@@ -105,7 +237,11 @@ class Instance(models.Model):
         """
         try:
             self.check_instance_name()
-            return self.save()
+            output = self.save(update_fields=self._get_update_fields())
+            self._loaded_tokens = {
+                name: getattr(self, name) for name in TOKEN_FIELDS
+            }
+            return output
         except IntegrityError as integrity_error:
             logging.error(
                 "An integrity error occurred while saving the instance: %s",
@@ -121,6 +257,43 @@ class Instance(models.Model):
             )
             raise exceptions.ModelError(str(ex))
 
+    def _get_update_fields(self):
+        """Return the columns saved by `save_object`.
+
+        The token columns of an instance loaded from the database are only
+        saved if they were changed: tokens refreshed through the token store
+        since the instance was loaded (e.g. in the instance registry) are not
+        overwritten by the stale values of the object.
+
+        Returns:
+            list of field names, None to save all the fields
+
+        """
+        loaded_tokens = getattr(self, "_loaded_tokens", None)
+        if self._state.adding or not loaded_tokens:
+            return None
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and not (
+                field.name in loaded_tokens
+                and getattr(self, field.name) == loaded_tokens[field.name]
+            )
+        ]
+
+    def normalize_endpoint(self):
+        """Fill in the normalized endpoint fields used for url lookups.
+
+        Returns:
+
+        """
+        normalized_endpoint = normalize_url(self.endpoint)
+        self.endpoint_scheme = normalized_endpoint.scheme
+        self.endpoint_host = normalized_endpoint.host
+        self.endpoint_port = normalized_endpoint.port
+        self.endpoint_path = normalized_endpoint.path
+
     def check_instance_name(self):
         """Test if the name is the name of the local instance.
 
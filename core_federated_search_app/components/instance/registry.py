@@ -0,0 +1,385 @@
+"""Instance registry
+
+Process-wide, read-only snapshot of the registered instances. Lookups are
+served from memory; the snapshot is reloaded from the database only when the
+registry version stored in the Django cache changes. Urls matching no
+instance are remembered in a negative cache until the registry version
+changes.
+
+Changes are only seen by the other processes if the default Django cache is
+shared between them (e.g. Redis or Memcached, not LocMemCache): a system
+check warns otherwise.
+"""
+
+import logging
+import threading
+import time
+from copy import copy
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.settings import (
+    NEGATIVE_CACHE_MAX_ENTRIES,
+    NEGATIVE_CACHE_TTL,
+)
+from core_federated_search_app.utils.negative_cache import NegativeCache
+from core_federated_search_app.utils.trie import RadixTrie
+from core_federated_search_app.utils.url import normalize_url
+from core_main_app.commons import exceptions
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_VERSION_CACHE_KEY = (
+    "core_federated_search_app:instance_registry:version"
+)
+
+
+class InstanceRegistrySnapshot:
+    """Immutable view of the registered instances at a given version"""
+
+    __slots__ = (
+        "version",
+        "instances",
+        "by_id",
+        "by_name",
+        "by_endpoint",
+        "url_router",
+    )
+
+    def __init__(self, version, instances):
+        """Index the instances of the snapshot.
+
+        Args:
+            version: registry version the snapshot was loaded at
+            instances: list of instances
+        """
+        self.version = version
+        self.instances = tuple(instances)
+        self.by_id = {instance.pk: instance for instance in instances}
+        self.by_name = {instance.name: instance for instance in instances}
+        self.by_endpoint = {
+            str(normalize_url(instance.endpoint)): instance
+            for instance in instances
+        }
+        self.url_router = RadixTrie(
+            (_get_routing_key(instance.endpoint), instance)
+            for instance in instances
+        )
+
+
+class InstanceRegistry:
+    """In-memory registry of the instances, shared by the whole process"""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.misses = NegativeCache(
+            NEGATIVE_CACHE_MAX_ENTRIES, NEGATIVE_CACHE_TTL
+        )
+
+    def get_snapshot(self):
+        """Return the current snapshot, reloading it if it is stale.
+
+        Returns:
+            InstanceRegistrySnapshot
+
+        """
+        version = _get_registry_version()
+        snapshot = self._snapshot
+        if _is_current(snapshot, version):
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if not _is_current(snapshot, version):
+                logger.debug(
+                    "Loading instance registry (version %s).", version
+                )
+                snapshot = InstanceRegistrySnapshot(
+                    version, list(Instance.get_all())
+                )
+                self._snapshot = snapshot
+        return snapshot
+
+    def get_all(self):
+        """Return all registered instances.
+
+        Returns:
+            list of instances
+
+        """
+        return [copy(instance) for instance in self.get_snapshot().instances]
+
+    def get_by_id(self, instance_id):
+        """Return the instance with the given id.
+
+        Args:
+            instance_id:
+
+        Returns:
+            Instance
+
+        """
+        try:
+            instance_pk = Instance._meta.pk.to_python(instance_id)
+        except Exception as ex:
+            raise exceptions.ModelError(str(ex))
+        try:
+            return copy(self.get_snapshot().by_id[instance_pk])
+        except KeyError:
+            raise exceptions.DoesNotExist(
+                f"No instance registered with id {instance_id}."
+            )
+
+    def get_by_name(self, instance_name):
+        """Return the instance with the given name.
+
+        Args:
+            instance_name:
+
+        Returns:
+            Instance
+
+        """
+        try:
+            return copy(self.get_snapshot().by_name[str(instance_name)])
+        except KeyError:
+            raise exceptions.DoesNotExist(
+                f"No instance registered with name {instance_name}."
+            )
+
+    def get_by_ids(self, instance_ids):
+        """Return the instances with the given ids.
+
+        Args:
+            instance_ids:
+
+        Returns:
+            dict of instances keyed by requested id, list of missing ids
+
+        """
+        by_id = self.get_snapshot().by_id
+
+        def _lookup(instance_id):
+            try:
+                return by_id.get(Instance._meta.pk.to_python(instance_id))
+            except Exception:
+                return None
+
+        return _bulk_lookup(instance_ids, _lookup)
+
+    def get_by_names(self, instance_names):
+        """Return the instances with the given names.
+
+        Args:
+            instance_names:
+
+        Returns:
+            dict of instances keyed by requested name, list of missing names
+
+        """
+        by_name = self.get_snapshot().by_name
+        return _bulk_lookup(
+            instance_names, lambda name: by_name.get(str(name))
+        )
+
+    def get_by_endpoints(self, instance_endpoints):
+        """Return the instances with the given endpoints.
+
+        Args:
+            instance_endpoints:
+
+        Returns:
+            dict of instances keyed by normalized endpoint, list of missing
+            endpoints
+
+        """
+        by_endpoint = self.get_snapshot().by_endpoint
+        instances = {}
+        missing = []
+        for endpoint in instance_endpoints:
+            try:
+                normalized_endpoint = str(normalize_url(endpoint))
+            except ValueError:
+                missing.append(endpoint)
+                continue
+            instance = by_endpoint.get(normalized_endpoint)
+            if instance is None:
+                missing.append(endpoint)
+            else:
+                instances[normalized_endpoint] = copy(instance)
+        return instances, missing
+
+    def get_by_url(self, url):
+        """Return the instance whose endpoint is the longest prefix of the url.
+
+        Args:
+            url:
+
+        Returns:
+            Instance
+
+        """
+        snapshot = self.get_snapshot()
+        if self.misses.get(("url", url), snapshot.version):
+            raise exceptions.DoesNotExist(
+                "No instance registered for the given url."
+            )
+        try:
+            routing_key = _get_routing_key(url)
+        except ValueError:
+            routing_key = None
+
+        instance = (
+            snapshot.url_router.longest_prefix_value(routing_key)
+            if routing_key
+            else None
+        )
+        if instance is None:
+            self.misses.add(("url", url), snapshot.version)
+            raise exceptions.DoesNotExist(
+                "No instance registered for the given url."
+            )
+        return copy(instance)
+
+    def get_by_endpoint_starting_with(self, instance_endpoint):
+        """Return the instance whose endpoint starts with the given string.
+
+        Args:
+            instance_endpoint:
+
+        Returns:
+            Instance
+
+        """
+        snapshot = self.get_snapshot()
+        prefix = str(instance_endpoint)
+        if self.misses.get(("endpoint", prefix), snapshot.version):
+            raise exceptions.DoesNotExist(
+                f"No instance registered with an endpoint starting with "
+                f"{prefix}."
+            )
+        instances = [
+            instance
+            for instance in snapshot.instances
+            if instance.endpoint.startswith(prefix)
+        ]
+        if not instances:
+            self.misses.add(("endpoint", prefix), snapshot.version)
+            raise exceptions.DoesNotExist(
+                f"No instance registered with an endpoint starting with "
+                f"{prefix}."
+            )
+        if len(instances) > 1:
+            raise exceptions.ModelError(
+                f"Several instances registered with an endpoint starting "
+                f"with {prefix}."
+            )
+        return copy(instances[0])
+
+    def invalidate(self):
+        """Drop the local snapshot and bump the shared registry version.
+
+        Returns:
+
+        """
+        self._snapshot = None
+        self.misses.clear()
+        _bump_registry_version()
+
+    def invalidate_on_commit(self):
+        """Invalidate the registry now and once the current transaction
+        commits, so that no worker keeps a snapshot of uncommitted data.
+
+        Returns:
+
+        """
+        self.invalidate()
+        transaction.on_commit(self.invalidate)
+
+
+def _bulk_lookup(keys, lookup):
+    """Look up several keys, collecting the keys that were not found.
+
+    Args:
+        keys:
+        lookup: function returning the instance of a key, or None
+
+    Returns:
+        dict of instances keyed by key, list of missing keys
+
+    """
+    instances = {}
+    missing = []
+    for key in keys:
+        instance = lookup(key)
+        if instance is None:
+            missing.append(key)
+        else:
+            instances[key] = copy(instance)
+    return instances, missing
+
+
+def _get_routing_key(url):
+    """Return the key used to route an url to its instance.
+
+    The key is the normalized url (without query string) ending with a slash,
+    so that prefixes only match on whole path segments.
+
+    Args:
+        url:
+
+    Returns:
+
+    """
+    return f"{normalize_url(url)}/"
+
+
+def _is_current(snapshot, version):
+    """Check if a snapshot was loaded at the given registry version.
+
+    Args:
+        snapshot:
+        version: None if the cache is unable to store the version
+
+    Returns:
+
+    """
+    return (
+        snapshot is not None
+        and version is not None
+        and snapshot.version == version
+    )
+
+
+def _get_registry_version():
+    """Return the registry version shared by all the workers.
+
+    Returns:
+
+    """
+    version = cache.get(REGISTRY_VERSION_CACHE_KEY)
+    if version is None:
+        # Start from a time-based value so that a version evicted from the
+        # cache is never mistaken for an older one.
+        cache.add(REGISTRY_VERSION_CACHE_KEY, time.time_ns(), None)
+        version = cache.get(REGISTRY_VERSION_CACHE_KEY)
+    return version
+
+
+def _bump_registry_version():
+    """Increment the registry version shared by all the workers.
+
+    Returns:
+
+    """
+    try:
+        cache.incr(REGISTRY_VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(REGISTRY_VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+instance_registry = InstanceRegistry()
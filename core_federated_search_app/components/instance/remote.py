@@ -0,0 +1,474 @@
+"""Requests sent to the remote instances
+
+Requests go through a pool of `requests` sessions, one per instance and
+endpoint origin, so that consecutive calls to the same remote reuse warm
+(keep-alive) connections instead of opening a new TCP/TLS connection each
+time.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core_explore_common_app.commons.exceptions import (
+    UsernamePasswordRequiredError,
+)
+from core_explore_common_app.utils.protocols.oauth2 import (
+    HEADER,
+    TOKEN_SUFFIX,
+)
+from core_federated_search_app.components.instance.hedging import (
+    hedging_budget,
+    send_hedged_request,
+)
+from core_federated_search_app.components.instance.latency import (
+    get_adaptive_timeout,
+    latency_tracker,
+)
+from core_federated_search_app.settings import INSTANCE_HTTP_SESSIONS
+from core_federated_search_app.utils.url import normalize_url
+from core_main_app.settings import SSL_CERTIFICATES_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_CONFIG = {
+    "pool_maxsize": 10,
+    "max_retries": 2,
+    "backoff_factor": 0.5,
+    "connect_timeout": 5,
+    "read_timeout": 60,
+    "keep_alive": True,
+    "idle_timeout": 300,
+    "adaptive_timeout": True,
+    "adaptive_timeout_percentile": 99,
+    "adaptive_timeout_multiplier": 1.5,
+    "adaptive_timeout_min": 2,
+    "adaptive_timeout_min_samples": 20,
+    "hedging": False,
+    "hedging_percentile": 95,
+    "hedging_budget": 0.05,
+}
+
+# methods of the requests that may be hedged
+HEDGED_METHODS = ("GET", "HEAD")
+
+# remote status codes retried for idempotent requests
+RETRY_STATUS_CODES = (502, 503, 504)
+
+# minimum number of seconds between two sweeps of the idle sessions
+IDLE_SWEEP_INTERVAL = 60
+
+
+def get_session_config(instance_name=None):
+    """Return the session configuration of an instance.
+
+    The configuration is DEFAULT_SESSION_CONFIG, updated with the "default"
+    entry of INSTANCE_HTTP_SESSIONS, then with the entry named after the
+    instance.
+
+    Args:
+        instance_name:
+
+    Returns:
+        dict
+
+    """
+    config = dict(DEFAULT_SESSION_CONFIG)
+    config.update(INSTANCE_HTTP_SESSIONS.get("default", {}))
+    if instance_name is not None:
+        config.update(INSTANCE_HTTP_SESSIONS.get(instance_name, {}))
+    return config
+
+
+class _PooledSession:
+    """Session of the pool, with its configuration and last use"""
+
+    __slots__ = ("session", "config", "last_used")
+
+    def __init__(self, session, config):
+        """Pooled session.
+
+        Args:
+            session: requests.Session
+            config: session configuration
+        """
+        self.session = session
+        self.config = config
+        self.last_used = time.monotonic()
+
+
+class InstanceSessionPool:
+    """Pool of `requests` sessions, by instance and endpoint origin
+
+    A session changing origin (e.g. after the endpoint of its instance was
+    edited) is a new entry of the pool; sessions left unused for longer than
+    their idle timeout are closed.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._last_sweep = time.monotonic()
+
+    def get(self, url, instance_name=None):
+        """Return the pooled session and its configuration for an url.
+
+        Args:
+            url:
+            instance_name: name of the instance the url belongs to
+
+        Returns:
+            requests.Session, dict
+
+        """
+        key = (instance_name, normalize_url(url).origin)
+        now = time.monotonic()
+        with self._lock:
+            pooled_session = self._sessions.get(key)
+            if pooled_session is None:
+                config = get_session_config(instance_name)
+                pooled_session = _PooledSession(
+                    _create_session(config), config
+                )
+                self._sessions[key] = pooled_session
+            pooled_session.last_used = now
+            idle_sessions = (
+                self._pop_idle_sessions(now)
+                if now - self._last_sweep > IDLE_SWEEP_INTERVAL
+                else []
+            )
+        _close_sessions(idle_sessions)
+        return pooled_session.session, pooled_session.config
+
+    def close_idle_sessions(self):
+        """Close the sessions left unused for longer than their idle timeout.
+
+        Returns:
+
+        """
+        with self._lock:
+            idle_sessions = self._pop_idle_sessions(time.monotonic())
+        _close_sessions(idle_sessions)
+
+    def close_all(self):
+        """Close all the sessions of the pool.
+
+        Returns:
+
+        """
+        with self._lock:
+            sessions = [
+                pooled_session.session
+                for pooled_session in self._sessions.values()
+            ]
+            self._sessions = {}
+        _close_sessions(sessions)
+
+    def __len__(self):
+        """Number of sessions in the pool."""
+        return len(self._sessions)
+
+    def _pop_idle_sessions(self, now):
+        """Remove the idle sessions from the pool (lock held).
+
+        Args:
+            now:
+
+        Returns:
+            list of removed sessions
+
+        """
+        self._last_sweep = now
+        idle_keys = [
+            key
+            for key, pooled_session in self._sessions.items()
+            if now - pooled_session.last_used
+            > pooled_session.config["idle_timeout"]
+        ]
+        return [self._sessions.pop(key).session for key in idle_keys]
+
+
+def _create_session(config):
+    """Create a session from its configuration.
+
+    Args:
+        config:
+
+    Returns:
+        requests.Session
+
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=int(config["pool_maxsize"]),
+        max_retries=Retry(
+            total=int(config["max_retries"]),
+            backoff_factor=float(config["backoff_factor"]),
+            status_forcelist=RETRY_STATUS_CODES,
+            # token requests are not idempotent: only connection errors,
+            # raised before anything is sent, are retried for them
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.verify = SSL_CERTIFICATES_DIR
+    if not config["keep_alive"]:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def _close_sessions(sessions):
+    """Close sessions, releasing their connections.
+
+    Args:
+        sessions:
+
+    Returns:
+
+    """
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as exception:
+            logger.warning("Unable to close session: %s", str(exception))
+
+
+def _send_request(method, url, instance_name=None, **kwargs):
+    """Send a request through the session pool.
+
+    The response time of the request (until the response headers are
+    received) is recorded for its instance. Without an explicit timeout, the
+    read timeout adapts to the latency of the instance, up to `read_timeout`.
+    Streamed requests keep `read_timeout`: it also bounds the wait between
+    two chunks of the content, which the latency does not measure.
+    Idempotent requests are hedged if the session configuration enables it.
+
+    Args:
+        method:
+        url:
+        instance_name:
+        **kwargs: passed to `requests`
+
+    Returns:
+
+    """
+    session, config = session_pool.get(url, instance_name)
+    if kwargs.get("timeout") is None:
+        read_timeout = float(config["read_timeout"])
+        if not kwargs.get("stream"):
+            read_timeout = get_adaptive_timeout(
+                instance_name, config, read_timeout
+            )
+        kwargs["timeout"] = (float(config["connect_timeout"]), read_timeout)
+    if config["hedging"] and method in HEDGED_METHODS:
+        return _send_hedged_request(
+            session, config, method, url, instance_name, **kwargs
+        )
+    return _send_timed_request(session, method, url, instance_name, **kwargs)
+
+
+def _send_hedged_request(
+    session, config, method, url, instance_name, **kwargs
+):
+    """Send a request, hedged once it takes longer than the
+    `hedging_percentile` of the latency of its instance, within the
+    `hedging_budget` of the instance.
+
+    Args:
+        session:
+        config: session configuration
+        method:
+        url:
+        instance_name:
+        **kwargs: passed to `requests`
+
+    Returns:
+
+    """
+    send = functools.partial(
+        _send_timed_request, session, method, url, instance_name, **kwargs
+    )
+    hedging_budget.record_request(instance_name)
+    delay = latency_tracker.get_percentile(
+        instance_name,
+        float(config["hedging_percentile"]),
+        min_samples=int(config["adaptive_timeout_min_samples"]),
+    )
+    if delay is None:
+        return send()
+    return send_hedged_request(
+        send,
+        delay,
+        lambda: hedging_budget.try_hedge(
+            instance_name, float(config["hedging_budget"])
+        ),
+    )
+
+
+def _send_timed_request(session, method, url, instance_name, **kwargs):
+    """Send a request, recording its response time for its instance.
+
+    Args:
+        session:
+        method:
+        url:
+        instance_name:
+        **kwargs: passed to `requests`
+
+    Returns:
+
+    """
+    start = time.monotonic()
+    try:
+        response = session.request(method, url, **kwargs)
+    except requests.Timeout:
+        # a remote too slow to answer still counts towards its latency
+        if instance_name is not None:
+            latency_tracker.record(instance_name, time.monotonic() - start)
+        raise
+    if instance_name is not None:
+        latency_tracker.record(instance_name, time.monotonic() - start)
+    return response
+
+
+def send_get_request(url, access_token, instance_name=None, **kwargs):
+    """Send a GET request to a remote instance.
+
+    Args:
+        url:
+        access_token: OAuth2 access token, None for public instances
+        instance_name: name of the instance, to select its session
+        **kwargs: passed to `requests` (stream, headers, timeout...)
+
+    Returns:
+
+    """
+    return _send_authorized_request(
+        "GET", url, access_token, instance_name=instance_name, **kwargs
+    )
+
+
+def send_head_request(url, access_token, instance_name=None, **kwargs):
+    """Send a HEAD request to a remote instance.
+
+    Args:
+        url:
+        access_token: OAuth2 access token, None for public instances
+        instance_name: name of the instance, to select its session
+        **kwargs: passed to `requests` (headers, timeout...)
+
+    Returns:
+
+    """
+    return _send_authorized_request(
+        "HEAD", url, access_token, instance_name=instance_name, **kwargs
+    )
+
+
+def _send_authorized_request(
+    method, url, access_token, instance_name=None, **kwargs
+):
+    """Send a request with the access token of a remote instance.
+
+    Args:
+        method:
+        url:
+        access_token: OAuth2 access token, None for public instances
+        instance_name:
+        **kwargs: passed to `requests`
+
+    Returns:
+
+    """
+    headers = dict(kwargs.pop("headers", None) or {})
+    if access_token:
+        headers["Authorization"] = "Bearer " + access_token
+
+    return _send_request(
+        method, url, instance_name=instance_name, headers=headers, **kwargs
+    )
+
+
+def post_request_token(
+    url,
+    client_id,
+    client_secret,
+    timeout,
+    username,
+    password,
+    instance_name=None,
+):
+    """Request a token from a remote instance.
+
+    Args:
+        url: endpoint of the instance
+        client_id:
+        client_secret:
+        timeout:
+        username:
+        password:
+        instance_name: name of the instance, to select its session
+
+    Returns:
+
+    """
+    if username is None or password is None:
+        raise UsernamePasswordRequiredError("Username/Password must be given")
+
+    return _send_request(
+        "POST",
+        f"{url}{TOKEN_SUFFIX}",
+        instance_name=instance_name,
+        data={
+            "client_id": str(client_id),
+            "client_secret": str(client_secret),
+            "grant_type": "password",
+            "username": username,
+            "password": password,
+        },
+        headers=HEADER,
+        timeout=int(timeout),
+    )
+
+
+def post_refresh_token(
+    url, client_id, client_secret, timeout, refresh_token, instance_name=None
+):
+    """Refresh the token of a remote instance.
+
+    Args:
+        url: endpoint of the instance
+        client_id:
+        client_secret:
+        timeout:
+        refresh_token:
+        instance_name: name of the instance, to select its session
+
+    Returns:
+
+    """
+    return _send_request(
+        "POST",
+        f"{url}{TOKEN_SUFFIX}",
+        instance_name=instance_name,
+        data={
+            "client_id": str(client_id),
+            "client_secret": str(client_secret),
+            "refresh_token": str(refresh_token),
+            "grant_type": "refresh_token",
+        },
+        headers=HEADER,
+        timeout=int(timeout),
+    )
+
+
+session_pool = InstanceSessionPool()
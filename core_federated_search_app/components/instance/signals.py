@@ -0,0 +1,41 @@
+"""Signals to keep the instance registry up to date."""
+
+import logging
+
+from django.db.models import signals as models_signals
+
+from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.components.instance.registry import (
+    instance_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def connect():
+    """Connect signals for the instance registry"""
+    models_signals.post_save.connect(post_save_instance, sender=Instance)
+    models_signals.post_delete.connect(post_delete_instance, sender=Instance)
+    logger.info("Registered signals for the instance registry")
+
+
+def post_save_instance(sender, instance, **kwargs):
+    """Signal triggered after saving an instance
+
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    instance_registry.invalidate_on_commit()
+
+
+def post_delete_instance(sender, instance, **kwargs):
+    """Signal triggered after deleting an instance
+
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    instance_registry.invalidate_on_commit()
@@ -0,0 +1,271 @@
+"""Instance token store
+
+Token reads and writes go through a token store, so that reading a token
+never requires a database query and refreshing a token never rewrites the
+whole instance row.
+"""
+
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.components.instance.registry import (
+    instance_registry,
+)
+from core_federated_search_app.settings import INSTANCE_TOKEN_STORE
+from core_main_app.utils.datetime import datetime_now, datetime_timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class TokenGrant:
+    """OAuth2 token granted by a remote instance"""
+
+    __slots__ = ("access_token", "refresh_token", "expires")
+
+    def __init__(self, access_token, refresh_token, expires):
+        """Token grant.
+
+        Args:
+            access_token (str): access token, None if the instance is public
+            refresh_token (str): refresh token, None if the instance is public
+            expires (datetime): expiration date of the access token
+        """
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires = expires
+
+    @classmethod
+    def from_response_content(cls, content):
+        """Parse the content of an OAuth2 token response.
+
+        Args:
+            content:
+
+        Returns:
+            TokenGrant
+
+        """
+        data = json.loads(content)
+        return cls(
+            access_token=data["access_token"],
+            refresh_token=data["refresh_token"],
+            expires=datetime_now()
+            + datetime_timedelta(seconds=int(data["expires_in"])),
+        )
+
+    @classmethod
+    def from_instance(cls, instance):
+        """Read the token fields of an instance.
+
+        Args:
+            instance:
+
+        Returns:
+            TokenGrant
+
+        """
+        return cls(
+            access_token=instance.access_token,
+            refresh_token=instance.refresh_token,
+            expires=instance.expires,
+        )
+
+    def apply_to(self, instance):
+        """Set the token fields of an instance.
+
+        Args:
+            instance:
+
+        Returns:
+
+        """
+        instance.access_token = self.access_token
+        instance.refresh_token = self.refresh_token
+        instance.expires = self.expires
+
+    def is_expiring(self, margin):
+        """Check if the access token expires within the margin.
+
+        Args:
+            margin: number of seconds
+
+        Returns:
+
+        """
+        return self.expires is not None and self.expires <= (
+            datetime_now() + datetime_timedelta(seconds=margin)
+        )
+
+    def __eq__(self, other):
+        """Compare two grants."""
+        if not isinstance(other, TokenGrant):
+            return NotImplemented
+        return (
+            self.access_token == other.access_token
+            and self.refresh_token == other.refresh_token
+            and self.expires == other.expires
+        )
+
+    def __repr__(self):
+        """Grant as string, without the tokens."""
+        return f"TokenGrant(expires={self.expires!r})"
+
+
+class TokenStore(ABC):
+    """Storage of the instance tokens"""
+
+    @abstractmethod
+    def get(self, instance):
+        """Return the token grant of the instance.
+
+        Args:
+            instance:
+
+        Returns:
+            TokenGrant
+
+        """
+        raise NotImplementedError("get not implemented")
+
+    @abstractmethod
+    def set(self, instance, grant):
+        """Store the token grant of the instance, and apply it to the
+        instance object.
+
+        Args:
+            instance:
+            grant:
+
+        Returns:
+
+        """
+        raise NotImplementedError("set not implemented")
+
+
+class DatabaseTokenStore(TokenStore):
+    """Tokens stored in the instance table
+
+    Reads come from the instance object (loaded from the instance registry),
+    writes only update the token columns and invalidate the registry.
+    """
+
+    def get(self, instance):
+        return TokenGrant.from_instance(instance)
+
+    def set(self, instance, grant):
+        self._save(instance, grant)
+        instance_registry.invalidate_on_commit()
+
+    def _save(self, instance, grant):
+        """Update the token columns of the instance row.
+
+        Args:
+            instance:
+            grant:
+
+        Returns:
+
+        """
+        Instance.objects.filter(pk=instance.pk).update(
+            access_token=grant.access_token,
+            refresh_token=grant.refresh_token,
+            expires=grant.expires,
+        )
+        grant.apply_to(instance)
+
+    def _load(self, instance):
+        """Read the token columns of the instance row.
+
+        Args:
+            instance:
+
+        Returns:
+
+        """
+        try:
+            return TokenGrant.from_instance(Instance.get_by_id(instance.pk))
+        except Exception as exception:
+            logger.warning(
+                "Unable to load the token of %s: %s",
+                instance.name,
+                str(exception),
+            )
+            return TokenGrant.from_instance(instance)
+
+
+class _WriteThroughTokenStore(DatabaseTokenStore):
+    """Tokens served from a faster storage and written through to the
+    instance table. Token updates do not invalidate the instance registry.
+    """
+
+    def get(self, instance):
+        grant = self._get_cached(instance.pk)
+        if grant is None:
+            grant = self._load(instance)
+            self._set_cached(instance.pk, grant)
+        return grant
+
+    def set(self, instance, grant):
+        self._save(instance, grant)
+        self._set_cached(instance.pk, grant)
+
+    @abstractmethod
+    def _get_cached(self, instance_id):
+        """Return the cached grant of the instance, None if not cached."""
+        raise NotImplementedError("_get_cached not implemented")
+
+    @abstractmethod
+    def _set_cached(self, instance_id, grant):
+        """Cache the grant of the instance."""
+        raise NotImplementedError("_set_cached not implemented")
+
+
+class CacheTokenStore(_WriteThroughTokenStore):
+    """Tokens served from the Django cache, shared by all the workers"""
+
+    cache_key_prefix = "core_federated_search_app:instance_token:"
+
+    def _get_cached(self, instance_id):
+        return cache.get(f"{self.cache_key_prefix}{instance_id}")
+
+    def _set_cached(self, instance_id, grant):
+        cache.set(f"{self.cache_key_prefix}{instance_id}", grant, None)
+
+
+class MemoryTokenStore(_WriteThroughTokenStore):
+    """Tokens served from the memory of the process"""
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._lock = threading.Lock()
+        self._grants = {}
+
+    def _get_cached(self, instance_id):
+        with self._lock:
+            return self._grants.get(instance_id)
+
+    def _set_cached(self, instance_id, grant):
+        with self._lock:
+            self._grants[instance_id] = grant
+
+
+_token_store = None
+
+
+def get_token_store():
+    """Return the token store configured by INSTANCE_TOKEN_STORE.
+
+    Returns:
+        TokenStore
+
+    """
+    global _token_store
+    if _token_store is None:
+        _token_store = import_string(INSTANCE_TOKEN_STORE)()
+    return _token_store
@@ -0,0 +1,34 @@
+"""Auto discovery of federated search app."""
+
+import logging
+
+from django.core.exceptions import ObjectDoesNotExist
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from core_federated_search_app.settings import INSTANCE_TOKEN_REFRESH_INTERVAL
+from core_federated_search_app.tasks import refresh_expiring_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def init_periodic_tasks():
+    """Create periodic tasks for the app and add them to an interval schedule"""
+    try:
+        schedule, _ = IntervalSchedule.objects.get_or_create(
+            every=INSTANCE_TOKEN_REFRESH_INTERVAL,
+            period=IntervalSchedule.SECONDS,
+        )
+        periodic_task = PeriodicTask.objects.get(
+            name=refresh_expiring_tokens.__name__
+        )
+        if periodic_task.interval_id != schedule.id:
+            periodic_task.interval = schedule
+            periodic_task.save()
+    except ObjectDoesNotExist:
+        PeriodicTask.objects.create(
+            interval=schedule,
+            name=refresh_expiring_tokens.__name__,
+            task="core_federated_search_app.tasks.refresh_expiring_tokens",
+        )
+    except Exception as exception:
+        logger.error(str(exception))
@@ -0,0 +1,105 @@
+"""Refresh instance tokens command"""
+
+import logging
+import time
+from argparse import BooleanOptionalAction
+
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+
+import core_federated_search_app.components.instance.api as instance_api
+from core_federated_search_app.settings import (
+    INSTANCE_TOKEN_REFRESH_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Refresh instance tokens command"""
+
+    help = "Refresh the tokens of the instances that are about to expire"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--daemon",
+            default=False,
+            action=BooleanOptionalAction,
+            help="Keep running and refresh tokens every --interval seconds",
+        )
+        parser.add_argument(
+            "--interval",
+            default=INSTANCE_TOKEN_REFRESH_INTERVAL,
+            type=int,
+            help="Number of seconds between two runs in daemon mode",
+        )
+        parser.add_argument(
+            "--window",
+            default=None,
+            type=int,
+            help="Refresh tokens expiring within this number of seconds",
+        )
+        parser.add_argument(
+            "--max-workers",
+            default=None,
+            type=int,
+            help="Maximum number of tokens refreshed concurrently",
+        )
+        parser.add_argument(
+            "--jitter",
+            default=None,
+            type=int,
+            help="Maximum random delay (in seconds) before each refresh",
+        )
+
+    def handle(self, *args, **options):
+        """Refresh the tokens expiring within the window, once or forever.
+
+        Parameters:
+            "daemon": boolean,
+            "interval": integer,
+            "window": integer,
+            "max-workers": integer,
+            "jitter": integer
+
+        Examples:
+            python manage.py refresh_instance_tokens
+            python manage.py refresh_instance_tokens --daemon --interval 300
+
+        """
+        while True:
+            self._refresh(options)
+            if not options["daemon"]:
+                break
+            time.sleep(options["interval"])
+
+    def _refresh(self, options):
+        """Run one refresh of the expiring tokens.
+
+        Args:
+            options:
+
+        Returns:
+
+        """
+        close_old_connections()
+        try:
+            results = instance_api.refresh_expiring_tokens(
+                window=options["window"],
+                max_workers=options["max_workers"],
+                jitter=options["jitter"],
+            )
+        except Exception as exception:
+            logger.error(
+                "An error occurred while refreshing instance tokens (%s).",
+                str(exception),
+            )
+            return
+
+        for result in results:
+            message = f"{result['name']}: {result['status']}"
+            if result["message"]:
+                message += f" ({result['message']})"
+            self.stdout.write(message)
+        if not results:
+            self.stdout.write("No token to refresh.")
@@ -0,0 +1,32 @@
+"""Migration to store the encrypted OAuth2 client credentials of instances.
+
+Generated by Django 5.2 on 2026-10-18.
+"""
+
+from django.db import migrations
+
+import core_federated_search_app.utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_federated_search_app", "0002_optional_instance_auth"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="instance",
+            name="client_id",
+            field=core_federated_search_app.utils.fields.EncryptedTextField(
+                blank=True, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="instance",
+            name="client_secret",
+            field=core_federated_search_app.utils.fields.EncryptedTextField(
+                blank=True, null=True
+            ),
+        ),
+    ]
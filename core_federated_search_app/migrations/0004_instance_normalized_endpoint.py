@@ -0,0 +1,80 @@
+"""Migration to add indexed, normalized endpoint fields to instances.
+
+Generated by Django 5.2 on 2026-10-18.
+"""
+
+from django.db import migrations, models
+
+from core_federated_search_app.utils.url import normalize_url
+
+
+def normalize_instance_endpoints(apps, schema_editor):
+    """Fill in the normalized endpoint fields of existing instances.
+
+    Args:
+        apps:
+        schema_editor:
+
+    Returns:
+
+    """
+    instance_model = apps.get_model("core_federated_search_app", "Instance")
+    for instance in instance_model.objects.all():
+        normalized_endpoint = normalize_url(instance.endpoint)
+        instance.endpoint_scheme = normalized_endpoint.scheme
+        instance.endpoint_host = normalized_endpoint.host
+        instance.endpoint_port = normalized_endpoint.port
+        instance.endpoint_path = normalized_endpoint.path
+        instance.save(
+            update_fields=[
+                "endpoint_scheme",
+                "endpoint_host",
+                "endpoint_port",
+                "endpoint_path",
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core_federated_search_app", "0003_instance_client_credentials"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="instance",
+            name="endpoint_scheme",
+            field=models.CharField(blank=True, default="", max_length=16),
+        ),
+        migrations.AddField(
+            model_name="instance",
+            name="endpoint_host",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddField(
+            model_name="instance",
+            name="endpoint_port",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="instance",
+            name="endpoint_path",
+            field=models.CharField(blank=True, default="", max_length=200),
+        ),
+        migrations.RunPython(
+            normalize_instance_endpoints, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name="instance",
+            index=models.Index(
+                fields=[
+                    "endpoint_host",
+                    "endpoint_port",
+                    "endpoint_scheme",
+                    "endpoint_path",
+                ],
+                name="instance_endpoint_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,343 @@
+"""REST Views for the blobs of the remote instances"""
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiExample,
+    OpenApiParameter,
+    OpenApiResponse,
+)
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core_federated_search_app.commons.exceptions import (
+    InstanceUnavailableError,
+)
+from core_federated_search_app.settings import (
+    BLOB_ARCHIVE_MAX_URLS,
+    BLOB_METADATA_MAX_URLS,
+)
+from core_federated_search_app.utils.blob_proxy import proxy as blob_proxy
+from core_federated_search_app.utils.blob_proxy.archive import (
+    get_zip_response,
+)
+from core_federated_search_app.utils.blob_proxy.cache import get_blob_cache
+from core_federated_search_app.utils.blob_proxy.metadata import (
+    get_blobs_metadata,
+)
+from core_main_app.commons import exceptions
+
+
+@extend_schema(
+    tags=["Federated Blob"],
+    description="Download a blob hosted by a remote Instance",
+)
+class BlobDownload(APIView):
+    """Download a blob hosted by a remote Instance"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        summary="Download a remote blob",
+        description="Stream the blob at the given url, hosted by a "
+        "registered Instance",
+        parameters=[
+            OpenApiParameter(
+                name="url",
+                type=OpenApiTypes.URI,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Url of the blob on the remote Instance",
+            ),
+        ],
+        responses={
+            200: OpenApiTypes.BINARY,
+            206: OpenApiResponse(description="Requested range of the blob"),
+            400: OpenApiResponse(description="Validation error"),
+            404: OpenApiResponse(description="Object was not found"),
+            500: OpenApiResponse(description="Internal server error"),
+            503: OpenApiResponse(description="Remote instance unavailable"),
+        },
+    )
+    def get(self, request):
+        """Stream a remote blob
+
+        The Range and If-Range headers are honored.
+
+        Args:
+            request: HTTP request
+        Returns:
+            - code: 200
+              content: Blob content
+            - code: 206
+              content: Requested range of the blob
+            - code: 400
+              content: Validation error
+            - code: 404
+              content: Object was not found
+            - code: 500
+              content: Internal server error
+            - code: 503
+              content: Remote instance unavailable
+        """
+        try:
+            url = request.query_params.get("url")
+            if not url:
+                content = {"message": "The url parameter is required."}
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+
+            return blob_proxy.get_blob_response(url, request.headers)
+        except exceptions.DoesNotExist:
+            content = {"message": "No instance registered for this url."}
+            return Response(content, status=status.HTTP_404_NOT_FOUND)
+        except InstanceUnavailableError as unavailable_exception:
+            content = {"message": str(unavailable_exception)}
+            return Response(
+                content, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        except Exception as api_exception:
+            content = {"message": str(api_exception)}
+            return Response(
+                content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@extend_schema(
+    tags=["Federated Blob"],
+    description="Download several remote blobs as a ZIP archive",
+)
+class BlobZipDownload(APIView):
+    """Download several remote blobs as a ZIP archive"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        summary="Download remote blobs as a ZIP archive",
+        description="Stream a ZIP archive of the blobs at the given urls",
+        request=OpenApiTypes.OBJECT,
+        responses={
+            200: OpenApiTypes.BINARY,
+            400: OpenApiResponse(description="Validation error"),
+            500: OpenApiResponse(description="Internal server error"),
+        },
+        examples=[
+            OpenApiExample(
+                "Example request",
+                summary="Example request body",
+                description="Example request body for downloading blobs",
+                value={
+                    "urls": [
+                        "https://remote/rest/blob/download/1/",
+                        "https://remote/rest/blob/download/2/",
+                    ],
+                    "filename": "blobs.zip",
+                },
+            ),
+        ],
+    )
+    def post(self, request):
+        """Stream a ZIP archive of remote blobs
+        Parameters:
+            {
+              "urls": ["url_1", "url_2"],
+              "filename": "blobs.zip"
+            }
+        Args:
+            request: HTTP request
+        Returns:
+            - code: 200
+              content: ZIP archive
+            - code: 400
+              content: Validation error
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            urls = request.data.get("urls")
+            if (
+                not isinstance(urls, list)
+                or not urls
+                or not all(isinstance(url, str) for url in urls)
+            ):
+                content = {"message": "A list of urls is required."}
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+            if len(urls) > BLOB_ARCHIVE_MAX_URLS:
+                content = {
+                    "message": "An archive can contain at most "
+                    f"{BLOB_ARCHIVE_MAX_URLS} blobs."
+                }
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+
+            filename = str(request.data.get("filename") or "blobs.zip")
+            return get_zip_response(urls, filename.replace('"', ""))
+        except Exception as api_exception:
+            content = {"message": str(api_exception)}
+            return Response(
+                content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@extend_schema(
+    tags=["Federated Blob"],
+    description="Size, type and validators of remote blobs",
+)
+class BlobMetadata(APIView):
+    """Size, type and validators of remote blobs"""
+
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        summary="Get the metadata of remote blobs",
+        description="Get the size, content type, ETag and last modification "
+        "date of the blobs at the given urls, without downloading them",
+        parameters=[
+            OpenApiParameter(
+                name="url",
+                type=OpenApiTypes.URI,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                many=True,
+                description="Url of a blob on a remote Instance",
+            ),
+        ],
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiResponse(description="Validation error"),
+            500: OpenApiResponse(description="Internal server error"),
+        },
+    )
+    def get(self, request):
+        """Get the metadata of the remote blobs given as url parameters
+
+        Args:
+            request: HTTP request
+        Returns:
+            - code: 200
+              content: Metadata of the blobs
+            - code: 400
+              content: Validation error
+            - code: 500
+              content: Internal server error
+        """
+        return self._get_metadata_response(request.query_params.getlist("url"))
+
+    @extend_schema(
+        summary="Get the metadata of remote blobs",
+        description="Get the size, content type, ETag and last modification "
+        "date of the blobs at the given urls, without downloading them",
+        request=OpenApiTypes.OBJECT,
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiResponse(description="Validation error"),
+            500: OpenApiResponse(description="Internal server error"),
+        },
+        examples=[
+            OpenApiExample(
+                "Example request",
+                summary="Example request body",
+                description="Example request body for blob metadata",
+                value={
+                    "urls": [
+                        "https://remote/rest/blob/download/1/",
+                        "https://remote/rest/blob/download/2/",
+                    ],
+                },
+            ),
+        ],
+    )
+    def post(self, request):
+        """Get the metadata of remote blobs
+        Parameters:
+            {
+              "urls": ["url_1", "url_2"]
+            }
+        Args:
+            request: HTTP request
+        Returns:
+            - code: 200
+              content: Metadata of the blobs
+            - code: 400
+              content: Validation error
+            - code: 500
+              content: Internal server error
+        """
+        return self._get_metadata_response((request.data or {}).get("urls"))
+
+    @staticmethod
+    def _get_metadata_response(urls):
+        """Return the metadata of the blobs, or a validation error.
+
+        Args:
+            urls:
+
+        Returns:
+
+        """
+        try:
+            if (
+                not isinstance(urls, list)
+                or not urls
+                or not all(isinstance(url, str) for url in urls)
+            ):
+                content = {"message": "A list of urls is required."}
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+            if len(urls) > BLOB_METADATA_MAX_URLS:
+                content = {
+                    "message": "Metadata can be requested for at most "
+                    f"{BLOB_METADATA_MAX_URLS} blobs."
+                }
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response({"results": get_blobs_metadata(urls)})
+        except Exception as api_exception:
+            content = {"message": str(api_exception)}
+            return Response(
+                content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@extend_schema(
+    tags=["Federated Blob"],
+    description="Statistics of the blob cache",
+)
+class BlobCacheStats(APIView):
+    """Statistics of the blob cache"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        summary="Get the blob cache statistics",
+        description="Get the hit, miss, revalidation, store and eviction "
+        "counters of the blob cache, with its current size",
+        responses={
+            200: OpenApiTypes.OBJECT,
+            404: OpenApiResponse(description="Blob cache is disabled"),
+            500: OpenApiResponse(description="Internal server error"),
+        },
+    )
+    def get(self, request):
+        """Get the blob cache statistics
+
+        Args:
+            request: HTTP request
+        Returns:
+            - code: 200
+              content: Blob cache statistics
+            - code: 404
+              content: Blob cache is disabled
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            blob_cache = get_blob_cache()
+            if blob_cache is None:
+                content = {"message": "The blob cache is disabled."}
+                return Response(content, status=status.HTTP_404_NOT_FOUND)
+            return Response(blob_cache.get_stats())
+        except Exception as api_exception:
+            content = {"message": str(api_exception)}
+            return Response(
+                content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
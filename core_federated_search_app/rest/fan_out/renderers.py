@@ -0,0 +1,83 @@
+"""Renderers of the streamed federated results"""
+
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Server-Sent Events renderer
+
+    Responses that are not streamed (e.g. errors) are rendered as a single
+    "error" event.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data as an "error" event.
+
+        Args:
+            data:
+            accepted_media_type:
+            renderer_context:
+
+        Returns:
+
+        """
+        return self.format_message("error", data)
+
+    @staticmethod
+    def format_message(event, data):
+        """Format an event.
+
+        Args:
+            event: event type
+            data: JSON serializable data
+
+        Returns:
+            bytes
+
+        """
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON renderer
+
+    Responses that are not streamed (e.g. errors) are rendered as a single
+    "error" line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data as an "error" line.
+
+        Args:
+            data:
+            accepted_media_type:
+            renderer_context:
+
+        Returns:
+
+        """
+        return self.format_message("error", data)
+
+    @staticmethod
+    def format_message(event, data):
+        """Format an event as a JSON line, its type in the "event" key.
+
+        Args:
+            event: event type
+            data: JSON serializable dict
+
+        Returns:
+            bytes
+
+        """
+        return (json.dumps({"event": event, **data}) + "\n").encode()
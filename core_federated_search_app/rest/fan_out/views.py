@@ -0,0 +1,202 @@
+"""REST Views for the requests sent to several remote instances"""
+
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiParameter,
+    OpenApiResponse,
+)
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+import core_federated_search_app.components.instance.api as instance_api
+from core_federated_search_app.components.instance.fan_out import (
+    STATUS_ERROR,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    get_request,
+    is_allowed_path,
+    iter_fan_out,
+)
+from core_federated_search_app.rest.fan_out.renderers import (
+    EventStreamRenderer,
+    NDJSONRenderer,
+)
+
+# query parameters of the view, not forwarded to the instances
+RESERVED_PARAMETERS = ("path", "name", "format")
+
+
+@extend_schema(
+    tags=["Federated Fan-out"],
+    description="Stream the responses of several remote Instances",
+)
+class FanOutStream(APIView):
+    """Stream the responses of several remote Instances as they arrive"""
+
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (EventStreamRenderer, NDJSONRenderer, JSONRenderer)
+
+    @extend_schema(
+        summary="Stream the responses of remote instances",
+        description="Send a GET request to the same path on several "
+        "Instances, and stream each response as soon as it arrives, as "
+        "Server-Sent Events (text/event-stream) or newline-delimited JSON "
+        "(application/x-ndjson). A result event is sent per Instance, then "
+        "a summary event. Query parameters other than path and name are "
+        "forwarded to the Instances.",
+        parameters=[
+            OpenApiParameter(
+                name="path",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Path requested, relative to the Instance "
+                "endpoints, starting with one of FAN_OUT_ALLOWED_PATHS",
+            ),
+            OpenApiParameter(
+                name="name",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                many=True,
+                description="Name of an Instance to request, all the "
+                "Instances by default",
+            ),
+        ],
+        responses={
+            200: OpenApiTypes.STR,
+            400: OpenApiResponse(description="Validation error"),
+            500: OpenApiResponse(description="Internal server error"),
+        },
+    )
+    def get(self, request):
+        """Stream the responses of remote instances
+
+        Args:
+            request: HTTP request
+        Returns:
+            - code: 200
+              content: Result events, then a summary event
+            - code: 400
+              content: Validation error
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            path = request.query_params.get("path")
+            if not path:
+                content = {"message": "The path parameter is required."}
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+            if not is_allowed_path(path):
+                content = {
+                    "message": f"The path {path} can not be requested on "
+                    "the instances."
+                }
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+
+            names = request.query_params.getlist("name")
+            if names:
+                instances, missing = instance_api.get_by_names(names)
+                if missing:
+                    content = {
+                        "message": "Unknown instances: "
+                        f"{', '.join(str(name) for name in missing)}."
+                    }
+                    return Response(
+                        content, status=status.HTTP_400_BAD_REQUEST
+                    )
+                instances = list(instances.values())
+            else:
+                instances = instance_api.get_all_registered()
+
+            params = {
+                key: request.query_params.getlist(key)
+                for key in request.query_params
+                if key not in RESERVED_PARAMETERS
+            }
+            renderer = request.accepted_renderer
+            if not isinstance(renderer, NDJSONRenderer):
+                renderer = EventStreamRenderer()
+            response = StreamingHttpResponse(
+                _iter_messages(
+                    iter_fan_out(
+                        instances,
+                        get_request(
+                            path,
+                            params=params,
+                            headers={"Accept": "application/json"},
+                        ),
+                    ),
+                    len(instances),
+                    renderer.format_message,
+                ),
+                content_type=renderer.media_type,
+            )
+            response["Cache-Control"] = "no-cache"
+            # let nginx send each message as soon as it is written
+            response["X-Accel-Buffering"] = "no"
+            return response
+        except Exception as api_exception:
+            content = {"message": str(api_exception)}
+            return Response(
+                content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+def _iter_messages(instance_results, instance_count, format_message):
+    """Format the instance results as they complete, then their summary.
+
+    Args:
+        instance_results: iterator of InstanceResult
+        instance_count: number of instances requested
+        format_message: function formatting an event and its data
+
+    Returns:
+
+    """
+    counts = {STATUS_OK: 0, STATUS_ERROR: 0, STATUS_TIMEOUT: 0}
+    elapsed = 0
+    for instance_result in instance_results:
+        counts[instance_result.status] += 1
+        elapsed = instance_result.elapsed
+        yield format_message(
+            "result",
+            {
+                "instance": instance_result.instance.name,
+                "status": instance_result.status,
+                "elapsed": round(instance_result.elapsed, 3),
+                "result": (
+                    _get_response_content(instance_result.result)
+                    if instance_result.ok
+                    else None
+                ),
+                "error": instance_result.error,
+            },
+        )
+    yield format_message(
+        "summary",
+        {
+            "instances": instance_count,
+            **counts,
+            "elapsed": round(elapsed, 3),
+        },
+    )
+
+
+def _get_response_content(response):
+    """Return the content of a remote response, decoded if it is JSON.
+
+    Args:
+        response:
+
+    Returns:
+
+    """
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
@@ -1,8 +1,15 @@
 """Instance Serializers"""
 
-from rest_framework.fields import CharField, IntegerField
+from rest_framework.fields import (
+    CharField,
+    IntegerField,
+    ListField,
+    SerializerMethodField,
+)
 from rest_framework.serializers import ModelSerializer
 
+from core_main_app.commons.serializers import BasicSerializer
+
 import core_federated_search_app.components.instance.api as instance_api
 from core_federated_search_app.components.instance.models import Instance
 
@@ -10,18 +17,38 @@ from core_federated_search_app.components.instance.models import Instance
 class InstanceSerializerModel(ModelSerializer):
     """Instance serializer"""
 
+    circuit_state = SerializerMethodField()
+
     class Meta:
         """Meta"""
 
         model = Instance
-        fields = "__all__"
+        exclude = (
+            "client_id",
+            "client_secret",
+        )
         read_only_fields = (
             "endpoint",
             "access_token",
             "refresh_token",
             "expires",
+            "endpoint_scheme",
+            "endpoint_host",
+            "endpoint_port",
+            "endpoint_path",
         )
 
+    def get_circuit_state(self, instance):
+        """Return the circuit state of the instance, in this process.
+
+        Args:
+            instance:
+
+        Returns:
+
+        """
+        return instance_api.get_circuit_state(instance)
+
     def create(self, validated_data):
         raise Exception("Wrong serializer for creation")
 
@@ -60,3 +87,10 @@ class InstanceSerializerCreate(ModelSerializer):
 
     def update(self, instance, validated_data):
         raise Exception("Wrong serializer for update")
+
+
+class InstanceRefreshTokensSerializer(BasicSerializer):
+    """Serializer of a refresh of several instance tokens"""
+
+    ids = ListField(child=CharField(), required=False, allow_null=True)
+    timeout = IntegerField(min_value=1, required=False, allow_null=True)
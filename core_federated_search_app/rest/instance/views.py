@@ -16,6 +16,7 @@ from rest_framework.views import APIView
 
 import core_federated_search_app.components.instance.api as instance_api
 from core_federated_search_app.rest.instance.serializers import (
+    InstanceRefreshTokensSerializer,
     InstanceSerializerCreate,
     InstanceSerializerModel,
 )
@@ -31,25 +32,70 @@ class InstanceList(APIView):
 
     permission_classes = (IsAdminUser,)
 
+    # query parameter -> name of the instance api bulk lookup function
+    bulk_lookups = {
+        "id": "get_by_ids",
+        "name": "get_by_names",
+        "endpoint": "get_by_endpoints",
+    }
+
     @extend_schema(
         summary="Get all instances",
-        description="Get all Instances",
+        description="Get all Instances, or the Instances with the given ids, "
+        "names or endpoints",
+        parameters=[
+            OpenApiParameter(
+                name=lookup_name,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                many=True,
+                description=f"Instance {lookup_name} to retrieve "
+                "(repeatable, exclusive with the other filters)",
+            )
+            for lookup_name in ("id", "name", "endpoint")
+        ],
         responses={
             200: InstanceSerializerModel(many=True),
+            400: OpenApiResponse(description="Validation error"),
             500: OpenApiResponse(description="Internal server error"),
         },
     )
     def get(self, request):
         """Return http response with all Instances
+
+        When one of the `id`, `name` or `endpoint` query parameters is given,
+        return the matching Instances keyed by the requested values, along
+        with the values not found:
+            {
+              "instances": {"<key>": {...}},
+              "missing": ["<key>"]
+            }
+
         Args:
             request: HTTP request
         Returns:
             - code: 200
               content: List of Instances
+            - code: 400
+              content: Validation error
             - code: 500
               content: Internal server error
         """
         try:
+            lookups = [
+                lookup_name
+                for lookup_name in self.bulk_lookups
+                if lookup_name in request.query_params
+            ]
+            if len(lookups) > 1:
+                content = {
+                    "message": "Only one of the id, name or endpoint "
+                    "parameters can be used."
+                }
+                return Response(content, status=status.HTTP_400_BAD_REQUEST)
+            if lookups:
+                return self._get_bulk(request, lookups[0])
+
             # Get object
             instance_object_list = instance_api.get_all()
             # Serialize object
@@ -64,6 +110,29 @@ class InstanceList(APIView):
                 content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _get_bulk(self, request, lookup_name):
+        """Return http response with the Instances matching the given keys
+
+        Args:
+            request: HTTP request
+            lookup_name: id, name or endpoint
+
+        Returns:
+
+        """
+        bulk_lookup = getattr(instance_api, self.bulk_lookups[lookup_name])
+        instances, missing = bulk_lookup(
+            request.query_params.getlist(lookup_name)
+        )
+        content = {
+            "instances": {
+                key: InstanceSerializerModel(instance).data
+                for key, instance in instances.items()
+            },
+            "missing": missing,
+        }
+        return Response(content)
+
     @extend_schema(
         summary="Create a new instance",
         description="Save an Instance",
@@ -411,3 +480,90 @@ class InstanceRefreshToken(APIView):
             return Response(
                 content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+@extend_schema(
+    tags=["Federated Instance"],
+    description="Refresh the tokens of several Instances",
+)
+class InstanceRefreshAllTokens(APIView):
+    """Refresh the tokens of several Instances"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        summary="Refresh tokens of several instances",
+        description="Refresh, concurrently, the tokens of the given "
+        "Instances, or of all the Instances whose token can be refreshed "
+        "with their stored client credentials",
+        request=OpenApiTypes.OBJECT,
+        responses={
+            200: OpenApiResponse(
+                description="Refresh result of each Instance"
+            ),
+            400: OpenApiResponse(description="Validation error"),
+            500: OpenApiResponse(description="Internal server error"),
+        },
+        examples=[
+            OpenApiExample(
+                "Example request",
+                summary="Example request body",
+                description="Example request body for refreshing the tokens "
+                "of several instances",
+                value={"ids": ["1", "2"], "timeout": "1"},
+            ),
+        ],
+    )
+    def patch(self, request):
+        """Refresh the tokens of several Instances
+        Parameters:
+            {
+              "ids": ["1", "2"],
+              "timeout": "1"
+            }
+        Args:
+            request: HTTP request
+        Returns:
+            - code: 200
+              content: Refresh results and ids not found
+                {
+                  "results": [
+                    {"id": 1, "name": "...", "status": "success|error",
+                     "message": "..."}
+                  ],
+                  "missing": ["2"]
+                }
+            - code: 400
+              content: Validation error (e.g. timeout not a positive integer)
+            - code: 500
+              content: Internal server error
+        """
+        try:
+            # Build serializer
+            refresh_serializer = InstanceRefreshTokensSerializer(
+                data=request.data or {}
+            )
+            # Validate data
+            refresh_serializer.is_valid(raise_exception=True)
+            instance_ids = refresh_serializer.validated_data.get("ids")
+            timeout = refresh_serializer.validated_data.get("timeout")
+            missing = []
+            if instance_ids is None:
+                instances = None
+            else:
+                instances, missing = instance_api.get_by_ids(instance_ids)
+                instances = list(instances.values())
+            # refresh the tokens
+            results = instance_api.refresh_all_tokens(
+                instances, timeout=timeout
+            )
+            content = {"results": results, "missing": missing}
+            return Response(content, status=status.HTTP_200_OK)
+        except ValidationError as validation_exception:
+            content = {"message": validation_exception.detail}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as api_exception:
+            content = {"message": str(api_exception)}
+            return Response(
+                content, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
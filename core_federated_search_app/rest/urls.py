@@ -3,6 +3,8 @@
 from django.urls import re_path
 from rest_framework.urlpatterns import format_suffix_patterns
 
+from core_federated_search_app.rest.blob import views as blob_views
+from core_federated_search_app.rest.fan_out import views as fan_out_views
 from core_federated_search_app.rest.instance import views as instance_views
 
 urlpatterns = [
@@ -11,6 +13,11 @@ urlpatterns = [
         instance_views.InstanceList.as_view(),
         name="core_federated_search_app_rest_instance",
     ),
+    re_path(
+        r"^instance/refresh/$",
+        instance_views.InstanceRefreshAllTokens.as_view(),
+        name="core_federated_search_app_rest_instance_refresh_all",
+    ),
     re_path(
         r"^instance/(?P<pk>\w+)/$",
         instance_views.InstanceDetail.as_view(),
@@ -21,6 +28,31 @@ urlpatterns = [
         instance_views.InstanceRefreshToken.as_view(),
         name="core_federated_search_app_rest_instance_refresh",
     ),
+    re_path(
+        r"^blob/$",
+        blob_views.BlobDownload.as_view(),
+        name="core_federated_search_app_rest_blob",
+    ),
+    re_path(
+        r"^blob/zip/$",
+        blob_views.BlobZipDownload.as_view(),
+        name="core_federated_search_app_rest_blob_zip",
+    ),
+    re_path(
+        r"^blob/metadata/$",
+        blob_views.BlobMetadata.as_view(),
+        name="core_federated_search_app_rest_blob_metadata",
+    ),
+    re_path(
+        r"^blob/cache/$",
+        blob_views.BlobCacheStats.as_view(),
+        name="core_federated_search_app_rest_blob_cache",
+    ),
+    re_path(
+        r"^fan-out/stream/$",
+        fan_out_views.FanOutStream.as_view(),
+        name="core_federated_search_app_rest_fan_out_stream",
+    ),
 ]
 
 urlpatterns = format_suffix_patterns(urlpatterns)
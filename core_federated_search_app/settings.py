@@ -12,3 +12,222 @@ if not settings.configured:
 CUSTOM_NAME = getattr(settings, "CUSTOM_NAME", "Local")
 """ :py:class:`str`: Name of the local instance
 """
+
+INSTANCE_CREDENTIALS_SECRET_KEY = getattr(
+    settings,
+    "INSTANCE_CREDENTIALS_SECRET_KEY",
+    getattr(settings, "SECRET_KEY", ""),
+)
+""" :py:class:`str`: Secret used to encrypt the OAuth2 client credentials of
+the instances. Defaults to SECRET_KEY.
+"""
+
+INSTANCE_TOKEN_REFRESH_WINDOW = getattr(
+    settings, "INSTANCE_TOKEN_REFRESH_WINDOW", 3600
+)
+""" :py:class:`int`: Tokens expiring within this number of seconds are
+refreshed by the token refresh scheduler.
+"""
+
+INSTANCE_TOKEN_REFRESH_INTERVAL = getattr(
+    settings, "INSTANCE_TOKEN_REFRESH_INTERVAL", 300
+)
+""" :py:class:`int`: Number of seconds between two runs of the token refresh
+scheduler.
+"""
+
+INSTANCE_TOKEN_REFRESH_MAX_WORKERS = getattr(
+    settings, "INSTANCE_TOKEN_REFRESH_MAX_WORKERS", 4
+)
+""" :py:class:`int`: Maximum number of tokens refreshed concurrently.
+"""
+
+INSTANCE_TOKEN_REFRESH_JITTER = getattr(
+    settings, "INSTANCE_TOKEN_REFRESH_JITTER", 5
+)
+""" :py:class:`int`: Maximum random delay (in seconds) before each scheduled
+token refresh, to spread the load on the remote instances.
+"""
+
+INSTANCE_TOKEN_REFRESH_TIMEOUT = getattr(
+    settings, "INSTANCE_TOKEN_REFRESH_TIMEOUT", 10
+)
+""" :py:class:`int`: Timeout (in seconds) of the requests sent to refresh a
+token when none is given.
+"""
+
+INSTANCE_TOKEN_EXPIRY_MARGIN = getattr(
+    settings, "INSTANCE_TOKEN_EXPIRY_MARGIN", 60
+)
+""" :py:class:`int`: Tokens expiring within this number of seconds are
+refreshed before being sent to the remote instance.
+"""
+
+INSTANCE_TOKEN_STORE = getattr(
+    settings,
+    "INSTANCE_TOKEN_STORE",
+    "core_federated_search_app.components.instance.token_store.DatabaseTokenStore",
+)
+""" :py:class:`str`: Class storing the instance tokens. Choose from
+`DatabaseTokenStore`, `CacheTokenStore` (Django cache, written through to the
+database) and `MemoryTokenStore` (process memory, written through to the
+database) in `core_federated_search_app.components.instance.token_store`.
+"""
+
+NEGATIVE_CACHE_TTL = getattr(settings, "NEGATIVE_CACHE_TTL", 30)
+""" :py:class:`int`: Number of seconds urls matching no instance, and remote
+blobs answered with 404, are remembered as missing. Entries are also dropped
+when the instances change. 0 disables the negative cache.
+"""
+
+NEGATIVE_CACHE_MAX_ENTRIES = getattr(
+    settings, "NEGATIVE_CACHE_MAX_ENTRIES", 10000
+)
+""" :py:class:`int`: Maximum number of urls remembered as missing, per
+process.
+"""
+
+BLOB_PROXY_CHUNK_SIZE = getattr(settings, "BLOB_PROXY_CHUNK_SIZE", 64 * 1024)
+""" :py:class:`int`: Size (in bytes) of the chunks read from the remote
+instances and sent to the client when streaming a blob.
+"""
+
+INSTANCE_HTTP_SESSIONS = getattr(settings, "INSTANCE_HTTP_SESSIONS", {})
+""" :py:class:`dict`: Configuration of the pooled HTTP sessions used to reach
+the remote instances, keyed by instance name ("default" applies to all the
+instances). Each entry can set `pool_maxsize`, `max_retries`,
+`backoff_factor`, `connect_timeout`, `read_timeout` (in seconds),
+`keep_alive` and `idle_timeout` (seconds after which an unused session is
+closed). Unless `adaptive_timeout` is False, the read timeout of an instance
+is derived from its observed latency: the `adaptive_timeout_percentile`
+(99) times `adaptive_timeout_multiplier` (1.5), clamped between
+`adaptive_timeout_min` and `read_timeout`, once
+`adaptive_timeout_min_samples` responses were received (streamed downloads
+keep `read_timeout`). When `hedging` is
+True, GET and HEAD requests unanswered after the `hedging_percentile` (95)
+of the latency are sent a second time, for at most a `hedging_budget`
+(0.05) fraction of the requests, and the slower response is discarded.
+"""
+
+HEDGED_REQUESTS_MAX_WORKERS = getattr(
+    settings, "HEDGED_REQUESTS_MAX_WORKERS", 32
+)
+""" :py:class:`int`: Maximum number of hedged requests (see
+INSTANCE_HTTP_SESSIONS) sent concurrently by a process.
+"""
+
+HEDGED_REQUESTS_MAX_PRIMARY_WORKERS = getattr(
+    settings, "HEDGED_REQUESTS_MAX_PRIMARY_WORKERS", 64
+)
+""" :py:class:`int`: Maximum number of requests that may be hedged waiting
+concurrently for their first response in a process. Above it, requests are
+sent without hedging.
+"""
+
+BLOB_CACHE_DIRECTORY = getattr(settings, "BLOB_CACHE_DIRECTORY", None)
+""" :py:class:`str`: Directory of the on-disk cache of the remote blobs
+downloaded through the blob proxy. The cache is disabled if not set.
+"""
+
+BLOB_CACHE_MAX_SIZE = getattr(settings, "BLOB_CACHE_MAX_SIZE", 1024**3)
+""" :py:class:`int`: Maximum size (in bytes) of the blob cache. Least
+recently used blobs are evicted beyond this size.
+"""
+
+BLOB_CACHE_MAX_ENTRY_SIZE = getattr(
+    settings, "BLOB_CACHE_MAX_ENTRY_SIZE", 100 * 1024**2
+)
+""" :py:class:`int`: Maximum size (in bytes) of a blob stored in the blob
+cache. Larger blobs are streamed without being cached.
+"""
+
+BLOB_CACHE_OFFLOAD = getattr(settings, "BLOB_CACHE_OFFLOAD", None)
+""" :py:class:`str`: Let the web server send the blobs served from the blob
+cache: "x-accel-redirect" (nginx) or "x-sendfile" (Apache mod_xsendfile).
+Blobs are sent by Django if not set.
+"""
+
+BLOB_CACHE_OFFLOAD_LOCATION = getattr(
+    settings, "BLOB_CACHE_OFFLOAD_LOCATION", "/blob-cache/"
+)
+""" :py:class:`str`: Internal nginx location mapped to BLOB_CACHE_DIRECTORY,
+used by the "x-accel-redirect" offload.
+"""
+
+BLOB_COALESCING_TIMEOUT = getattr(settings, "BLOB_COALESCING_TIMEOUT", 30)
+""" :py:class:`int`: Number of seconds a blob request following the download
+of the same blob by another request waits for the remote response, then for
+each chunk of content. The download is shared only when the blob cache is
+enabled.
+"""
+
+BLOB_BATCH_MAX_WORKERS = getattr(settings, "BLOB_BATCH_MAX_WORKERS", 8)
+""" :py:class:`int`: Maximum number of blobs downloaded concurrently by a
+batch download.
+"""
+
+BLOB_BATCH_MAX_WORKERS_PER_INSTANCE = getattr(
+    settings, "BLOB_BATCH_MAX_WORKERS_PER_INSTANCE", 2
+)
+""" :py:class:`int`: Maximum number of blobs downloaded concurrently from the
+same instance by a batch download.
+"""
+
+BLOB_ARCHIVE_MAX_URLS = getattr(settings, "BLOB_ARCHIVE_MAX_URLS", 1000)
+""" :py:class:`int`: Maximum number of blobs in a ZIP archive download.
+"""
+
+BLOB_METADATA_MAX_URLS = getattr(settings, "BLOB_METADATA_MAX_URLS", 200)
+""" :py:class:`int`: Maximum number of blobs in a metadata request.
+"""
+
+FAN_OUT_DEADLINE = getattr(settings, "FAN_OUT_DEADLINE", 30)
+""" :py:class:`int`: Number of seconds a request sent to several instances
+waits for all of them. Instances not answering in time are reported as
+timed out.
+"""
+
+FAN_OUT_INSTANCE_TIMEOUT = getattr(settings, "FAN_OUT_INSTANCE_TIMEOUT", 10)
+""" :py:class:`int`: Number of seconds a single instance may take to answer a
+request sent to several instances.
+"""
+
+FAN_OUT_MAX_WORKERS = getattr(settings, "FAN_OUT_MAX_WORKERS", 16)
+""" :py:class:`int`: Maximum number of instances requested concurrently by a
+request sent to several instances.
+"""
+
+FAN_OUT_ALLOWED_PATHS = getattr(
+    settings,
+    "FAN_OUT_ALLOWED_PATHS",
+    ("rest/data/", "rest/template/", "rest/template-version-manager/"),
+)
+""" :py:class:`tuple`: Path prefixes, relative to the instance endpoints, that
+can be requested on several instances at once. The requests are sent with the
+token of each instance: only read-only REST endpoints should be listed.
+"""
+
+CIRCUIT_BREAKER_WINDOW = getattr(settings, "CIRCUIT_BREAKER_WINDOW", 20)
+""" :py:class:`int`: Number of recent requests to an instance its failure rate
+is computed on.
+"""
+
+CIRCUIT_BREAKER_MIN_REQUESTS = getattr(
+    settings, "CIRCUIT_BREAKER_MIN_REQUESTS", 5
+)
+""" :py:class:`int`: Minimum number of recent requests to an instance before
+its circuit can open.
+"""
+
+CIRCUIT_BREAKER_FAILURE_RATE = getattr(
+    settings, "CIRCUIT_BREAKER_FAILURE_RATE", 0.5
+)
+""" :py:class:`float`: Rate of failed requests (connection errors, timeouts
+and 5xx responses) opening the circuit of an instance. Requests to an
+instance whose circuit is open fail immediately.
+"""
+
+CIRCUIT_BREAKER_COOLDOWN = getattr(settings, "CIRCUIT_BREAKER_COOLDOWN", 30)
+""" :py:class:`int`: Number of seconds before an open circuit lets a single
+trial request through.
+"""
@@ -0,0 +1,63 @@
+$(document).ready(function() {
+    $('.select-all-repositories').on('change', selectAllRepositories);
+    $('.select-repository').on('change', updateRefreshSelectedButton);
+    $('.refresh-selected-btn').on('click', refreshSelectedRepositories);
+});
+
+
+/**
+ * Select or unselect all the repositories
+ */
+selectAllRepositories = function(event) {
+    $('.select-repository').prop('checked', $(this).prop('checked'));
+    updateRefreshSelectedButton();
+};
+
+
+/**
+ * Enable the refresh button when at least one repository is selected
+ */
+updateRefreshSelectedButton = function() {
+    $('.refresh-selected-btn').prop('disabled', $('.select-repository:checked').length === 0);
+};
+
+
+/**
+ * Refresh, concurrently, the tokens of the selected repositories
+ */
+refreshSelectedRepositories = function(event) {
+    var repositoryIds = $('.select-repository:checked').map(function() {
+        return $(this).val();
+    }).get();
+    var $button = $(this);
+    var icon = $button.find("i").attr("class");
+
+    $button.prop('disabled', true);
+    $button.find("i").attr("class", "fas fa-spinner fa-spin");
+    $.ajax({
+        url : refreshSelectedRepositoriesUrl,
+        type : "POST",
+        dataType: "json",
+        data : {
+            'ids': repositoryIds
+        },
+        success: function(data){
+            var errors = data.results.filter(function(result) {
+                return result.status !== "success";
+            }).map(function(result) {
+                return result.name + ": " + result.message;
+            });
+            if (errors.length > 0) {
+                alert("Unable to refresh the following tokens:\n" + errors.join("\n"));
+            }
+            location.reload();
+        },
+        error:function(data){
+            $button.find("i").attr("class", icon);
+            updateRefreshSelectedButton();
+            if (data.responseText != ""){
+                alert(data.responseText);
+            }
+        }
+    });
+};
@@ -0,0 +1 @@
+var refreshSelectedRepositoriesUrl = "{% url 'core-admin:core_federated_search_app_repositories_refresh_all' %}";
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""Federated Search App tasks"""
+
+import logging
+
+from celery import shared_task
+
+import core_federated_search_app.components.instance.api as instance_api
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_expiring_tokens():
+    """Periodically refresh the instance tokens that are about to expire.
+
+    Returns:
+
+    """
+    try:
+        for result in instance_api.refresh_expiring_tokens():
+            logger.info(
+                "Periodic task: refresh token of %s: %s.",
+                result["name"],
+                result["status"],
+            )
+    except Exception as exception:
+        logger.error(
+            "An error occurred while refreshing instance tokens (%s).",
+            str(exception),
+        )
@@ -0,0 +1 @@
+"""Proxy of the blobs hosted by the remote instances"""
@@ -0,0 +1,248 @@
+"""Streaming ZIP archives of remote blobs
+
+The archive is written to an unseekable sink and sent chunk by chunk: each
+entry is compressed while its blob streams in through the blob proxy, so
+memory use does not depend on the number or the size of the blobs. The first
+BUFFER_MAX_SIZE bytes of a blob are buffered before its entry is opened: a
+small blob failing is left out of the archive, a larger one failing once its
+entry was sent is kept truncated, and reported as such.
+"""
+
+import io
+import logging
+import posixpath
+import re
+import time
+import zipfile
+from itertools import chain
+from urllib.parse import unquote, urlsplit
+
+from django.http import StreamingHttpResponse
+
+from core_federated_search_app.utils.blob_proxy import proxy as blob_proxy
+
+logger = logging.getLogger(__name__)
+
+# content types stored without compression (already compressed)
+COMPRESSED_CONTENT_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-bzip2",
+    "application/x-xz",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/vnd.rar",
+    "application/zstd",
+)
+
+# file extensions stored without compression (already compressed)
+COMPRESSED_EXTENSIONS = (
+    ".zip",
+    ".gz",
+    ".tgz",
+    ".bz2",
+    ".xz",
+    ".7z",
+    ".rar",
+    ".zst",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".webp",
+    ".mp3",
+    ".mp4",
+)
+
+ERRORS_ENTRY_NAME = "errors.txt"
+
+# size of the beginning of a blob buffered before its entry is opened, in
+# bytes
+BUFFER_MAX_SIZE = 1024 * 1024
+
+_FILENAME_PATTERN = re.compile(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', re.I)
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable stream collecting the bytes written by `zipfile`"""
+
+    def __init__(self):
+        """Initialize an empty sink."""
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self):
+        """Return and forget the bytes written so far.
+
+        Returns:
+
+        """
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def get_zip_response(urls, filename):
+    """Stream a ZIP archive of the blobs at the given urls.
+
+    Args:
+        urls:
+        filename: name of the archive
+
+    Returns:
+        StreamingHttpResponse
+
+    """
+    response = StreamingHttpResponse(
+        iter_zip_archive(urls), content_type="application/zip"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def iter_zip_archive(urls):
+    """Iterate over the bytes of a ZIP archive of the blobs.
+
+    Blobs that cannot be downloaded are listed in an `errors.txt` entry,
+    with the names of the entries truncated by a failed download.
+
+    Args:
+        urls:
+
+    Returns:
+
+    """
+    sink = _ZipSink()
+    entry_names = set()
+    errors = []
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as archive:
+        for url in urls:
+            try:
+                blob_response = blob_proxy.get_blob_response(
+                    url, offload=False
+                )
+            except Exception as exception:
+                errors.append(f"{url}: {str(exception)}")
+                continue
+            name = None
+            try:
+                if blob_response.status_code != 200:
+                    errors.append(
+                        f"{url}: remote responded with status "
+                        f"{blob_response.status_code}"
+                    )
+                    continue
+                chunks = iter(blob_response.streaming_content)
+                buffered_chunks = _read_buffer(chunks, BUFFER_MAX_SIZE)
+                name = get_entry_name(url, blob_response, entry_names)
+                entry_info = zipfile.ZipInfo(name, time.localtime()[:6])
+                entry_info.compress_type = get_compress_type(
+                    name, blob_response.get("Content-Type", "")
+                )
+                with archive.open(entry_info, "w", force_zip64=True) as entry:
+                    for chunk in chain(buffered_chunks, chunks):
+                        entry.write(chunk)
+                        data = sink.pop()
+                        if data:
+                            yield data
+            except Exception as exception:
+                logger.warning(
+                    "Unable to add %s to the archive: %s", url, str(exception)
+                )
+                if name is None:
+                    errors.append(f"{url}: {str(exception)}")
+                else:
+                    errors.append(
+                        f"{url}: {name} is truncated: {str(exception)}"
+                    )
+            finally:
+                blob_response.close()
+            yield sink.pop()
+
+        if errors:
+            archive.writestr(ERRORS_ENTRY_NAME, "\n".join(errors) + "\n")
+    yield sink.pop()
+
+
+def _read_buffer(chunks, max_size):
+    """Read the first chunks of a content, until they exceed a size.
+
+    Args:
+        chunks: content iterator
+        max_size: number of bytes
+
+    Returns:
+        list of chunks
+
+    """
+    buffered_chunks = []
+    size = 0
+    for chunk in chunks:
+        buffered_chunks.append(chunk)
+        size += len(chunk)
+        if size > max_size:
+            break
+    return buffered_chunks
+
+
+def get_entry_name(url, blob_response, entry_names):
+    """Return a unique archive entry name for a blob.
+
+    The name comes from the Content-Disposition header, or from the last
+    segment of the url path.
+
+    Args:
+        url:
+        blob_response:
+        entry_names: names already used, updated with the returned name
+
+    Returns:
+
+    """
+    match = _FILENAME_PATTERN.search(
+        blob_response.get("Content-Disposition", "")
+    )
+    name = unquote(match.group(1)) if match else ""
+    if not name:
+        name = unquote(posixpath.basename(urlsplit(url).path.rstrip("/")))
+    # never let an entry escape the archive root
+    name = posixpath.basename(name.replace("\\", "/")).strip() or "blob"
+
+    root, extension = posixpath.splitext(name)
+    unique_name = name
+    index = 1
+    while unique_name in entry_names or unique_name == ERRORS_ENTRY_NAME:
+        index += 1
+        unique_name = f"{root} ({index}){extension}"
+    entry_names.add(unique_name)
+    return unique_name
+
+
+def get_compress_type(name, content_type):
+    """Return the compression method of an archive entry.
+
+    Already compressed blobs are stored as is, the others are deflated.
+
+    Args:
+        name:
+        content_type:
+
+    Returns:
+
+    """
+    if content_type.lower().startswith(COMPRESSED_CONTENT_TYPES):
+        return zipfile.ZIP_STORED
+    if name.lower().endswith(COMPRESSED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
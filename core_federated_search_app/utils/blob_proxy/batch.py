@@ -0,0 +1,101 @@
+"""Batch download of remote blobs"""
+
+import logging
+
+import core_federated_search_app.components.instance.api as instance_api
+from core_federated_search_app.settings import (
+    BLOB_BATCH_MAX_WORKERS,
+    BLOB_BATCH_MAX_WORKERS_PER_INSTANCE,
+)
+from core_federated_search_app.utils.concurrency import iter_as_completed
+
+logger = logging.getLogger(__name__)
+
+
+class BlobFetchResult:
+    """Outcome of the download of a blob"""
+
+    __slots__ = ("url", "instance", "response", "error")
+
+    def __init__(self, url, instance=None, response=None, error=None):
+        """Blob download outcome.
+
+        Args:
+            url: url of the blob
+            instance: instance hosting the blob, None if unknown
+            response: `requests` response, None if the request failed
+            error: error message, None on success
+        """
+        self.url = url
+        self.instance = instance
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self):
+        """Check if the blob was downloaded."""
+        return self.error is None
+
+
+def fetch_blobs(
+    urls, stream=False, max_workers=None, max_workers_per_instance=None
+):
+    """Download blobs concurrently, yielding each result as it completes.
+
+    Each url is resolved to its instance first. Errors (unknown instance,
+    network failure, error status) are reported in the result of the url
+    instead of interrupting the batch.
+
+    Args:
+        urls:
+        stream: if True, the responses are returned unread and the caller
+            must close them
+        max_workers: BLOB_BATCH_MAX_WORKERS by default
+        max_workers_per_instance: BLOB_BATCH_MAX_WORKERS_PER_INSTANCE by
+            default
+
+    Returns:
+        generator of BlobFetchResult
+
+    """
+    resolved_urls = []
+    for url in urls:
+        try:
+            resolved_urls.append((url, instance_api.get_by_url(url)))
+        except Exception as exception:
+            yield BlobFetchResult(url, error=str(exception))
+
+    def _fetch(resolved_url):
+        return instance_api.get_blob_response_from_url(
+            None, resolved_url[0], stream=stream
+        )
+
+    for task_result in iter_as_completed(
+        _fetch,
+        resolved_urls,
+        max_workers=(
+            BLOB_BATCH_MAX_WORKERS if max_workers is None else max_workers
+        ),
+        key=lambda resolved_url: resolved_url[1].pk,
+        max_workers_per_key=(
+            BLOB_BATCH_MAX_WORKERS_PER_INSTANCE
+            if max_workers_per_instance is None
+            else max_workers_per_instance
+        ),
+    ):
+        url, instance = task_result.item
+        if task_result.exception is not None:
+            logger.warning(
+                "Unable to download %s: %s", url, str(task_result.exception)
+            )
+            yield BlobFetchResult(
+                url, instance, error=str(task_result.exception)
+            )
+            continue
+        response = task_result.result
+        error = (
+            None
+            if response.status_code < 400
+            else f"Remote responded with status {response.status_code}."
+        )
+        yield BlobFetchResult(url, instance, response, error)
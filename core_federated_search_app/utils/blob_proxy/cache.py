@@ -0,0 +1,492 @@
+"""On-disk cache of the remote blobs
+
+Each entry is a content file and a JSON metadata file named after the hash of
+its key. The metadata file is touched on every hit: entries are evicted in
+least recently used order once the cache exceeds its maximum size. Entries are
+written to a temporary file first and moved in place once complete, so
+readers never see a partial blob.
+
+Each process keeps an index of the entries and their total size, so that
+storing a blob does not list the directory. The directory is scanned again
+when the index exceeds the maximum size, or every RESCAN_INTERVAL seconds, to
+account for the entries stored or evicted by the other processes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from core_federated_search_app.settings import (
+    BLOB_CACHE_DIRECTORY,
+    BLOB_CACHE_MAX_ENTRY_SIZE,
+    BLOB_CACHE_MAX_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_KEY_PREFIX = "core_federated_search_app:blob_cache:"
+
+# number of seconds after which the directory is scanned again
+RESCAN_INTERVAL = 60
+
+# counters exposed by `BlobCache.get_stats`
+STATS = (
+    "hits",
+    "misses",
+    "revalidations",
+    "stores",
+    "evictions",
+    "coalesced",
+)
+
+# remote headers kept with a cached blob
+CACHED_HEADERS = (
+    "Content-Type",
+    "Content-Disposition",
+    "Content-Encoding",
+    "ETag",
+    "Last-Modified",
+)
+
+
+class BlobCacheEntry:
+    """Cached blob"""
+
+    __slots__ = ("path", "headers", "size")
+
+    def __init__(self, path, headers, size):
+        """Cached blob.
+
+        Args:
+            path: path of the content file
+            headers: remote headers kept with the blob
+            size: size of the content, in bytes
+        """
+        self.path = path
+        self.headers = headers
+        self.size = size
+
+    def get_validators(self):
+        """Return the conditional request headers revalidating the entry.
+
+        Returns:
+            dict
+
+        """
+        validators = {}
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+        return validators
+
+    def open(self):
+        """Open the content of the entry.
+
+        Returns:
+            binary file
+
+        """
+        return open(self.path, "rb")
+
+
+class BlobCacheWriter:
+    """Content of a blob being written to the cache"""
+
+    def __init__(self, blob_cache, key, headers, transfer=None):
+        """Open a temporary file for the blob.
+
+        Args:
+            blob_cache:
+            key:
+            headers: remote headers of the blob
+            transfer: SharedBlobTransfer following the writes, optional
+        """
+        self.blob_cache = blob_cache
+        self.key = key
+        self.headers = headers
+        self.size = 0
+        self.transfer = transfer
+        self.oversized = False
+        self._file = tempfile.NamedTemporaryFile(
+            dir=blob_cache.tmp_directory, delete=False
+        )
+
+    @property
+    def path(self):
+        """Path of the temporary file."""
+        return self._file.name if self._file is not None else None
+
+    def has_followers(self):
+        """Check if other requests read the blob while it is written.
+
+        Returns:
+
+        """
+        return self.transfer is not None and self.transfer.has_followers()
+
+    def write(self, chunk):
+        """Append a chunk to the blob, giving up once it is too large.
+
+        A blob larger than the maximum entry size is not cached, and its
+        download is no longer shared: new requests download it themselves.
+        The requests already following the download still read it to the end
+        from the temporary file, which is dropped once complete.
+
+        Args:
+            chunk:
+
+        Returns:
+
+        """
+        if self._file is None:
+            return
+        self.size += len(chunk)
+        if self.size > self.blob_cache.max_entry_size and not self.oversized:
+            self.oversized = True
+            if self.transfer is not None:
+                self.transfer.abandon()
+            if not self.has_followers():
+                self.discard()
+                return
+        self._file.write(chunk)
+        if self.transfer is not None:
+            # followers read the file: the chunk must reach it
+            self._file.flush()
+            self.transfer.progress(self.size)
+
+    def commit(self):
+        """Add the complete blob to the cache, unless it is too large.
+
+        Returns:
+
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        if self.oversized:
+            # the followers read the file through their open handles
+            _remove(self._file.name)
+        else:
+            self.blob_cache.store(self.key, self._file.name, self.headers)
+        self._file = None
+        if self.transfer is not None:
+            self.transfer.finish()
+
+    def discard(self):
+        """Drop the blob, if not committed.
+
+        Returns:
+
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        _remove(self._file.name)
+        self._file = None
+        if self.transfer is not None:
+            self.transfer.fail()
+
+
+class BlobCache:
+    """Size-capped, LRU-evicted on-disk cache of the remote blobs"""
+
+    def __init__(self, directory, max_size, max_entry_size):
+        """Initialize the cache in the given directory.
+
+        Args:
+            directory:
+            max_size: maximum size of the cache, in bytes
+            max_entry_size: maximum size of a cached blob, in bytes
+        """
+        self.directory = directory
+        self.tmp_directory = os.path.join(directory, "tmp")
+        self.max_size = int(max_size)
+        self.max_entry_size = int(max_entry_size)
+        self._lock = threading.Lock()
+        os.makedirs(self.tmp_directory, exist_ok=True)
+        # size of the entries, least recently used first
+        self._entries = OrderedDict()
+        self._size = 0
+        self._scanned_at = None
+        with self._lock:
+            self._scan()
+
+    @staticmethod
+    def get_key(instance, url):
+        """Return the cache key of a blob.
+
+        Args:
+            instance: instance hosting the blob
+            url: normalized url of the blob
+
+        Returns:
+
+        """
+        return hashlib.sha256(f"{instance.pk}:{url}".encode()).hexdigest()
+
+    def get(self, key):
+        """Return the cached blob, None if not cached.
+
+        Args:
+            key:
+
+        Returns:
+            BlobCacheEntry
+
+        """
+        meta_path, content_path = self._get_paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as meta_file:
+                headers = json.load(meta_file)
+            size = os.path.getsize(content_path)
+        except (OSError, ValueError):
+            with self._lock:
+                self._size -= self._entries.pop(key, 0)
+            return None
+        return BlobCacheEntry(content_path, headers, size)
+
+    def touch(self, key):
+        """Mark the blob as recently used.
+
+        Args:
+            key:
+
+        Returns:
+
+        """
+        try:
+            os.utime(self._get_paths(key)[0])
+        except OSError:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def open_writer(self, key, headers, transfer=None):
+        """Start writing a blob to the cache.
+
+        Args:
+            key:
+            headers: remote headers of the blob
+            transfer: SharedBlobTransfer following the writes, optional
+
+        Returns:
+            BlobCacheWriter
+
+        """
+        return BlobCacheWriter(
+            self,
+            key,
+            {
+                header: headers[header]
+                for header in CACHED_HEADERS
+                if header in headers
+            },
+            transfer=transfer,
+        )
+
+    def store(self, key, content_tmp_path, headers):
+        """Move a complete blob into the cache, then evict old entries.
+
+        Args:
+            key:
+            content_tmp_path: temporary file holding the content
+            headers: headers kept with the blob
+
+        Returns:
+
+        """
+        meta_path, content_path = self._get_paths(key)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.tmp_directory, delete=False, encoding="utf-8"
+        ) as meta_file:
+            json.dump(headers, meta_file)
+        size = os.path.getsize(content_tmp_path)
+        os.replace(content_tmp_path, content_path)
+        os.replace(meta_file.name, meta_path)
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+        self.increment_stat("stores")
+        self.evict()
+
+    def delete(self, key):
+        """Remove a blob from the cache.
+
+        Args:
+            key:
+
+        Returns:
+
+        """
+        for path in self._get_paths(key):
+            _remove(path)
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+
+    def evict(self):
+        """Remove the least recently used blobs until the cache fits its
+        maximum size.
+
+        The directory is only scanned if the index exceeds the maximum size,
+        or was not refreshed for RESCAN_INTERVAL seconds.
+
+        Returns:
+
+        """
+        evictions = 0
+        with self._lock:
+            if (
+                self._size <= self.max_size
+                and time.monotonic() - self._scanned_at < RESCAN_INTERVAL
+            ):
+                return
+            self._scan()
+            while self._size > self.max_size and self._entries:
+                key, size = self._entries.popitem(last=False)
+                self._size -= size
+                for path in self._get_paths(key):
+                    _remove(path)
+                evictions += 1
+        for _ in range(evictions):
+            self.increment_stat("evictions")
+
+    def get_usage(self):
+        """Return the number of cached blobs and their total size.
+
+        Returns:
+            dict
+
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self._size,
+                "max_size": self.max_size,
+            }
+
+    def increment_stat(self, name):
+        """Increment a counter shared by all the workers.
+
+        Args:
+            name:
+
+        Returns:
+
+        """
+        stat_key = f"{STATS_CACHE_KEY_PREFIX}{name}"
+        try:
+            cache.incr(stat_key)
+        except ValueError:
+            if not cache.add(stat_key, 1, None):
+                cache.incr(stat_key)
+
+    def get_stats(self):
+        """Return the cache counters and usage.
+
+        Returns:
+            dict
+
+        """
+        stats = {
+            name: cache.get(f"{STATS_CACHE_KEY_PREFIX}{name}", 0)
+            for name in STATS
+        }
+        stats.update(self.get_usage())
+        return stats
+
+    def _scan(self):
+        """Rebuild the index from the cache directory (lock held).
+
+        Returns:
+
+        """
+        self._entries = OrderedDict(
+            (key, size) for _, key, size in sorted(self._list_entries())
+        )
+        self._size = sum(self._entries.values())
+        self._scanned_at = time.monotonic()
+
+    def _list_entries(self):
+        """List the cached blobs.
+
+        Returns:
+            list of (last use, key, size)
+
+        """
+        entries = []
+        with os.scandir(self.directory) as directory_entries:
+            for directory_entry in directory_entries:
+                if not directory_entry.name.endswith(".json"):
+                    continue
+                key = directory_entry.name[: -len(".json")]
+                try:
+                    last_used = directory_entry.stat().st_mtime
+                    size = os.path.getsize(self._get_paths(key)[1])
+                except OSError:
+                    continue
+                entries.append((last_used, key, size))
+        return entries
+
+    def _get_paths(self, key):
+        """Return the metadata and content paths of a blob.
+
+        Args:
+            key:
+
+        Returns:
+
+        """
+        return (
+            os.path.join(self.directory, f"{key}.json"),
+            os.path.join(self.directory, f"{key}.blob"),
+        )
+
+
+_blob_cache = None
+_blob_cache_lock = threading.Lock()
+
+
+def get_blob_cache():
+    """Return the blob cache configured by BLOB_CACHE_DIRECTORY.
+
+    Returns:
+        BlobCache, None if the cache is disabled
+
+    """
+    global _blob_cache
+    if not BLOB_CACHE_DIRECTORY:
+        return None
+    with _blob_cache_lock:
+        if _blob_cache is None:
+            _blob_cache = BlobCache(
+                BLOB_CACHE_DIRECTORY,
+                BLOB_CACHE_MAX_SIZE,
+                BLOB_CACHE_MAX_ENTRY_SIZE,
+            )
+    return _blob_cache
+
+
+def _remove(path):
+    """Remove a file, if it exists.
+
+    Args:
+        path:
+
+    Returns:
+
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as exception:
+        logger.warning("Unable to remove %s: %s", path, str(exception))
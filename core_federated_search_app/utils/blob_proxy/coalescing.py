@@ -0,0 +1,272 @@
+"""Coalescing of identical blob downloads
+
+The first request for a blob that is not cached leads the download: it
+streams the remote content to its client while writing it to the blob cache.
+Identical requests arriving meanwhile follow that download: they read the
+blob cache file as it grows instead of opening their own remote transfer, and
+read the complete cache entry once it is committed.
+
+Downloads are only shared within a process: requests handled by different
+worker processes each download the blob, then find it in the shared on-disk
+cache once it is committed.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BlobTransferError(Exception):
+    """The shared download of a blob failed before it was complete"""
+
+
+class SharedBlobTransfer:
+    """Download of a blob, shared by the leading request and its followers"""
+
+    def __init__(self, on_close=None):
+        """Initialize a transfer waiting for the remote response.
+
+        Args:
+            on_close: called once the transfer is over
+        """
+        self._condition = threading.Condition()
+        self._on_close = on_close
+        self.ready = False
+        self.abandoned = False
+        self.done = False
+        self.failed = False
+        self.path = None
+        self.headers = None
+        self.content_length = None
+        self.size = 0
+        self.followers = 0
+        self.updated = time.monotonic()
+
+    def start(self, path, headers, content_length=None):
+        """Share the download once the remote content is being written.
+
+        Args:
+            path: path of the file the content is written to
+            headers: headers of the blob
+            content_length: remote Content-Length, if known
+
+        Returns:
+
+        """
+        with self._condition:
+            self.path = path
+            self.headers = headers
+            self.content_length = content_length
+            self.ready = True
+            self.updated = time.monotonic()
+            self._condition.notify_all()
+
+    def abandon(self):
+        """Stop sharing the download (e.g. the remote response can not be
+        cached): new followers download the blob themselves, the followers
+        already reading it are not affected.
+
+        Returns:
+
+        """
+        with self._condition:
+            self.abandoned = True
+            self.ready = True
+            self._condition.notify_all()
+        self._close()
+
+    def progress(self, size):
+        """Signal that more content was written.
+
+        Args:
+            size: number of bytes written so far
+
+        Returns:
+
+        """
+        with self._condition:
+            self.size = size
+            self.updated = time.monotonic()
+            self._condition.notify_all()
+
+    def finish(self):
+        """Signal that the whole content was written and committed.
+
+        Returns:
+
+        """
+        with self._condition:
+            self.done = True
+            self._condition.notify_all()
+        self._close()
+
+    def fail(self):
+        """Signal that the download was interrupted.
+
+        Returns:
+
+        """
+        with self._condition:
+            self.failed = True
+            self._condition.notify_all()
+        self._close()
+
+    def is_stale(self, timeout):
+        """Check if the shared download made no progress for too long, e.g.
+        because the leading response was never sent.
+
+        Args:
+            timeout: number of seconds
+
+        Returns:
+
+        """
+        with self._condition:
+            return self.ready and time.monotonic() - self.updated > timeout
+
+    def has_followers(self):
+        """Check if requests are following the download.
+
+        Returns:
+
+        """
+        with self._condition:
+            return self.followers > 0
+
+    def join(self, timeout):
+        """Follow the download, waiting for the remote response.
+
+        Args:
+            timeout: maximum number of seconds to wait
+
+        Returns:
+            True if the download is shared, False if the follower should
+            download the blob itself
+
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.ready, timeout):
+                return False
+            if self.abandoned:
+                return False
+            self.followers += 1
+            return True
+
+    def leave(self):
+        """Stop following the download.
+
+        Returns:
+
+        """
+        with self._condition:
+            self.followers -= 1
+
+    def iter_content(self, file, chunk_size, timeout):
+        """Iterate over the content as it is written, then close the file.
+
+        Args:
+            file: content file, opened for reading
+            chunk_size:
+            timeout: maximum number of seconds to wait for new content
+
+        Returns:
+
+        """
+        position = 0
+        try:
+            while True:
+                with self._condition:
+                    if not self._condition.wait_for(
+                        lambda: self.size > position
+                        or self.done
+                        or self.failed,
+                        timeout,
+                    ):
+                        raise BlobTransferError("Shared download timed out.")
+                    size, failed = self.size, self.failed
+                if size > position:
+                    chunk = file.read(min(chunk_size, size - position))
+                    if not chunk:
+                        raise BlobTransferError("Shared download truncated.")
+                    position += len(chunk)
+                    yield chunk
+                elif failed:
+                    raise BlobTransferError("Shared download failed.")
+                else:
+                    return
+        finally:
+            file.close()
+            self.leave()
+
+    def _close(self):
+        """Call the close callback, once.
+
+        Returns:
+
+        """
+        on_close, self._on_close = self._on_close, None
+        if on_close is not None:
+            on_close(self)
+
+
+class BlobTransferRegistry:
+    """In-flight blob downloads of the process, by key"""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._transfers = {}
+
+    def lead_or_follow(self, key, timeout):
+        """Return the in-flight download of a blob, registering a new one led
+        by the caller if there is none, or if it is stale.
+
+        Args:
+            key:
+            timeout: number of seconds without progress after which a
+                download is stale
+
+        Returns:
+            SharedBlobTransfer, True if the caller leads the download
+
+        """
+        with self._lock:
+            transfer = self._transfers.get(key)
+            if transfer is not None and not transfer.is_stale(timeout):
+                return transfer, False
+            transfer = SharedBlobTransfer(
+                on_close=lambda closed: self._release(key, closed)
+            )
+            self._transfers[key] = transfer
+            return transfer, True
+
+    def is_in_flight(self, key):
+        """Check if a blob is being downloaded.
+
+        Args:
+            key:
+
+        Returns:
+
+        """
+        with self._lock:
+            return key in self._transfers
+
+    def _release(self, key, transfer):
+        """Remove a download that is over.
+
+        Args:
+            key:
+            transfer:
+
+        Returns:
+
+        """
+        with self._lock:
+            if self._transfers.get(key) is transfer:
+                del self._transfers[key]
+
+
+blob_transfers = BlobTransferRegistry()
@@ -0,0 +1,150 @@
+"""HTTP content codings
+
+Compressed remote content is relayed as is to the clients accepting its
+coding, and decoded by the proxy for the others.
+"""
+
+import zlib
+
+# content codings the proxy can decode
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+# value of the Accept-Encoding header sent to the remotes
+UPSTREAM_ACCEPT_ENCODING = ", ".join(SUPPORTED_ENCODINGS)
+
+
+def get_content_encoding(headers):
+    """Return the content coding of a response, if the proxy supports it.
+
+    Args:
+        headers: response headers
+
+    Returns:
+        str, None if the content is not encoded, or with an unsupported (or
+        multiple) codings
+
+    """
+    content_encoding = (headers.get("Content-Encoding") or "").strip().lower()
+    return (
+        content_encoding if content_encoding in SUPPORTED_ENCODINGS else None
+    )
+
+
+def accepts_encoding(accept_encoding, content_encoding):
+    """Check if a client accepts a content coding.
+
+    A missing Accept-Encoding header is read as accepting no coding, so that
+    clients which did not negotiate (e.g. internal callers) receive decoded
+    content.
+
+    Args:
+        accept_encoding: value of the Accept-Encoding request header
+        content_encoding: content coding
+
+    Returns:
+
+    """
+    if not accept_encoding or not content_encoding:
+        return False
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    quality = qualities.get(content_encoding.lower(), qualities.get("*", 0.0))
+    return quality > 0
+
+
+def iter_decoded(chunks, content_encoding):
+    """Decode encoded chunks, then close the chunk iterator.
+
+    Args:
+        chunks: iterator of encoded chunks
+        content_encoding: supported content coding
+
+    Returns:
+
+    """
+    decoder = get_decoder(content_encoding)
+    try:
+        for chunk in chunks:
+            data = decoder.decompress(chunk)
+            if data:
+                yield data
+        data = decoder.flush()
+        if data:
+            yield data
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def get_decoder(content_encoding):
+    """Return a streaming decoder of a content coding.
+
+    Args:
+        content_encoding: supported content coding
+
+    Returns:
+        object with `decompress` and `flush` methods
+
+    """
+    if content_encoding == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if content_encoding == "deflate":
+        return _DeflateDecoder()
+    raise ValueError(f"Unsupported content coding: {content_encoding}.")
+
+
+class _DeflateDecoder:
+    """Decoder of the deflate coding
+
+    The coding is zlib-wrapped deflate, but some servers send raw deflate:
+    the raw format is tried if the first chunks are not zlib-wrapped.
+    """
+
+    def __init__(self):
+        """Initialize a decoder of zlib-wrapped deflate."""
+        self._decoder = zlib.decompressobj()
+        self._first_data = b""
+
+    def decompress(self, data):
+        """Decode a chunk.
+
+        Args:
+            data:
+
+        Returns:
+
+        """
+        if self._first_data is None:
+            return self._decoder.decompress(data)
+        self._first_data += data
+        try:
+            decompressed = self._decoder.decompress(data)
+        except zlib.error:
+            first_data, self._first_data = self._first_data, None
+            self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decoder.decompress(first_data)
+        if decompressed:
+            self._first_data = None
+        return decompressed
+
+    def flush(self):
+        """Return the rest of the decoded content.
+
+        Returns:
+
+        """
+        return self._decoder.flush()
@@ -0,0 +1,128 @@
+"""Metadata of the remote blobs
+
+The size, type and validators of a blob are read from the blob cache when it
+holds the blob, or from the headers of a HEAD request to its remote instance.
+The blob content is never downloaded.
+"""
+
+import logging
+
+import core_federated_search_app.components.instance.api as instance_api
+from core_federated_search_app.settings import (
+    BLOB_BATCH_MAX_WORKERS,
+    BLOB_BATCH_MAX_WORKERS_PER_INSTANCE,
+)
+from core_federated_search_app.utils.blob_proxy.cache import (
+    BlobCache,
+    get_blob_cache,
+)
+from core_federated_search_app.utils.blob_proxy.proxy import get_cache_url
+from core_federated_search_app.utils.concurrency import iter_as_completed
+
+logger = logging.getLogger(__name__)
+
+
+def get_blobs_metadata(urls, max_workers=None, max_workers_per_instance=None):
+    """Return the metadata of several blobs, requested concurrently.
+
+    Errors (unknown instance, network failure, error status) are reported in
+    the metadata of the url instead of interrupting the batch.
+
+    Args:
+        urls:
+        max_workers: BLOB_BATCH_MAX_WORKERS by default
+        max_workers_per_instance: BLOB_BATCH_MAX_WORKERS_PER_INSTANCE by
+            default
+
+    Returns:
+        list of dict, in the order of the urls
+
+    """
+    metadata = {}
+    resolved_urls = []
+    for url in dict.fromkeys(urls):
+        try:
+            resolved_urls.append((url, instance_api.get_by_url(url)))
+        except Exception as exception:
+            metadata[url] = {"url": url, "error": str(exception)}
+
+    for task_result in iter_as_completed(
+        lambda resolved_url: get_blob_metadata(*resolved_url),
+        resolved_urls,
+        max_workers=(
+            BLOB_BATCH_MAX_WORKERS if max_workers is None else max_workers
+        ),
+        key=lambda resolved_url: resolved_url[1].pk,
+        max_workers_per_key=(
+            BLOB_BATCH_MAX_WORKERS_PER_INSTANCE
+            if max_workers_per_instance is None
+            else max_workers_per_instance
+        ),
+    ):
+        url = task_result.item[0]
+        if task_result.exception is not None:
+            logger.warning(
+                "Unable to get the metadata of %s: %s",
+                url,
+                str(task_result.exception),
+            )
+            metadata[url] = {"url": url, "error": str(task_result.exception)}
+        else:
+            metadata[url] = task_result.result
+    return [metadata[url] for url in urls]
+
+
+def get_blob_metadata(url, instance=None):
+    """Return the metadata of a blob.
+
+    Args:
+        url:
+        instance: instance hosting the blob, resolved from the url if None
+
+    Returns:
+        dict
+
+    """
+    blob_cache = get_blob_cache()
+    if blob_cache is not None:
+        if instance is None:
+            instance = instance_api.get_by_url(url)
+        entry = blob_cache.get(BlobCache.get_key(instance, get_cache_url(url)))
+        if entry is not None:
+            return _get_metadata(url, entry.headers, entry.size, cached=True)
+
+    response = instance_api.get_blob_head_response_from_url(url)
+    response.close()
+    if response.status_code >= 400:
+        return {
+            "url": url,
+            "error": f"Remote responded with status {response.status_code}.",
+        }
+    try:
+        size = int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        size = None
+    return _get_metadata(url, response.headers, size, cached=False)
+
+
+def _get_metadata(url, headers, size, cached):
+    """Return the metadata of a blob from its headers.
+
+    Args:
+        url:
+        headers:
+        size: size in bytes, None if unknown
+        cached: True if read from the blob cache
+
+    Returns:
+        dict
+
+    """
+    return {
+        "url": url,
+        "size": size,
+        "content_type": headers.get("Content-Type"),
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "cached": cached,
+    }
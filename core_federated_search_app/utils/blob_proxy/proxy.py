@@ -0,0 +1,258 @@
+"""Blob proxy
+
+Serve the blobs of the remote instances, from the blob cache when the remote
+confirms the cached copy is still valid. Identical requests for a blob that is
+not cached share a single remote download. Compressed blobs are downloaded and
+cached compressed, and only decoded for the clients not accepting their
+coding.
+"""
+
+import logging
+
+import core_federated_search_app.components.instance.api as instance_api
+from core_federated_search_app.settings import BLOB_COALESCING_TIMEOUT
+from core_federated_search_app.utils.blob_proxy.cache import (
+    BlobCache,
+    get_blob_cache,
+)
+from core_federated_search_app.utils.blob_proxy.coalescing import (
+    blob_transfers,
+)
+from core_federated_search_app.utils.blob_proxy.encoding import (
+    SUPPORTED_ENCODINGS,
+    UPSTREAM_ACCEPT_ENCODING,
+    accepts_encoding,
+    get_content_encoding,
+)
+from core_federated_search_app.utils.blob_proxy.ranges import (
+    RANGE_REQUEST_HEADERS,
+)
+from core_federated_search_app.utils.blob_proxy.response import (
+    get_cached_response,
+    get_shared_response,
+    get_streaming_response,
+)
+from core_federated_search_app.utils.url import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+def get_blob_response(url, request_headers=None, offload=True):
+    """Return the response sending the blob at the given url to the client.
+
+    Range requests are forwarded to the remote, or served from the blob cache
+    when it holds the whole blob.
+
+    Args:
+        url: url of the blob on a remote instance
+        request_headers: headers of the client request
+        offload: if False, cached blobs are never sent by the web server,
+            e.g. when the response content is read by the proxy itself
+
+    Returns:
+        HttpResponse
+
+    """
+    range_headers = {
+        header: request_headers[header]
+        for header in RANGE_REQUEST_HEADERS
+        if request_headers and header in request_headers
+    }
+    accept_encoding = (
+        request_headers.get("Accept-Encoding") if request_headers else None
+    )
+    blob_cache = get_blob_cache()
+    if blob_cache is None:
+        return get_streaming_response(
+            instance_api.get_blob_response_from_url(
+                None,
+                url,
+                stream=True,
+                headers=_get_upstream_headers(range_headers, accept_encoding),
+            ),
+            accept_encoding=accept_encoding,
+        )
+
+    instance = instance_api.get_by_url(url)
+    key = BlobCache.get_key(instance, get_cache_url(url))
+    entry = blob_cache.get(key)
+    transfer = None
+    if entry is None and not range_headers:
+        transfer, is_leader = blob_transfers.lead_or_follow(
+            key, BLOB_COALESCING_TIMEOUT
+        )
+        if not is_leader:
+            response = _get_coalesced_response(
+                blob_cache, key, transfer, accept_encoding, offload
+            )
+            if response is not None:
+                blob_cache.increment_stat("coalesced")
+                return response
+            transfer = None
+
+    if entry is None:
+        blob_cache.increment_stat("misses")
+        # only the requested range is downloaded, and is not cached
+        upstream_headers = _get_upstream_headers(
+            range_headers, accept_encoding
+        )
+    else:
+        blob_cache.increment_stat("revalidations")
+        upstream_headers = _get_upstream_headers(
+            entry.get_validators(), accept_encoding
+        )
+
+    writer = None
+    try:
+        upstream_response = instance_api.get_blob_response_from_url(
+            None, url, stream=True, headers=upstream_headers
+        )
+
+        # the cached copy is still valid
+        if entry is not None and upstream_response.status_code == 304:
+            upstream_response.close()
+            blob_cache.touch(key)
+            blob_cache.increment_stat("hits")
+            return get_cached_response(
+                entry,
+                range_headers.get("Range"),
+                range_headers.get("If-Range"),
+                accept_encoding,
+                offload,
+            )
+
+        if upstream_response.status_code == 200:
+            if is_cacheable(upstream_response, blob_cache.max_entry_size):
+                writer = blob_cache.open_writer(
+                    key, upstream_response.headers, transfer=transfer
+                )
+            elif entry is not None:
+                blob_cache.delete(key)
+    finally:
+        if transfer is not None:
+            if writer is None:
+                transfer.abandon()
+            else:
+                transfer.start(
+                    writer.path,
+                    writer.headers,
+                    upstream_response.headers.get("Content-Length"),
+                )
+    return get_streaming_response(
+        upstream_response, writer=writer, accept_encoding=accept_encoding
+    )
+
+
+def _get_coalesced_response(
+    blob_cache, key, transfer, accept_encoding, offload
+):
+    """Return the response following the download of a blob by another
+    request, None if the download is not shared.
+
+    Args:
+        blob_cache:
+        key:
+        transfer: SharedBlobTransfer led by another request
+        accept_encoding: value of the Accept-Encoding request header
+        offload: if False, cached blobs are never sent by the web server
+
+    Returns:
+        HttpResponse
+
+    """
+    if not transfer.join(BLOB_COALESCING_TIMEOUT):
+        return None
+    try:
+        file = open(transfer.path, "rb")
+    except OSError:
+        # the download is over: the blob was committed, or dropped
+        transfer.leave()
+        entry = blob_cache.get(key)
+        return (
+            get_cached_response(
+                entry, accept_encoding=accept_encoding, offload=offload
+            )
+            if entry is not None
+            else None
+        )
+    return get_shared_response(
+        transfer,
+        file,
+        BLOB_COALESCING_TIMEOUT,
+        accept_encoding=accept_encoding,
+    )
+
+
+def _get_upstream_headers(headers, accept_encoding):
+    """Return the headers of a request to the remote, with the content
+    codings it may use.
+
+    Whole blobs are requested with any coding the proxy can decode. A range
+    of a compressed blob is only meaningful in its compressed form: ranges are
+    requested with the codings the client accepts, so they are relayed as is.
+
+    Args:
+        headers: range or conditional request headers
+        accept_encoding: value of the Accept-Encoding request header
+
+    Returns:
+        dict
+
+    """
+    upstream_headers = dict(headers)
+    if "Range" in headers:
+        upstream_headers["Accept-Encoding"] = ", ".join(
+            [
+                content_encoding
+                for content_encoding in SUPPORTED_ENCODINGS
+                if accepts_encoding(accept_encoding, content_encoding)
+            ]
+            or ["identity"]
+        )
+    else:
+        upstream_headers["Accept-Encoding"] = UPSTREAM_ACCEPT_ENCODING
+    return upstream_headers
+
+
+def get_cache_url(url):
+    """Return the url identifying a blob in the cache.
+
+    Args:
+        url:
+
+    Returns:
+
+    """
+    query = url.partition("?")[2].partition("#")[0]
+    return (
+        f"{normalize_url(url)}?{query}" if query else str(normalize_url(url))
+    )
+
+
+def is_cacheable(upstream_response, max_entry_size):
+    """Check if a remote response can be stored in the blob cache.
+
+    The response needs a validator (ETag or Last-Modified) so that the cached
+    copy can be revalidated, must not forbid storage, must be encoded with a
+    coding the proxy can decode, if any, and must fit the cache.
+
+    Args:
+        upstream_response:
+        max_entry_size:
+
+    Returns:
+
+    """
+    headers = upstream_response.headers
+    if "ETag" not in headers and "Last-Modified" not in headers:
+        return False
+    if "Content-Encoding" in headers and get_content_encoding(headers) is None:
+        # the content can only be read decoded: it would not match the
+        # cached headers
+        return False
+    if "no-store" in headers.get("Cache-Control", "").lower():
+        return False
+    try:
+        return int(headers.get("Content-Length", 0)) <= max_entry_size
+    except ValueError:
+        return True
@@ -0,0 +1,64 @@
+"""HTTP range requests"""
+
+import re
+
+# request headers forwarded to the remote for range requests
+RANGE_REQUEST_HEADERS = ("Range", "If-Range")
+
+_BYTE_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    """Requested range is outside the blob"""
+
+
+def parse_range_header(range_header, size):
+    """Return the byte range requested on a blob of the given size.
+
+    Only single byte ranges are supported: other ranges are ignored, and the
+    whole blob is sent, as allowed by RFC 9110.
+
+    Args:
+        range_header: value of the Range header
+        size: size of the blob, in bytes
+
+    Returns:
+        (first byte, last byte), None if the range is ignored
+
+    """
+    match = _BYTE_RANGE_PATTERN.match((range_header or "").replace(" ", ""))
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if first and last and int(last) < int(first):
+        # syntactically invalid range: ignored
+        return None
+    if not first:
+        # suffix range: last bytes of the blob
+        suffix_length = int(last)
+        if suffix_length == 0 or size == 0:
+            raise RangeNotSatisfiable(range_header)
+        return max(0, size - suffix_length), size - 1
+    if int(first) >= size:
+        raise RangeNotSatisfiable(range_header)
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+def is_if_range_satisfied(if_range, headers):
+    """Check if the If-Range condition matches the current blob.
+
+    Args:
+        if_range: value of the If-Range header, None if absent
+        headers: validators of the blob (ETag, Last-Modified)
+
+    Returns:
+
+    """
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        # strong comparison: weak etags never match
+        return headers.get("ETag") == if_range
+    return headers.get("Last-Modified") == if_range
@@ -0,0 +1,317 @@
+"""Responses of the blob proxy"""
+
+import logging
+import os
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+from core_federated_search_app.settings import (
+    BLOB_CACHE_OFFLOAD,
+    BLOB_CACHE_OFFLOAD_LOCATION,
+    BLOB_PROXY_CHUNK_SIZE,
+)
+from core_federated_search_app.utils.blob_proxy.encoding import (
+    accepts_encoding,
+    get_content_encoding,
+    iter_decoded,
+)
+from core_federated_search_app.utils.blob_proxy.ranges import (
+    RangeNotSatisfiable,
+    is_if_range_satisfied,
+    parse_range_header,
+)
+
+logger = logging.getLogger(__name__)
+
+# headers of the remote response forwarded to the client
+FORWARDED_HEADERS = (
+    "Content-Type",
+    "Content-Length",
+    "Content-Disposition",
+    "Content-Range",
+    "Accept-Ranges",
+)
+
+# offload modes of the cached blobs, with the header sent to the web server
+OFFLOAD_HEADERS = {
+    "x-accel-redirect": "X-Accel-Redirect",
+    "x-sendfile": "X-Sendfile",
+}
+
+
+def get_streaming_response(
+    upstream_response, chunk_size=None, writer=None, accept_encoding=None
+):
+    """Stream a remote response to the client.
+
+    The remote content is read chunk by chunk while it is sent, so memory use
+    does not depend on the blob size. The remote connection is closed once the
+    content is sent, or as soon as the client disconnects. Compressed content
+    is relayed as is if the client accepts its coding, and decoded otherwise;
+    the cache writer always receives the content as sent by the remote.
+
+    Args:
+        upstream_response: `requests` response, sent with `stream=True`
+        chunk_size: BLOB_PROXY_CHUNK_SIZE by default
+        writer: blob cache writer receiving a copy of the content
+        accept_encoding: value of the Accept-Encoding request header
+
+    Returns:
+        StreamingHttpResponse
+
+    """
+    chunk_size = chunk_size or BLOB_PROXY_CHUNK_SIZE
+    content_encoding = get_content_encoding(upstream_response.headers)
+    if content_encoding is None:
+        content = iter_upstream_content(upstream_response, chunk_size, writer)
+    else:
+        content = iter_upstream_content(
+            upstream_response, chunk_size, writer, decode_content=False
+        )
+        if not accepts_encoding(accept_encoding, content_encoding):
+            content = iter_decoded(content, content_encoding)
+            content_encoding = None
+
+    response = StreamingHttpResponse(
+        content, status=upstream_response.status_code
+    )
+    for header in FORWARDED_HEADERS:
+        if header in upstream_response.headers:
+            response[header] = upstream_response.headers[header]
+    if "Content-Encoding" in upstream_response.headers:
+        response["Vary"] = "Accept-Encoding"
+        if content_encoding is None:
+            # the content is decoded while streamed: the remote length is
+            # wrong
+            del response["Content-Length"]
+        else:
+            response["Content-Encoding"] = content_encoding
+    return response
+
+
+def get_cached_response(
+    entry, range_header=None, if_range=None, accept_encoding=None, offload=True
+):
+    """Send a blob, or the requested range of a blob, from the blob cache.
+
+    Whole blobs are sent by the web server when BLOB_CACHE_OFFLOAD is set,
+    unless the response content is read by the proxy itself. Blobs cached
+    compressed are always sent by Django: nginx drops the Content-Encoding
+    header on an internal redirect. They are decoded for the clients not
+    accepting their coding, and are then sent whole.
+
+    Args:
+        entry: BlobCacheEntry
+        range_header: value of the Range request header
+        if_range: value of the If-Range request header
+        accept_encoding: value of the Accept-Encoding request header
+        offload: if False, the blob is always sent by Django
+
+    Returns:
+        HttpResponse
+
+    """
+    content_encoding = entry.headers.get("Content-Encoding")
+    if content_encoding and not accepts_encoding(
+        accept_encoding, content_encoding
+    ):
+        response = StreamingHttpResponse(
+            iter_decoded(
+                iter_file_range(entry.open(), 0, entry.size),
+                get_content_encoding(entry.headers),
+            )
+        )
+        for header, value in entry.headers.items():
+            if header != "Content-Encoding":
+                response[header] = value
+        response["Vary"] = "Accept-Encoding"
+        return response
+
+    byte_range = None
+    if range_header and is_if_range_satisfied(if_range, entry.headers):
+        try:
+            byte_range = parse_range_header(range_header, entry.size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{entry.size}"
+            return response
+
+    if (
+        byte_range is None
+        and offload
+        and BLOB_CACHE_OFFLOAD
+        and not content_encoding
+    ):
+        response = get_offload_response(entry, BLOB_CACHE_OFFLOAD)
+    elif byte_range is None:
+        response = FileResponse(entry.open())
+    else:
+        first, last = byte_range
+        response = StreamingHttpResponse(
+            iter_file_range(entry.open(), first, last - first + 1),
+            status=206,
+        )
+        response["Content-Length"] = str(last - first + 1)
+        response["Content-Range"] = f"bytes {first}-{last}/{entry.size}"
+    for header, value in entry.headers.items():
+        response[header] = value
+    response["Accept-Ranges"] = "bytes"
+    if content_encoding:
+        response["Vary"] = "Accept-Encoding"
+    return response
+
+
+def get_offload_response(entry, mode, location=None):
+    """Let the web server send a cached blob.
+
+    Args:
+        entry: BlobCacheEntry
+        mode: "x-accel-redirect" or "x-sendfile"
+        location: internal nginx location of the blob cache,
+            BLOB_CACHE_OFFLOAD_LOCATION by default
+
+    Returns:
+        HttpResponse
+
+    """
+    try:
+        header = OFFLOAD_HEADERS[mode.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown blob cache offload mode: {mode}.")
+    response = HttpResponse()
+    # the web server sets the type of the file if the remote did not send it
+    del response["Content-Type"]
+    if header == "X-Sendfile":
+        response[header] = os.path.abspath(entry.path)
+    else:
+        location = location or BLOB_CACHE_OFFLOAD_LOCATION
+        response[header] = (
+            f"{location.rstrip('/')}/{os.path.basename(entry.path)}"
+        )
+    return response
+
+
+def get_shared_response(
+    transfer, file, timeout, chunk_size=None, accept_encoding=None
+):
+    """Send a blob downloaded by another request, while it is written to the
+    blob cache.
+
+    Args:
+        transfer: SharedBlobTransfer followed by the request
+        file: content file of the transfer, opened for reading
+        timeout: maximum number of seconds to wait for new content
+        chunk_size: BLOB_PROXY_CHUNK_SIZE by default
+        accept_encoding: value of the Accept-Encoding request header
+
+    Returns:
+        StreamingHttpResponse
+
+    """
+    content = transfer.iter_content(
+        file, chunk_size or BLOB_PROXY_CHUNK_SIZE, timeout
+    )
+    content_encoding = transfer.headers.get("Content-Encoding")
+    decode = content_encoding and not accepts_encoding(
+        accept_encoding, content_encoding
+    )
+    if decode:
+        content = iter_decoded(content, get_content_encoding(transfer.headers))
+    response = StreamingHttpResponse(content)
+    for header, value in transfer.headers.items():
+        if not (decode and header == "Content-Encoding"):
+            response[header] = value
+    if content_encoding:
+        response["Vary"] = "Accept-Encoding"
+    if transfer.content_length is not None and not decode:
+        response["Content-Length"] = str(transfer.content_length)
+    return response
+
+
+def iter_file_range(file, start, length, chunk_size=None):
+    """Iterate over a range of a file, then close it.
+
+    Args:
+        file: binary file
+        start: first byte
+        length: number of bytes
+        chunk_size: BLOB_PROXY_CHUNK_SIZE by default
+
+    Returns:
+
+    """
+    chunk_size = chunk_size or BLOB_PROXY_CHUNK_SIZE
+    try:
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def iter_upstream_content(
+    upstream_response, chunk_size, writer=None, decode_content=True
+):
+    """Iterate over the content of a remote response, then close it.
+
+    Django closes the iterator when the response is done or the client
+    disconnects, which closes the remote connection. The copy sent to the
+    cache writer is only committed if the whole content was read: if the
+    client disconnects while other requests follow the download, the rest of
+    the content is still read into the cache for them.
+
+    Args:
+        upstream_response:
+        chunk_size:
+        writer: blob cache writer, optional
+        decode_content: if False, the content is read as sent by the remote,
+            without decoding its content coding
+
+    Returns:
+
+    """
+    if decode_content:
+        chunks = upstream_response.iter_content(chunk_size=chunk_size)
+    else:
+        chunks = upstream_response.raw.stream(chunk_size, decode_content=False)
+    try:
+        for chunk in chunks:
+            if chunk:
+                if writer is not None:
+                    writer.write(chunk)
+                yield chunk
+        if writer is not None:
+            writer.commit()
+    except GeneratorExit:
+        # the client disconnected
+        if writer is not None and writer.has_followers():
+            _drain_upstream_content(chunks, writer)
+        raise
+    finally:
+        if writer is not None:
+            writer.discard()
+        upstream_response.close()
+
+
+def _drain_upstream_content(chunks, writer):
+    """Write the rest of a remote content to the cache writer.
+
+    Args:
+        chunks: content iterator of the remote response
+        writer: blob cache writer
+
+    Returns:
+
+    """
+    try:
+        for chunk in chunks:
+            if chunk:
+                writer.write(chunk)
+        writer.commit()
+    except Exception as exception:
+        logger.warning("Unable to complete a shared download: %s", exception)
@@ -0,0 +1,132 @@
+"""Concurrency utilities"""
+
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import connection
+
+
+class TaskResult:
+    """Outcome of a task run by `iter_as_completed`"""
+
+    __slots__ = ("item", "result", "exception")
+
+    def __init__(self, item, result=None, exception=None):
+        """Task outcome.
+
+        Args:
+            item: item the task was run for
+            result: value returned by the task
+            exception: exception raised by the task, None on success
+        """
+        self.item = item
+        self.result = result
+        self.exception = exception
+
+
+def iter_as_completed(
+    fn, items, max_workers, key=None, max_workers_per_key=None, timeout=None
+):
+    """Run a function on each item concurrently, yielding the outcomes as
+    the tasks complete.
+
+    At most `max_workers` tasks run at the same time, and at most
+    `max_workers_per_key` share the same key (e.g. the same remote instance).
+    Items are scheduled round-robin across keys, so that one busy key does not
+    hold back the others. Once the timeout expires, the items not completed
+    yet are yielded with a TimeoutError, without waiting for their tasks.
+
+    Args:
+        fn: function called with an item
+        items:
+        max_workers: global concurrency cap
+        key: function returning the key of an item, all items share the
+            same key by default
+        max_workers_per_key: concurrency cap per key, no cap by default
+        timeout: number of seconds to wait for all the tasks, no limit by
+            default
+
+    Returns:
+        generator of TaskResult
+
+    """
+    queues = OrderedDict()
+    for item in items:
+        queues.setdefault(key(item) if key else None, deque()).append(item)
+    if not queues:
+        return
+
+    max_workers = max(1, int(max_workers))
+    if max_workers_per_key is not None:
+        max_workers_per_key = max(1, int(max_workers_per_key))
+    deadline = None if timeout is None else time.monotonic() + timeout
+    running = dict.fromkeys(queues, 0)
+    pending = {}
+
+    def _run(item):
+        try:
+            return fn(item)
+        finally:
+            # connections are opened per thread
+            connection.close()
+
+    def _schedule(executor):
+        while len(pending) < max_workers:
+            for item_key, queue in queues.items():
+                if queue and (
+                    max_workers_per_key is None
+                    or running[item_key] < max_workers_per_key
+                ):
+                    item = queue.popleft()
+                    pending[executor.submit(_run, item)] = (item, item_key)
+                    running[item_key] += 1
+                    queues.move_to_end(item_key)
+                    break
+            else:
+                return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    timed_out = False
+    closed = False
+    try:
+        _schedule(executor)
+        while pending:
+            remaining = (
+                None if deadline is None else deadline - time.monotonic()
+            )
+            if remaining is not None and remaining <= 0:
+                timed_out = True
+                break
+            done, _ = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                item, item_key = pending.pop(future)
+                running[item_key] -= 1
+                exception = future.exception()
+                yield TaskResult(
+                    item,
+                    result=None if exception else future.result(),
+                    exception=exception,
+                )
+            _schedule(executor)
+
+        if timed_out:
+            late_items = [item for item, _ in pending.values()]
+            for queue in queues.values():
+                late_items.extend(queue)
+            for item in late_items:
+                yield TaskResult(
+                    item, exception=TimeoutError("Deadline exceeded.")
+                )
+    except GeneratorExit:
+        # the caller stopped iterating (e.g. its client disconnected)
+        closed = True
+        raise
+    finally:
+        # tasks still running after the deadline, or once the caller is
+        # gone, are left to finish on their own
+        executor.shutdown(
+            wait=not (timed_out or closed), cancel_futures=timed_out or closed
+        )
@@ -0,0 +1,56 @@
+"""Encryption utilities"""
+
+import base64
+import hashlib
+import logging
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from core_federated_search_app.settings import INSTANCE_CREDENTIALS_SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+
+def _get_fernet():
+    """Return the Fernet cipher derived from the configured secret key.
+
+    Returns:
+
+    """
+    key = hashlib.sha256(
+        str(INSTANCE_CREDENTIALS_SECRET_KEY).encode("utf-8")
+    ).digest()
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def encrypt(value):
+    """Encrypt a string.
+
+    Args:
+        value:
+
+    Returns:
+        encrypted string
+
+    """
+    return _get_fernet().encrypt(str(value).encode("utf-8")).decode("ascii")
+
+
+def decrypt(value):
+    """Decrypt a string encrypted with `encrypt`.
+
+    Args:
+        value:
+
+    Returns:
+        decrypted string, None if the value can not be decrypted
+
+    """
+    try:
+        return _get_fernet().decrypt(value.encode("ascii")).decode("utf-8")
+    except (InvalidToken, ValueError):
+        logger.error(
+            "Unable to decrypt a value: "
+            "INSTANCE_CREDENTIALS_SECRET_KEY may have changed."
+        )
+        return None
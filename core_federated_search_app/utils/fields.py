@@ -0,0 +1,22 @@
+"""Model fields"""
+
+from django.db import models
+
+from core_federated_search_app.utils.encryption import decrypt, encrypt
+
+
+class EncryptedTextField(models.TextField):
+    """Text field encrypted at rest"""
+
+    def get_prep_value(self, value):
+        """Encrypt the value before saving it to the database."""
+        value = super().get_prep_value(value)
+        if value is None or value == "":
+            return value
+        return encrypt(value)
+
+    def from_db_value(self, value, expression, connection):
+        """Decrypt the value read from the database."""
+        if value is None or value == "":
+            return value
+        return decrypt(value)
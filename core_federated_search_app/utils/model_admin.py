@@ -1,6 +1,8 @@
 """Model admins for definining admin GUI."""
 
-from django.contrib import admin
+from django.contrib import admin, messages
+
+import core_federated_search_app.components.instance.api as instance_api
 
 from core_federated_search_app.utils.forms import OAuth2ApplicationAdminForm
 
@@ -19,3 +21,49 @@ class OAuth2ApplicationAdmin(admin.ModelAdmin):
     """Model admin for django-oauth-toolkit `Application` model"""
 
     form = OAuth2ApplicationAdminForm
+
+
+class InstanceAdmin(admin.ModelAdmin):
+    """Model admin for `Instance` model"""
+
+    list_display = ("name", "endpoint", "expires", "circuit_state")
+    actions = ["refresh_tokens"]
+
+    @admin.display(description="Circuit")
+    def circuit_state(self, obj):
+        """Return the circuit state of the instance, in this process.
+
+        Args:
+            obj:
+
+        Returns:
+
+        """
+        return instance_api.get_circuit_state(obj)
+
+    @admin.action(description="Refresh the tokens of the selected instances")
+    def refresh_tokens(self, request, queryset):
+        """Refresh, concurrently, the tokens of the selected instances.
+
+        Args:
+            request:
+            queryset:
+
+        Returns:
+
+        """
+        results = instance_api.refresh_all_tokens(list(queryset))
+        for result in results:
+            if result["status"] == "success":
+                self.message_user(
+                    request,
+                    f"Token of {result['name']} refreshed.",
+                    messages.SUCCESS,
+                )
+            else:
+                self.message_user(
+                    request,
+                    f"Unable to refresh the token of {result['name']}: "
+                    f"{result['message']}",
+                    messages.ERROR,
+                )
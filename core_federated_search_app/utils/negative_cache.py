@@ -0,0 +1,80 @@
+"""Negative cache utilities"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class NegativeCache:
+    """Bounded, in-process cache of lookups known to fail.
+
+    Entries expire after a short time-to-live, and are ignored once the
+    version they were added at (e.g. the instance registry version) changes.
+    The least recently used entries are dropped beyond the maximum size.
+    """
+
+    def __init__(self, max_entries, ttl):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: maximum number of entries
+            ttl: number of seconds an entry is valid
+        """
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def add(self, key, version, value=True):
+        """Record a failed lookup.
+
+        Args:
+            key: hashable key of the lookup
+            version: version the lookup failed at
+            value: value returned by `get`, e.g. the error message
+
+        Returns:
+
+        """
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key, version):
+        """Return the value of a failed lookup, None if it is not known to
+        fail at this version.
+
+        Args:
+            key:
+            version:
+
+        Returns:
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, entry_version, value = entry
+            if entry_version != version or expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def clear(self):
+        """Remove all the entries.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        """Number of entries, expired ones included."""
+        return len(self._entries)
@@ -0,0 +1,98 @@
+"""Single-flight utilities"""
+
+import threading
+
+
+class _Call:
+    """Call in flight for a key"""
+
+    __slots__ = ("event", "result", "exception", "waiters")
+
+    def __init__(self):
+        """Initialize a call with no result yet."""
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Execute a function at most once at a time per key.
+
+    Callers arriving while the function runs for the same key wait for it to
+    complete and share its result (or exception) instead of running it again.
+    """
+
+    def __init__(self):
+        """Initialize an empty group of calls."""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function, *args, **kwargs):
+        """Execute the function for the key, or wait for the call in flight.
+
+        Args:
+            key: hashable key identifying identical calls
+            function:
+            *args:
+            **kwargs:
+
+        Returns:
+            result of the function
+
+        """
+        result, _ = self.do_shared(key, function, *args, **kwargs)
+        return result
+
+    def do_shared(self, key, function, *args, **kwargs):
+        """Same as `do`, also telling whether the result was shared.
+
+        Args:
+            key: hashable key identifying identical calls
+            function:
+            *args:
+            **kwargs:
+
+        Returns:
+            result of the function, True if the caller waited for another
+            caller's call
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result, True
+
+        try:
+            call.result = function(*args, **kwargs)
+        except Exception as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, call.waiters > 0
+
+    def is_in_flight(self, key):
+        """Check if a call is in flight for the key.
+
+        Args:
+            key:
+
+        Returns:
+
+        """
+        with self._lock:
+            return key in self._calls
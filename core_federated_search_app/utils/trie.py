@@ -0,0 +1,115 @@
+"""Radix trie utilities"""
+
+
+class _RadixNode:
+    """Node of a radix trie"""
+
+    __slots__ = ("edges", "value", "has_value")
+
+    def __init__(self):
+        """Initialize a node with no value and no edges."""
+        self.edges = {}  # first character -> (label, child node)
+        self.value = None
+        self.has_value = False
+
+
+class RadixTrie:
+    """Compact prefix tree mapping string keys to values"""
+
+    def __init__(self, items=None):
+        """Build the trie.
+
+        Args:
+            items: optional iterable of (key, value) pairs
+        """
+        self._root = _RadixNode()
+        self._size = 0
+        for key, value in items or ():
+            self.insert(key, value)
+
+    def __len__(self):
+        """Number of keys in the trie."""
+        return self._size
+
+    def insert(self, key, value):
+        """Insert a key, replacing the value if the key already exists.
+
+        Args:
+            key:
+            value:
+
+        Returns:
+
+        """
+        node = self._root
+        index = 0
+        while index < len(key):
+            edge = node.edges.get(key[index])
+            if edge is None:
+                child = _RadixNode()
+                node.edges[key[index]] = (key[index:], child)
+                node = child
+                index = len(key)
+                break
+
+            label, child = edge
+            common = _common_prefix_length(label, key, index)
+            if common < len(label):
+                # split the edge at the end of the common prefix
+                middle = _RadixNode()
+                middle.edges[label[common]] = (label[common:], child)
+                node.edges[key[index]] = (label[:common], middle)
+                child = middle
+            node = child
+            index += common
+
+        if not node.has_value:
+            self._size += 1
+        node.value = value
+        node.has_value = True
+
+    def longest_prefix_value(self, key, default=None):
+        """Return the value of the longest inserted key that prefixes `key`.
+
+        Runs in O(len(key)).
+
+        Args:
+            key:
+            default: value returned when no inserted key prefixes `key`
+
+        Returns:
+
+        """
+        node = self._root
+        value = node.value if node.has_value else default
+        index = 0
+        while index < len(key):
+            edge = node.edges.get(key[index])
+            if edge is None:
+                break
+            label, child = edge
+            if not key.startswith(label, index):
+                break
+            node = child
+            index += len(label)
+            if node.has_value:
+                value = node.value
+        return value
+
+
+def _common_prefix_length(label, key, index):
+    """Length of the common prefix of `label` and `key[index:]`.
+
+    Args:
+        label:
+        key:
+        index:
+
+    Returns:
+
+    """
+    length = 0
+    max_length = min(len(label), len(key) - index)
+    while length < max_length and label[length] == key[index + length]:
+        length += 1
+    return length
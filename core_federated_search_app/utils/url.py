@@ -0,0 +1,69 @@
+"""URL utilities"""
+
+import re
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class NormalizedUrl(namedtuple("NormalizedUrl", "scheme host port path")):
+    """Scheme, host, port and path of an URL in canonical form"""
+
+    __slots__ = ()
+
+    @property
+    def origin(self):
+        """Return the canonical `scheme://host:port` part of the URL.
+
+        Returns:
+
+        """
+        return f"{self.scheme}://{self.host}:{self.port}"
+
+    def __str__(self):
+        """Canonical string representation of the URL (no query string).
+
+        Returns:
+
+        """
+        return self.origin + self.path
+
+
+def normalize_url(url):
+    """Split an URL into its normalized scheme, host, port and path.
+
+    The scheme and host are lowercased, the default port of the scheme is made
+    explicit, and the path is stripped from duplicate and trailing slashes.
+    Query string and fragment are ignored.
+
+    Args:
+        url:
+
+    Returns:
+        NormalizedUrl
+
+    """
+    parsed_url = urlsplit(str(url).strip())
+    scheme = parsed_url.scheme.lower()
+    host = (parsed_url.hostname or "").lower()
+    port = parsed_url.port or DEFAULT_PORTS.get(scheme)
+    path = re.sub(r"/{2,}", "/", parsed_url.path).rstrip("/")
+    return NormalizedUrl(scheme, host, port, path)
+
+
+def get_path_prefixes(path):
+    """Return all the segment-aligned prefixes of a normalized path.
+
+    Example: "/a/b" -> ["", "/a", "/a/b"]
+
+    Args:
+        path:
+
+    Returns:
+
+    """
+    prefixes = [""]
+    for segment in path.split("/")[1:]:
+        prefixes.append(f"{prefixes[-1]}/{segment}")
+    return prefixes
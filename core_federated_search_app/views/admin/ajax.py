@@ -126,3 +126,26 @@ def _refresh_repository_get(request):
         json.dumps({"template": template.render(context)}),
         content_type="application/javascript",
     )
+
+
+@staff_member_required
+def refresh_repositories(request):
+    """Refresh, concurrently, the tokens of the selected repositories.
+
+    Args:
+        request:
+
+    Returns:
+
+    """
+    try:
+        instances, missing = instance_api.get_by_ids(
+            request.POST.getlist("ids[]")
+        )
+        results = instance_api.refresh_all_tokens(list(instances.values()))
+        return HttpResponse(
+            json.dumps({"results": results, "missing": missing}),
+            content_type="application/javascript",
+        )
+    except Exception as exception:
+        return HttpResponseBadRequest(escape(str(exception)))
@@ -40,6 +40,14 @@ def manage_repositories(request):
                 "path": "core_federated_search_app/admin/js/repositories/list/modals/refresh.js",
                 "is_raw": False,
             },
+            {
+                "path": "core_federated_search_app/admin/js/repositories/list/refresh_all.js",
+                "is_raw": False,
+            },
+            {
+                "path": "core_federated_search_app/admin/js/repositories/list/refresh_all.raw.js",
+                "is_raw": True,
+            },
             EditTemplateVersionManagerView.get_modal_js_path(),
         ],
         "css": ["core_federated_search_app/admin/css/repositories.css"],
@@ -0,0 +1,37 @@
+"""Unit tests for `core_federated_search_app.checks` package."""
+
+from django.test import SimpleTestCase, override_settings
+
+from core_federated_search_app.checks import check_shared_cache
+
+
+class TestCheckSharedCache(SimpleTestCase):
+    """Unit tests for `check_shared_cache` function."""
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        }
+    )
+    def test_local_cache_is_reported(self):
+        """test_local_cache_is_reported"""
+        warnings = check_shared_cache(None)
+
+        self.assertEqual(
+            [warning.id for warning in warnings],
+            ["core_federated_search_app.W001"],
+        )
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379",
+            }
+        }
+    )
+    def test_shared_cache_is_not_reported(self):
+        """test_shared_cache_is_not_reported"""
+        self.assertEqual(check_shared_cache(None), [])
@@ -2,16 +2,112 @@
 
 from core_main_app.commons.exceptions import ApiError
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 from unittest.mock import patch, Mock, MagicMock
 
+import requests
+
+from core_federated_search_app.commons.exceptions import (
+    InstanceUnavailableError,
+)
 from core_federated_search_app.components.instance import api as instance_api
+from core_federated_search_app.components.instance.circuit_breaker import (
+    CircuitBreakerRegistry,
+)
 from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.components.instance.token_store import (
+    TokenGrant,
+)
+from core_federated_search_app.utils.negative_cache import NegativeCache
 from core_main_app.commons import exceptions
 from core_main_app.utils.datetime import datetime_now, datetime_timedelta
 from tests.mocks import MockResponse
 
 
+class TestGetAll(TestCase):
+    """Test Get All"""
+
+    @patch.object(Instance, "get_all")
+    def test_get_all_returns_model_collection(self, mock_get_all):
+        """test_get_all_returns_model_collection"""
+        queryset = MagicMock()
+        mock_get_all.return_value = queryset
+
+        self.assertIs(instance_api.get_all(), queryset)
+
+    @patch.object(instance_api.instance_registry, "get_all")
+    def test_get_all_registered_uses_registry(self, mock_registry_get_all):
+        """test_get_all_registered_uses_registry"""
+        mock_registry_get_all.return_value = []
+
+        self.assertEqual(instance_api.get_all_registered(), [])
+
+
+class TestGetByName(TestCase):
+    """Unit tests for `get_by_name` function."""
+
+    @patch.object(instance_api.instance_registry, "get_by_name")
+    def test_get_by_name_uses_registry(self, mock_registry_get_by_name):
+        """test_get_by_name_uses_registry"""
+        instance = Instance(name="remote")
+        mock_registry_get_by_name.return_value = instance
+
+        self.assertIs(instance_api.get_by_name("remote"), instance)
+        mock_registry_get_by_name.assert_called_with("remote")
+
+
+class TestBulkLookups(TestCase):
+    """Unit tests for the bulk lookup functions."""
+
+    @patch.object(instance_api.instance_registry, "get_by_names")
+    def test_get_by_names_uses_registry(self, mock_registry_get_by_names):
+        """test_get_by_names_uses_registry"""
+        mock_registry_get_by_names.return_value = ({}, ["remote"])
+
+        self.assertEqual(
+            instance_api.get_by_names(["remote"]), ({}, ["remote"])
+        )
+        mock_registry_get_by_names.assert_called_with(["remote"])
+
+    @patch.object(instance_api.instance_registry, "get_by_endpoints")
+    def test_get_by_endpoints_uses_registry(
+        self, mock_registry_get_by_endpoints
+    ):
+        """test_get_by_endpoints_uses_registry"""
+        mock_registry_get_by_endpoints.return_value = ({}, ["http://a.test"])
+
+        self.assertEqual(
+            instance_api.get_by_endpoints(["http://a.test"]),
+            ({}, ["http://a.test"]),
+        )
+        mock_registry_get_by_endpoints.assert_called_with(["http://a.test"])
+
+
+class TestGetByEndpointStartingWith(TestCase):
+    """Unit tests for `get_by_endpoint_starting_with` function."""
+
+    @patch.object(
+        instance_api.instance_registry, "get_by_endpoint_starting_with"
+    )
+    def test_get_by_endpoint_starting_with_uses_registry(
+        self, mock_registry_get_by_endpoint_starting_with
+    ):
+        """test_get_by_endpoint_starting_with_uses_registry"""
+        instance = Instance(name="remote")
+        mock_registry_get_by_endpoint_starting_with.return_value = instance
+
+        self.assertIs(
+            instance_api.get_by_endpoint_starting_with("http://a.test"),
+            instance,
+        )
+        mock_registry_get_by_endpoint_starting_with.assert_called_with(
+            "http://a.test"
+        )
+
+
 class TestGetBlobResponseFromUrl(TestCase):
     """Test Get Blob Response From Url"""
 
@@ -26,18 +122,16 @@ class TestGetBlobResponseFromUrl(TestCase):
             instance_api.get_blob_response_from_url("", "")
 
     @patch.object(instance_api, "send_get_request_with_token")
-    @patch(
-        "core_federated_search_app.components.instance.api.get_by_endpoint_starting_with"
-    )
+    @patch("core_federated_search_app.components.instance.api.get_by_url")
     def test_get_blob_response_from_url_return_blob_if_is_known_instance(
         self,
-        mock_get_by_endpoint_starting_with,
+        mock_get_by_url,
         mock_send_get_request_with_access_token,
     ):
         """test_get_blob_response_from_url_return_blob_if_is_known_instance"""
 
         # Arrange
-        mock_get_by_endpoint_starting_with.return_value = Instance(
+        mock_get_by_url.return_value = Instance(
             name="name",
             endpoint="http://my.url.test",
             access_token="access_token",
@@ -45,14 +139,316 @@ class TestGetBlobResponseFromUrl(TestCase):
             expires="date",
         )
 
-        mock_send_get_request_with_access_token.return_value = "remote"
+        mock_remote_response = MockResponse()
+        mock_remote_response.status_code = 200
+        mock_send_get_request_with_access_token.return_value = (
+            mock_remote_response
+        )
 
         # Act
         return_value = instance_api.get_blob_response_from_url(
             "http://my.url.test", "http://my.url.test/098765432"
         )
         # assert
-        self.assertEqual(return_value, "remote")
+        self.assertEqual(return_value, mock_remote_response)
+
+
+class TestGetBlobHeadResponseFromUrl(TestCase):
+    """Test Get Blob Head Response From Url"""
+
+    @patch.object(instance_api, "send_head_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_head_request_is_sent_with_token(
+        self, mock_get_by_url, mock_send_head_request
+    ):
+        """test_head_request_is_sent_with_token"""
+        mock_get_by_url.return_value = Instance(
+            pk=1,
+            name="name",
+            endpoint="http://my.url.test",
+            access_token="access_token",
+        )
+        mock_remote_response = MockResponse()
+        mock_remote_response.status_code = 200
+        mock_send_head_request.return_value = mock_remote_response
+
+        response = instance_api.get_blob_head_response_from_url(
+            "http://my.url.test/1"
+        )
+
+        self.assertEqual(response, mock_remote_response)
+        mock_send_head_request.assert_called_once_with(
+            url="http://my.url.test/1",
+            access_token="access_token",
+            instance_name="name",
+            headers=None,
+        )
+
+
+class TestGetBlobResponseFromUrlNegativeCache(TestCase):
+    """Test Get Blob Response From Url for blobs missing on the remote"""
+
+    def setUp(self):
+        """setUp"""
+        self.instance = Instance(
+            pk=1, name="name", endpoint="http://my.url.test"
+        )
+        patcher = patch.object(
+            instance_api, "_missing_blobs", NegativeCache(10, 30)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(instance_api.instance_registry, "get_snapshot")
+    @patch.object(instance_api, "send_get_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_missing_blob_is_not_requested_again(
+        self, mock_get_by_url, mock_send_get_request, mock_get_snapshot
+    ):
+        """test_missing_blob_is_not_requested_again"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_snapshot.return_value = MagicMock(version=1)
+        not_found_response = MockResponse()
+        not_found_response.status_code = 404
+        mock_send_get_request.return_value = not_found_response
+
+        instance_api.get_blob_response_from_url("", "http://my.url.test/1")
+        response = instance_api.get_blob_response_from_url(
+            "", "http://my.url.test/1", stream=True
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(list(response.iter_content(chunk_size=16)), [])
+        mock_send_get_request.assert_called_once()
+
+    @patch.object(instance_api.instance_registry, "get_snapshot")
+    @patch.object(instance_api, "send_get_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_missing_blob_is_requested_after_registry_change(
+        self, mock_get_by_url, mock_send_get_request, mock_get_snapshot
+    ):
+        """test_missing_blob_is_requested_after_registry_change"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_snapshot.return_value = MagicMock(version=1)
+        not_found_response = MockResponse()
+        not_found_response.status_code = 404
+        mock_send_get_request.return_value = not_found_response
+
+        instance_api.get_blob_response_from_url("", "http://my.url.test/1")
+        mock_get_snapshot.return_value = MagicMock(version=2)
+        instance_api.get_blob_response_from_url("", "http://my.url.test/1")
+
+        self.assertEqual(mock_send_get_request.call_count, 2)
+
+    @patch.object(instance_api.instance_registry, "get_snapshot")
+    @patch.object(instance_api, "send_get_request_with_token")
+    def test_instance_requests_are_not_negatively_cached(
+        self, mock_send_get_request, mock_get_snapshot
+    ):
+        """test_instance_requests_are_not_negatively_cached"""
+        mock_get_snapshot.return_value = MagicMock(version=1)
+        not_found_response = MockResponse()
+        not_found_response.status_code = 404
+        mock_send_get_request.return_value = not_found_response
+
+        instance_api.send_get_request_to_instance(
+            self.instance, "http://my.url.test/rest/data/", params={"id": 1}
+        )
+        instance_api.send_get_request_to_instance(
+            self.instance, "http://my.url.test/rest/data/", params={"id": 2}
+        )
+
+        self.assertEqual(mock_send_get_request.call_count, 2)
+
+
+class TestGetBlobResponseFromUrlCircuitBreaker(TestCase):
+    """Test Get Blob Response From Url for failing remotes"""
+
+    def setUp(self):
+        """setUp"""
+        self.instance = Instance(
+            pk=1, name="name", endpoint="http://my.url.test"
+        )
+        for target, attribute, value in (
+            (instance_api, "_missing_blobs", NegativeCache(10, 30)),
+            (instance_api, "circuit_breakers", CircuitBreakerRegistry()),
+            (
+                instance_api,
+                "get_by_url",
+                MagicMock(return_value=self.instance),
+            ),
+        ):
+            patcher = patch.object(target, attribute, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @patch.object(instance_api, "send_get_request_with_token")
+    def test_open_circuit_fails_immediately(self, mock_send_get_request):
+        """test_open_circuit_fails_immediately"""
+        mock_send_get_request.side_effect = requests.ConnectionError("down")
+        for _ in range(
+            instance_api.circuit_breakers.get(self.instance).min_requests
+        ):
+            with self.assertRaises(requests.ConnectionError):
+                instance_api.get_blob_response_from_url(
+                    "", "http://my.url.test/1"
+                )
+
+        with self.assertRaises(InstanceUnavailableError):
+            instance_api.get_blob_response_from_url("", "http://my.url.test/1")
+
+        self.assertEqual(
+            mock_send_get_request.call_count,
+            instance_api.circuit_breakers.get(self.instance).min_requests,
+        )
+        self.assertEqual(instance_api.get_circuit_state(self.instance), "open")
+
+    @patch.object(instance_api, "send_get_request_with_token")
+    def test_server_errors_are_failures(self, mock_send_get_request):
+        """test_server_errors_are_failures"""
+        error_response = MockResponse()
+        error_response.status_code = 503
+        mock_send_get_request.return_value = error_response
+        for _ in range(
+            instance_api.circuit_breakers.get(self.instance).min_requests
+        ):
+            instance_api.get_blob_response_from_url("", "http://my.url.test/1")
+
+        self.assertEqual(instance_api.get_circuit_state(self.instance), "open")
+
+    @patch.object(instance_api, "send_get_request_with_token")
+    def test_not_found_is_not_a_failure(self, mock_send_get_request):
+        """test_not_found_is_not_a_failure"""
+        not_found_response = MockResponse()
+        not_found_response.status_code = 404
+        mock_send_get_request.return_value = not_found_response
+        for index in range(10):
+            instance_api.get_blob_response_from_url(
+                "", f"http://my.url.test/{index}"
+            )
+
+        self.assertEqual(
+            instance_api.get_circuit_state(self.instance), "closed"
+        )
+
+
+class TestGetBlobResponseFromUrlTokenRefresh(TestCase):
+    """Test Get Blob Response From Url token refresh"""
+
+    def setUp(self):
+        """setUp"""
+        self.instance = Instance(
+            pk=1,
+            name="name",
+            endpoint="http://my.url.test",
+            access_token="access_token",
+            refresh_token="refresh_token",
+            client_id="client_id",
+            client_secret="client_secret",
+            expires=datetime_now() + datetime_timedelta(days=1),
+        )
+        self.refreshed_instance = Instance(
+            pk=1,
+            name="name",
+            endpoint="http://my.url.test",
+            access_token="new_access_token",
+            refresh_token="new_refresh_token",
+            expires=datetime_now() + datetime_timedelta(days=1),
+        )
+        self.ok_response = MockResponse()
+        self.ok_response.status_code = 200
+        self.unauthorized_response = MockResponse()
+        self.unauthorized_response.status_code = 401
+
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "send_get_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_valid_token_is_not_refreshed(
+        self, mock_get_by_url, mock_send_get_request, mock_refresh
+    ):
+        """test_valid_token_is_not_refreshed"""
+        mock_get_by_url.return_value = self.instance
+        mock_send_get_request.return_value = self.ok_response
+
+        instance_api.get_blob_response_from_url("", "http://my.url.test/1")
+
+        mock_refresh.assert_not_called()
+
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "send_get_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_expiring_token_is_refreshed_before_request(
+        self, mock_get_by_url, mock_send_get_request, mock_refresh
+    ):
+        """test_expiring_token_is_refreshed_before_request"""
+        self.instance.expires = datetime_now()
+        mock_get_by_url.return_value = self.instance
+        mock_refresh.return_value = self.refreshed_instance
+        mock_send_get_request.return_value = self.ok_response
+
+        instance_api.get_blob_response_from_url("", "http://my.url.test/1")
+
+        mock_send_get_request.assert_called_once_with(
+            url="http://my.url.test/1",
+            access_token="new_access_token",
+            instance_name=self.instance.name,
+            stream=False,
+            headers=None,
+        )
+
+    @patch.object(instance_api, "send_get_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_stream_is_passed_to_the_request(
+        self, mock_get_by_url, mock_send_get_request
+    ):
+        """test_stream_is_passed_to_the_request"""
+        mock_get_by_url.return_value = self.instance
+        mock_send_get_request.return_value = self.ok_response
+
+        instance_api.get_blob_response_from_url(
+            "", "http://my.url.test/1", stream=True
+        )
+
+        self.assertTrue(mock_send_get_request.call_args.kwargs["stream"])
+
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "send_get_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_unauthorized_response_is_retried_once_after_refresh(
+        self, mock_get_by_url, mock_send_get_request, mock_refresh
+    ):
+        """test_unauthorized_response_is_retried_once_after_refresh"""
+        mock_get_by_url.return_value = self.instance
+        mock_refresh.return_value = self.refreshed_instance
+        mock_send_get_request.side_effect = [
+            self.unauthorized_response,
+            self.ok_response,
+        ]
+
+        response = instance_api.get_blob_response_from_url(
+            "", "http://my.url.test/1"
+        )
+
+        self.assertEqual(response, self.ok_response)
+        self.assertEqual(mock_send_get_request.call_count, 2)
+
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "send_get_request_with_token")
+    @patch.object(instance_api, "get_by_url")
+    def test_failed_refresh_returns_unauthorized_response(
+        self, mock_get_by_url, mock_send_get_request, mock_refresh
+    ):
+        """test_failed_refresh_returns_unauthorized_response"""
+        mock_get_by_url.return_value = self.instance
+        mock_refresh.side_effect = ApiError("mock_error")
+        mock_send_get_request.return_value = self.unauthorized_response
+
+        response = instance_api.get_blob_response_from_url(
+            "", "http://my.url.test/1"
+        )
+
+        self.assertEqual(response, self.unauthorized_response)
+        mock_send_get_request.assert_called_once()
 
 
 class TestCreateInstanceObjectFromRequestResponse(TestCase):
@@ -240,6 +636,7 @@ class TestAddInstance(TestCase):
             self.mock_kwargs["timeout"],
             self.mock_kwargs["username"],
             self.mock_kwargs["password"],
+            instance_name=self.mock_kwargs["name"].strip(),
         )
 
     @patch.object(instance_api, "urlparse")
@@ -436,3 +833,354 @@ class TestAddInstance(TestCase):
         self.assertEqual(
             instance_api.add_instance(**self.mock_kwargs), mock_instance_object
         )
+
+
+class TestRefreshInstanceToken(TestCase):
+    """Unit tests for `refresh_instance_token` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.instance = Instance(
+            name="name",
+            endpoint="http://my.url.test",
+            refresh_token="refresh_token",
+            client_id="stored_client_id",
+            client_secret="stored_client_secret",
+        )
+        self.response = MockResponse()
+        self.response.status_code = 200
+        self.response.content = json.dumps(
+            {
+                "expires_in": 3600,
+                "refresh_token": "new_refresh",
+                "access_token": "new_access",
+            }
+        )
+        get_by_id_for_update_patcher = patch.object(
+            Instance, "get_by_id_for_update", return_value=self.instance
+        )
+        self.mock_get_by_id_for_update = get_by_id_for_update_patcher.start()
+        self.addCleanup(get_by_id_for_update_patcher.stop)
+
+        self.mock_token_store = MagicMock()
+        self.mock_token_store.get.side_effect = TokenGrant.from_instance
+        self.mock_token_store.set.side_effect = (
+            lambda instance, grant: grant.apply_to(instance)
+        )
+        token_store_patcher = patch.object(
+            instance_api, "get_token_store", return_value=self.mock_token_store
+        )
+        token_store_patcher.start()
+        self.addCleanup(token_store_patcher.stop)
+
+        save_patcher = patch.object(Instance, "save")
+        self.mock_save = save_patcher.start()
+        self.addCleanup(save_patcher.stop)
+
+    @patch.object(instance_api, "post_refresh_token")
+    def test_stored_credentials_are_used_if_none_given(
+        self, mock_post_refresh_token
+    ):
+        """test_stored_credentials_are_used_if_none_given"""
+        mock_post_refresh_token.return_value = self.response
+
+        instance_api.refresh_instance_token(self.instance)
+
+        mock_post_refresh_token.assert_called_with(
+            "http://my.url.test",
+            "stored_client_id",
+            "stored_client_secret",
+            instance_api.INSTANCE_TOKEN_REFRESH_TIMEOUT,
+            "refresh_token",
+            instance_name=self.instance.name,
+        )
+
+    @patch.object(instance_api, "post_refresh_token")
+    def test_new_token_is_stored(self, mock_post_refresh_token):
+        """test_new_token_is_stored"""
+        mock_post_refresh_token.return_value = self.response
+
+        instance = instance_api.refresh_instance_token(self.instance)
+
+        self.assertEqual(instance.access_token, "new_access")
+        self.assertEqual(instance.refresh_token, "new_refresh")
+        self.mock_token_store.set.assert_called_once()
+        self.mock_save.assert_not_called()
+
+    @patch.object(instance_api, "post_refresh_token")
+    def test_given_credentials_are_stored(self, mock_post_refresh_token):
+        """test_given_credentials_are_stored"""
+        mock_post_refresh_token.return_value = self.response
+
+        instance = instance_api.refresh_instance_token(
+            self.instance, "client_id", "client_secret", 1
+        )
+
+        self.assertEqual(instance.client_id, "client_id")
+        self.assertEqual(instance.client_secret, "client_secret")
+        self.mock_save.assert_called_with(
+            update_fields=["client_id", "client_secret"]
+        )
+
+    @patch.object(instance_api, "post_refresh_token")
+    def test_no_credentials_raises_api_error(self, mock_post_refresh_token):
+        """test_no_credentials_raises_api_error"""
+        self.instance.client_id = None
+        self.instance.client_secret = None
+
+        with self.assertRaises(ApiError):
+            instance_api.refresh_instance_token(self.instance)
+
+        mock_post_refresh_token.assert_not_called()
+
+    @patch.object(instance_api, "circuit_breakers")
+    @patch.object(instance_api, "post_refresh_token")
+    def test_open_circuit_raises_unavailable_error(
+        self, mock_post_refresh_token, mock_circuit_breakers
+    ):
+        """test_open_circuit_raises_unavailable_error"""
+        mock_circuit_breakers.get.return_value.is_open.return_value = True
+
+        with self.assertRaises(InstanceUnavailableError):
+            instance_api.refresh_instance_token(self.instance)
+
+        mock_post_refresh_token.assert_not_called()
+
+    @patch.object(instance_api, "post_refresh_token")
+    def test_token_refreshed_by_another_worker_is_reused(
+        self, mock_post_refresh_token
+    ):
+        """test_token_refreshed_by_another_worker_is_reused"""
+        locked_instance = Instance(
+            name="name",
+            endpoint="http://my.url.test",
+            refresh_token="other_refresh_token",
+        )
+        self.mock_get_by_id_for_update.return_value = locked_instance
+
+        self.assertEqual(
+            instance_api.refresh_instance_token(self.instance),
+            locked_instance,
+        )
+        mock_post_refresh_token.assert_not_called()
+
+    @patch.object(instance_api, "post_refresh_token")
+    def test_concurrent_refreshes_share_one_remote_call(
+        self, mock_post_refresh_token
+    ):
+        """test_concurrent_refreshes_share_one_remote_call"""
+        self.instance.pk = 1
+        remote_called = threading.Event()
+        release_remote = threading.Event()
+
+        def _post_refresh_token(*args, **kwargs):
+            remote_called.set()
+            release_remote.wait(5)
+            return self.response
+
+        mock_post_refresh_token.side_effect = _post_refresh_token
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(
+                instance_api.refresh_instance_token, self.instance
+            )
+            remote_called.wait(5)
+            second = executor.submit(
+                instance_api.refresh_instance_token, self.instance
+            )
+            while not instance_api._token_refresh_flights._calls[1].waiters:
+                time.sleep(0.01)
+            release_remote.set()
+
+        self.assertEqual(first.result(), second.result())
+        mock_post_refresh_token.assert_called_once()
+
+
+class TestRefreshExpiringTokens(TestCase):
+    """Unit tests for `refresh_expiring_tokens` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.expiring_instance = Instance(
+            pk=1,
+            name="expiring",
+            endpoint="http://expiring.test",
+            refresh_token="refresh_token",
+            client_id="client_id",
+            client_secret="client_secret",
+            expires=datetime_now() + datetime_timedelta(seconds=60),
+        )
+        self.valid_instance = Instance(
+            pk=2,
+            name="valid",
+            endpoint="http://valid.test",
+            refresh_token="refresh_token",
+            client_id="client_id",
+            client_secret="client_secret",
+            expires=datetime_now() + datetime_timedelta(days=7),
+        )
+        self.public_instance = Instance(
+            pk=3, name="public", endpoint="http://public.test"
+        )
+
+    @patch.object(instance_api, "get_all")
+    def test_only_expiring_refreshable_instances_are_returned(
+        self, mock_get_all
+    ):
+        """test_only_expiring_refreshable_instances_are_returned"""
+        mock_get_all.return_value = [
+            self.expiring_instance,
+            self.valid_instance,
+            self.public_instance,
+        ]
+
+        self.assertEqual(
+            instance_api.get_instances_with_expiring_token(3600),
+            [self.expiring_instance],
+        )
+
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "get_all")
+    def test_results_report_success_and_errors(
+        self, mock_get_all, mock_refresh_instance_token
+    ):
+        """test_results_report_success_and_errors"""
+        self.valid_instance.expires = self.expiring_instance.expires
+        mock_get_all.return_value = [
+            self.expiring_instance,
+            self.valid_instance,
+        ]
+        mock_refresh_instance_token.side_effect = [
+            self.expiring_instance,
+            ApiError("mock_error"),
+        ]
+
+        results = instance_api.refresh_expiring_tokens(
+            window=3600, max_workers=1, jitter=0
+        )
+
+        self.assertEqual(
+            [(result["name"], result["status"]) for result in results],
+            [("expiring", "success"), ("valid", "error")],
+        )
+        self.assertEqual(results[1]["message"], "mock_error")
+
+    @patch.object(instance_api, "INSTANCE_TOKEN_REFRESH_WINDOW", 3600)
+    @patch.object(instance_api, "get_all")
+    def test_default_window_is_used(self, mock_get_all):
+        """test_default_window_is_used"""
+        mock_get_all.return_value = [
+            self.expiring_instance,
+            self.valid_instance,
+        ]
+
+        self.assertEqual(
+            instance_api.get_instances_with_expiring_token(),
+            [self.expiring_instance],
+        )
+
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "get_all")
+    def test_no_expiring_token_returns_no_result(
+        self, mock_get_all, mock_refresh_instance_token
+    ):
+        """test_no_expiring_token_returns_no_result"""
+        mock_get_all.return_value = [self.valid_instance]
+
+        self.assertEqual(instance_api.refresh_expiring_tokens(window=3600), [])
+        mock_refresh_instance_token.assert_not_called()
+
+    @patch.object(instance_api.time, "sleep")
+    @patch.object(instance_api.random, "uniform")
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "get_all")
+    def test_refreshes_are_delayed_by_jitter(
+        self,
+        mock_get_all,
+        mock_refresh_instance_token,
+        mock_uniform,
+        mock_sleep,
+    ):
+        """test_refreshes_are_delayed_by_jitter"""
+        mock_get_all.return_value = [self.expiring_instance]
+        mock_uniform.return_value = 2.5
+
+        instance_api.refresh_expiring_tokens(window=3600, jitter=5)
+
+        mock_uniform.assert_called_with(0, 5)
+        mock_sleep.assert_called_with(2.5)
+        mock_refresh_instance_token.assert_called_once()
+
+
+class TestRefreshAllTokens(TestCase):
+    """Unit tests for `refresh_all_tokens` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.private_instance = Instance(
+            pk=1,
+            name="private",
+            endpoint="http://private.test",
+            refresh_token="refresh_token",
+            client_id="client_id",
+            client_secret="client_secret",
+        )
+        self.public_instance = Instance(
+            pk=2, name="public", endpoint="http://public.test"
+        )
+
+    @patch.object(instance_api, "refresh_instance_token")
+    @patch.object(instance_api, "get_all")
+    def test_all_refreshable_instances_are_refreshed_by_default(
+        self, mock_get_all, mock_refresh_instance_token
+    ):
+        """test_all_refreshable_instances_are_refreshed_by_default"""
+        mock_get_all.return_value = [
+            self.private_instance,
+            self.public_instance,
+        ]
+
+        results = instance_api.refresh_all_tokens(timeout=1)
+
+        self.assertEqual(
+            [(result["name"], result["status"]) for result in results],
+            [("private", "success")],
+        )
+        mock_refresh_instance_token.assert_called_once_with(
+            self.private_instance, timeout=1
+        )
+
+    @patch.object(instance_api, "refresh_instance_token")
+    def test_given_instances_are_all_reported(
+        self, mock_refresh_instance_token
+    ):
+        """test_given_instances_are_all_reported"""
+        mock_refresh_instance_token.side_effect = [
+            self.private_instance,
+            ApiError("mock_error"),
+        ]
+
+        results = instance_api.refresh_all_tokens(
+            [self.private_instance, self.public_instance], max_workers=1
+        )
+
+        self.assertEqual(
+            [(result["name"], result["status"]) for result in results],
+            [("private", "success"), ("public", "error")],
+        )
+
+    @patch.object(instance_api, "refresh_instance_token")
+    def test_refreshes_run_concurrently(self, mock_refresh_instance_token):
+        """test_refreshes_run_concurrently"""
+        barrier = threading.Barrier(2, timeout=5)
+        mock_refresh_instance_token.side_effect = (
+            lambda instance, timeout: barrier.wait()
+        )
+
+        results = instance_api.refresh_all_tokens(
+            [self.private_instance, self.public_instance], max_workers=2
+        )
+
+        self.assertEqual(
+            [result["status"] for result in results], ["success", "success"]
+        )
@@ -0,0 +1,131 @@
+"""Unit tests for `core_federated_search_app.components.instance.circuit_breaker` package."""
+
+import time
+from unittest import TestCase
+
+from core_federated_search_app.components.instance import circuit_breaker
+from core_federated_search_app.components.instance.models import Instance
+
+
+class TestCircuitBreaker(TestCase):
+    """Unit tests for `CircuitBreaker` class."""
+
+    def setUp(self):
+        """setUp"""
+        self.circuit_breaker = circuit_breaker.CircuitBreaker(
+            window=10, min_requests=4, failure_rate=0.5, cooldown=0.05
+        )
+
+    def _open(self):
+        for _ in range(4):
+            self.circuit_breaker.record_failure()
+
+    def test_circuit_opens_on_failure_rate(self):
+        """test_circuit_opens_on_failure_rate"""
+        for _ in range(3):
+            self.circuit_breaker.record_success()
+        for _ in range(2):
+            self.circuit_breaker.record_failure()
+        self.assertEqual(
+            self.circuit_breaker.state, circuit_breaker.STATE_CLOSED
+        )
+
+        self.circuit_breaker.record_failure()
+
+        self.assertEqual(
+            self.circuit_breaker.state, circuit_breaker.STATE_OPEN
+        )
+        self.assertFalse(self.circuit_breaker.allow_request())
+        self.assertTrue(self.circuit_breaker.is_open())
+
+    def test_circuit_stays_closed_below_min_requests(self):
+        """test_circuit_stays_closed_below_min_requests"""
+        for _ in range(3):
+            self.circuit_breaker.record_failure()
+
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+    def test_single_trial_after_cooldown(self):
+        """test_single_trial_after_cooldown"""
+        self._open()
+        time.sleep(0.06)
+
+        self.assertFalse(self.circuit_breaker.is_open())
+        self.assertTrue(self.circuit_breaker.allow_request())
+        self.assertEqual(
+            self.circuit_breaker.state, circuit_breaker.STATE_HALF_OPEN
+        )
+        self.assertFalse(self.circuit_breaker.allow_request())
+
+    def test_successful_trial_closes_circuit(self):
+        """test_successful_trial_closes_circuit"""
+        self._open()
+        time.sleep(0.06)
+        self.circuit_breaker.allow_request()
+
+        self.circuit_breaker.record_success()
+
+        self.assertEqual(
+            self.circuit_breaker.state, circuit_breaker.STATE_CLOSED
+        )
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+    def test_success_while_open_is_ignored(self):
+        """test_success_while_open_is_ignored"""
+        self._open()
+
+        self.circuit_breaker.record_success()
+
+        self.assertEqual(
+            self.circuit_breaker.state, circuit_breaker.STATE_OPEN
+        )
+        self.assertFalse(self.circuit_breaker.allow_request())
+
+    def test_failed_trial_opens_circuit(self):
+        """test_failed_trial_opens_circuit"""
+        self._open()
+        time.sleep(0.06)
+        self.circuit_breaker.allow_request()
+
+        self.circuit_breaker.record_failure()
+
+        self.assertEqual(
+            self.circuit_breaker.state, circuit_breaker.STATE_OPEN
+        )
+        self.assertFalse(self.circuit_breaker.allow_request())
+
+    def test_lost_trial_is_replaced_after_cooldown(self):
+        """test_lost_trial_is_replaced_after_cooldown"""
+        self._open()
+        time.sleep(0.06)
+        self.circuit_breaker.allow_request()
+        time.sleep(0.06)
+
+        self.assertTrue(self.circuit_breaker.allow_request())
+
+
+class TestCircuitBreakerRegistry(TestCase):
+    """Unit tests for `CircuitBreakerRegistry` class."""
+
+    def test_circuit_breaker_is_kept_by_instance(self):
+        """test_circuit_breaker_is_kept_by_instance"""
+        registry = circuit_breaker.CircuitBreakerRegistry()
+        instance = Instance(pk=1, name="remote")
+
+        self.assertEqual(
+            registry.get_state(instance), circuit_breaker.STATE_CLOSED
+        )
+        self.assertIs(registry.get(instance), registry.get(instance))
+        self.assertIsNot(
+            registry.get(instance), registry.get(Instance(pk=2, name="other"))
+        )
+
+    def test_reset_forgets_circuit_breakers(self):
+        """test_reset_forgets_circuit_breakers"""
+        registry = circuit_breaker.CircuitBreakerRegistry()
+        instance = Instance(pk=1, name="remote")
+        instance_circuit_breaker = registry.get(instance)
+
+        registry.reset()
+
+        self.assertIsNot(registry.get(instance), instance_circuit_breaker)
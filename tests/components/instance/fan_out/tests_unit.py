@@ -0,0 +1,196 @@
+"""Unit tests for `core_federated_search_app.components.instance.fan_out` package."""
+
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from core_federated_search_app.components.instance import (
+    fan_out as fan_out_module,
+)
+from core_federated_search_app.components.instance.models import Instance
+
+
+class TestFanOut(TestCase):
+    """Unit tests for `fan_out` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.instances = [
+            Instance(pk=1, name="fast", endpoint="http://fast.test"),
+            Instance(pk=2, name="slow", endpoint="http://slow.test"),
+            Instance(pk=3, name="down", endpoint="http://down.test"),
+        ]
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def _request(self, instance, timeout):
+        """Answer fast, hang, or fail depending on the instance."""
+        if instance.name == "slow":
+            self.release.wait(5)
+        if instance.name == "down":
+            raise requests.ConnectionError("refused")
+        return instance.name
+
+    def test_partial_results_are_returned_at_deadline(self):
+        """test_partial_results_are_returned_at_deadline"""
+        start = time.monotonic()
+
+        result = fan_out_module.fan_out(
+            self.instances, self._request, deadline=0.3, timeout=1
+        )
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(
+            [instance_result.result for instance_result in result.succeeded],
+            ["fast"],
+        )
+        self.assertEqual(
+            [instance.name for instance in result.timed_out], ["slow"]
+        )
+        self.assertEqual(
+            [instance_result.error for instance_result in result.failed],
+            ["refused"],
+        )
+
+    def test_instance_timeout_is_capped_by_deadline(self):
+        """test_instance_timeout_is_capped_by_deadline"""
+        timeouts = {}
+
+        def _request(instance, timeout):
+            timeouts[instance.name] = timeout
+            return instance.name
+
+        fan_out_module.fan_out(
+            self.instances,
+            _request,
+            deadline=5,
+            timeout=lambda instance: 1 if instance.name == "fast" else 60,
+        )
+
+        self.assertEqual(timeouts["fast"], 1)
+        self.assertLessEqual(timeouts["slow"], 5)
+
+    def test_default_timeout_adapts_to_instance_latency(self):
+        """test_default_timeout_adapts_to_instance_latency"""
+        timeouts = {}
+
+        def _request(instance, timeout):
+            timeouts[instance.name] = timeout
+            return instance.name
+
+        with patch.object(
+            fan_out_module,
+            "get_adaptive_timeout",
+            side_effect=lambda name, config, default: (
+                3 if name == "fast" else default
+            ),
+        ):
+            fan_out_module.fan_out(self.instances[:2], _request, deadline=60)
+
+        self.assertEqual(timeouts["fast"], 3)
+        self.assertEqual(
+            timeouts["slow"], fan_out_module.FAN_OUT_INSTANCE_TIMEOUT
+        )
+
+    def test_request_timeout_is_reported_as_timeout(self):
+        """test_request_timeout_is_reported_as_timeout"""
+
+        def _request(instance, timeout):
+            raise requests.ReadTimeout("read timed out")
+
+        result = fan_out_module.fan_out(self.instances[:1], _request)
+
+        self.assertEqual(
+            result.results[0].status, fan_out_module.STATUS_TIMEOUT
+        )
+
+
+@patch.object(fan_out_module.instance_api, "send_get_request_to_instance")
+class TestGetRequest(TestCase):
+    """Unit tests for `get_request` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.instance = Instance(
+            pk=1, name="remote", endpoint="http://remote.test/"
+        )
+
+    def test_path_is_requested_on_instance(self, mock_send_get_request):
+        """test_path_is_requested_on_instance"""
+        mock_send_get_request.return_value = MagicMock(status_code=200)
+
+        fan_out_module.get_request("/rest/data/", params={"page": 1})(
+            self.instance, 2
+        )
+
+        mock_send_get_request.assert_called_with(
+            self.instance,
+            "http://remote.test/rest/data/",
+            params={"page": 1},
+            headers=None,
+            timeout=2,
+        )
+
+    def test_error_status_raises_http_error(self, mock_send_get_request):
+        """test_error_status_raises_http_error"""
+        mock_send_get_request.return_value = MagicMock(status_code=500)
+
+        with self.assertRaises(requests.HTTPError):
+            fan_out_module.get_request("rest/data/")(self.instance, 2)
+
+
+class TestIsAllowedPath(TestCase):
+    """Unit tests for `is_allowed_path` function."""
+
+    allowed_paths = ("rest/data/",)
+
+    def test_allowed_prefix_is_allowed(self):
+        """test_allowed_prefix_is_allowed"""
+        for path in ("rest/data/", "/rest/data/1/", "rest/data"):
+            self.assertTrue(
+                fan_out_module.is_allowed_path(path, self.allowed_paths),
+                path,
+            )
+
+    def test_other_paths_are_rejected(self):
+        """test_other_paths_are_rejected"""
+        for path in ("rest/user/", "rest/database/", "rest/data-admin/"):
+            self.assertFalse(
+                fan_out_module.is_allowed_path(path, self.allowed_paths),
+                path,
+            )
+
+    def test_absolute_urls_are_rejected(self):
+        """test_absolute_urls_are_rejected"""
+        for path in (
+            "http://attacker.test/rest/data/",
+            "//attacker.test/rest/data/",
+            "\\\\attacker.test/rest/data/",
+        ):
+            self.assertFalse(
+                fan_out_module.is_allowed_path(path, self.allowed_paths),
+                path,
+            )
+
+    def test_dot_segments_are_rejected(self):
+        """test_dot_segments_are_rejected"""
+        for path in (
+            "rest/data/../user/",
+            "rest/data/%2e%2e/user/",
+            "rest/data/./",
+        ):
+            self.assertFalse(
+                fan_out_module.is_allowed_path(path, self.allowed_paths),
+                path,
+            )
+
+    def test_query_is_rejected(self):
+        """test_query_is_rejected"""
+        self.assertFalse(
+            fan_out_module.is_allowed_path(
+                "rest/data/?id=1", self.allowed_paths
+            )
+        )
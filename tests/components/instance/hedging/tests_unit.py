@@ -0,0 +1,185 @@
+"""Unit tests for `core_federated_search_app.components.instance.hedging` package."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from core_federated_search_app.components.instance import hedging
+
+
+class TestHedgingBudget(TestCase):
+    """Unit tests for `HedgingBudget` class."""
+
+    def test_hedges_are_limited_to_ratio(self):
+        """test_hedges_are_limited_to_ratio"""
+        budget = hedging.HedgingBudget()
+        for _ in range(40):
+            budget.record_request("remote")
+
+        hedges = [budget.try_hedge("remote", 0.05) for _ in range(5)]
+
+        self.assertEqual(hedges, [True, True, False, False, False])
+        self.assertFalse(budget.try_hedge("other", 0.05))
+
+    def test_counts_are_halved_after_window(self):
+        """test_counts_are_halved_after_window"""
+        budget = hedging.HedgingBudget(window=10)
+        for _ in range(10):
+            budget.record_request("remote")
+        for _ in range(5):
+            budget.try_hedge("remote", 0.5)
+
+        # 5.5 requests and 2.5 hedged requests are left
+        budget.record_request("remote")
+        hedges = [budget.try_hedge("remote", 1) for _ in range(4)]
+
+        self.assertEqual(hedges, [True, True, True, False])
+
+    def test_reset_forgets_requests(self):
+        """test_reset_forgets_requests"""
+        budget = hedging.HedgingBudget()
+        for _ in range(40):
+            budget.record_request("remote")
+
+        budget.reset()
+
+        self.assertFalse(budget.try_hedge("remote", 0.05))
+
+
+class TestSendHedgedRequest(TestCase):
+    """Unit tests for `send_hedged_request` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.responses = []
+        self.lock = threading.Lock()
+
+    def _send(self, stall_first=True, errors=()):
+        """Return a send function whose first call stalls."""
+
+        def _send_request():
+            with self.lock:
+                index = len(self.responses)
+                response = MagicMock(index=index)
+                self.responses.append(response)
+            if index in errors:
+                raise requests.ConnectionError(f"error {index}")
+            if index == 0 and stall_first:
+                self.release.wait(5)
+            return response
+
+        return _send_request
+
+    def test_fast_response_is_not_hedged(self):
+        """test_fast_response_is_not_hedged"""
+        response = hedging.send_hedged_request(
+            self._send(stall_first=False), 1, lambda: True
+        )
+
+        self.assertEqual(response.index, 0)
+        self.assertEqual(len(self.responses), 1)
+
+    def test_first_request_does_not_wait_for_a_worker(self):
+        """test_first_request_does_not_wait_for_a_worker"""
+        busy_executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(busy_executor.shutdown)
+        busy_executor.submit(self.release.wait, 5)
+
+        can_hedge = MagicMock(return_value=True)
+
+        with patch.dict(hedging._executors, {"hedged-request": busy_executor}):
+            response = hedging.send_hedged_request(
+                self._send(stall_first=False), 1, can_hedge
+            )
+
+        self.assertEqual(response.index, 0)
+        can_hedge.assert_not_called()
+
+    def test_request_is_not_hedged_without_primary_worker(self):
+        """test_request_is_not_hedged_without_primary_worker"""
+        threads = []
+
+        def _send_request():
+            threads.append(threading.current_thread())
+            return MagicMock()
+
+        can_hedge = MagicMock(return_value=True)
+
+        with patch.object(hedging, "_primary_slots", threading.Semaphore(0)):
+            hedging.send_hedged_request(_send_request, 0, can_hedge)
+
+        self.assertEqual(threads, [threading.current_thread()])
+        can_hedge.assert_not_called()
+
+    def test_primary_worker_is_freed_after_request(self):
+        """test_primary_worker_is_freed_after_request"""
+        primary_slots = threading.Semaphore(1)
+
+        with patch.object(hedging, "_primary_slots", primary_slots):
+            hedging.send_hedged_request(
+                self._send(stall_first=False), 1, lambda: True
+            )
+
+        self.assertTrue(primary_slots.acquire(timeout=1))
+
+    def test_stalled_request_is_hedged(self):
+        """test_stalled_request_is_hedged"""
+        response = hedging.send_hedged_request(
+            self._send(), 0.01, lambda: True
+        )
+
+        self.assertEqual(response.index, 1)
+        self.release.set()
+        # the slower response is closed once it arrives
+        for _ in range(100):
+            if self.responses[0].close.called:
+                break
+            time.sleep(0.01)
+        self.responses[0].close.assert_called_once()
+        response.close.assert_not_called()
+
+    def test_request_is_not_hedged_without_budget(self):
+        """test_request_is_not_hedged_without_budget"""
+        threading.Timer(0.05, self.release.set).start()
+
+        response = hedging.send_hedged_request(
+            self._send(), 0.01, lambda: False
+        )
+
+        self.assertEqual(response.index, 0)
+        self.assertEqual(len(self.responses), 1)
+
+    def test_failed_hedge_waits_for_first_request(self):
+        """test_failed_hedge_waits_for_first_request"""
+        threading.Timer(0.05, self.release.set).start()
+
+        response = hedging.send_hedged_request(
+            self._send(errors=(1,)), 0.01, lambda: True
+        )
+
+        self.assertEqual(response.index, 0)
+
+    def test_first_error_is_raised_if_both_fail(self):
+        """test_first_error_is_raised_if_both_fail"""
+        barrier = threading.Event()
+
+        def _send_request():
+            with self.lock:
+                index = len(self.responses)
+                self.responses.append(index)
+            if index == 0:
+                barrier.wait(5)
+                raise requests.ConnectionError("error 0")
+            barrier.set()
+            raise requests.ConnectionError("error 1")
+
+        with self.assertRaises(requests.ConnectionError) as context:
+            hedging.send_hedged_request(_send_request, 0.01, lambda: True)
+
+        self.assertIn(str(context.exception), ("error 0", "error 1"))
@@ -0,0 +1,136 @@
+"""Unit tests for `core_federated_search_app.components.instance.latency` package."""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from core_federated_search_app.components.instance import latency
+from core_federated_search_app.components.instance.remote import (
+    DEFAULT_SESSION_CONFIG,
+)
+
+
+class TestLatencyHistogram(TestCase):
+    """Unit tests for `LatencyHistogram` class."""
+
+    def test_percentiles_bound_the_samples(self):
+        """test_percentiles_bound_the_samples"""
+        histogram = latency.LatencyHistogram()
+        for _ in range(99):
+            histogram.add(0.1)
+        histogram.add(2)
+
+        self.assertGreaterEqual(histogram.get_percentile(50), 0.1)
+        self.assertLess(histogram.get_percentile(50), 0.1 * 1.2)
+        self.assertGreaterEqual(histogram.get_percentile(100), 2)
+        self.assertLess(histogram.get_percentile(100), 2 * 1.2)
+
+    def test_empty_histogram_has_no_percentile(self):
+        """test_empty_histogram_has_no_percentile"""
+        self.assertIsNone(latency.LatencyHistogram().get_percentile(99))
+
+    def test_old_samples_decay(self):
+        """test_old_samples_decay"""
+        histogram = latency.LatencyHistogram(window=10)
+        for _ in range(10):
+            histogram.add(5)
+        for _ in range(40):
+            histogram.add(0.1)
+
+        self.assertLess(histogram.get_percentile(95), 0.2)
+        self.assertEqual(histogram.samples, 50)
+
+    def test_extreme_latencies_are_bucketed(self):
+        """test_extreme_latencies_are_bucketed"""
+        histogram = latency.LatencyHistogram()
+        histogram.add(0)
+        histogram.add(10**6)
+
+        self.assertEqual(histogram.get_percentile(50), latency.MIN_LATENCY)
+        self.assertGreater(histogram.get_percentile(100), 600)
+
+    def test_rounded_total_returns_last_bucket(self):
+        """test_rounded_total_returns_last_bucket"""
+        histogram = latency.LatencyHistogram()
+        histogram.add(0.1)
+        # decayed counts may add up to slightly less than the total
+        histogram.total += 1e-9
+
+        self.assertGreater(histogram.get_percentile(100), 600)
+
+
+class TestGetAdaptiveTimeout(TestCase):
+    """Unit tests for `get_adaptive_timeout` function."""
+
+    def setUp(self):
+        """setUp"""
+        tracker_patcher = patch.object(
+            latency, "latency_tracker", latency.LatencyTracker()
+        )
+        self.tracker = tracker_patcher.start()
+        self.addCleanup(tracker_patcher.stop)
+        self.config = dict(DEFAULT_SESSION_CONFIG)
+
+    def _record(self, instance_name, value, count=20):
+        for _ in range(count):
+            self.tracker.record(instance_name, value)
+
+    def test_default_is_returned_without_enough_samples(self):
+        """test_default_is_returned_without_enough_samples"""
+        self._record("remote", 1, count=5)
+
+        self.assertEqual(
+            latency.get_adaptive_timeout("remote", self.config, 60), 60
+        )
+
+    def test_timeout_adapts_to_latency(self):
+        """test_timeout_adapts_to_latency"""
+        self._record("fast", 2)
+        self._record("slow", 20)
+
+        fast_timeout = latency.get_adaptive_timeout("fast", self.config, 60)
+        slow_timeout = latency.get_adaptive_timeout("slow", self.config, 60)
+
+        self.assertGreaterEqual(fast_timeout, 3)
+        self.assertLess(fast_timeout, 4)
+        self.assertGreaterEqual(slow_timeout, 30)
+        self.assertLess(slow_timeout, 40)
+
+    def test_timeout_is_clamped(self):
+        """test_timeout_is_clamped"""
+        self._record("fast", 0.01)
+        self._record("slow", 100)
+
+        self.assertEqual(
+            latency.get_adaptive_timeout("fast", self.config, 60),
+            self.config["adaptive_timeout_min"],
+        )
+        self.assertEqual(
+            latency.get_adaptive_timeout("slow", self.config, 60), 60
+        )
+
+    def test_disabled_adaptive_timeout_returns_default(self):
+        """test_disabled_adaptive_timeout_returns_default"""
+        self._record("remote", 2)
+        self.config["adaptive_timeout"] = False
+
+        self.assertEqual(
+            latency.get_adaptive_timeout("remote", self.config, 60), 60
+        )
+
+    def test_stats_are_returned(self):
+        """test_stats_are_returned"""
+        self._record("remote", 2, count=3)
+
+        stats = self.tracker.get_stats("remote")
+
+        self.assertEqual(stats["samples"], 3)
+        self.assertEqual(stats["average"], 2)
+        self.assertIsNone(self.tracker.get_stats("unknown"))
+
+    def test_reset_forgets_latencies(self):
+        """test_reset_forgets_latencies"""
+        self._record("remote", 2, count=3)
+
+        self.tracker.reset()
+
+        self.assertIsNone(self.tracker.get_stats("remote"))
@@ -1,14 +1,25 @@
 """Unit tests for `core_federated_search_app.components.instance.models` package."""
 
+import importlib
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
 
-from django.db import IntegrityError
+from django.apps import apps
+from django.db import IntegrityError, connection
+from django.test import TestCase as DjangoTestCase
 
 from core_federated_search_app.components.instance import (
     models as instance_models,
 )
-from core_main_app.commons.exceptions import ModelError, NotUniqueError
+from core_main_app.commons.exceptions import (
+    DoesNotExist,
+    ModelError,
+    NotUniqueError,
+)
+
+normalized_endpoint_migration = importlib.import_module(
+    "core_federated_search_app.migrations.0004_instance_normalized_endpoint"
+)
 
 
 class TestSaveObject(TestCase):
@@ -94,3 +105,271 @@ class TestClean(TestCase):
         mock_instance.clean()
 
         self.assertEqual(mock_instance.name, str(orig_name).strip())
+
+
+class TestNormalizeEndpoint(TestCase):
+    """Unit tests for `normalize_endpoint` method."""
+
+    def test_normalized_fields_are_set(self):
+        """test_normalized_fields_are_set"""
+        mock_instance = instance_models.Instance(
+            endpoint="HTTPS://Host.Example.com/cdcs1/"
+        )
+
+        mock_instance.normalize_endpoint()
+
+        self.assertEqual(mock_instance.endpoint_scheme, "https")
+        self.assertEqual(mock_instance.endpoint_host, "host.example.com")
+        self.assertEqual(mock_instance.endpoint_port, 443)
+        self.assertEqual(mock_instance.endpoint_path, "/cdcs1")
+
+
+class TestSaveNormalizesEndpoint(DjangoTestCase):
+    """Unit tests for the normalized endpoint filled in by `save`."""
+
+    def test_plain_save_normalizes_endpoint(self):
+        """test_plain_save_normalizes_endpoint"""
+        instance = instance_models.Instance(
+            name="name", endpoint="http://host.test:8000/cdcs"
+        )
+
+        instance.save()
+
+        instance = instance_models.Instance.get_by_id(instance.pk)
+        self.assertEqual(instance.endpoint_port, 8000)
+        self.assertEqual(instance.endpoint_path, "/cdcs")
+
+    def test_endpoint_update_saves_normalized_endpoint(self):
+        """test_endpoint_update_saves_normalized_endpoint"""
+        instance = instance_models.Instance(
+            name="name", endpoint="http://host.test/cdcs"
+        )
+        instance.save()
+
+        instance.endpoint = "http://other.test/cdcs2"
+        instance.save(update_fields=["endpoint"])
+
+        instance = instance_models.Instance.get_by_id(instance.pk)
+        self.assertEqual(instance.endpoint_host, "other.test")
+        self.assertEqual(instance.endpoint_path, "/cdcs2")
+
+
+class TestNormalizeInstanceEndpointsMigration(DjangoTestCase):
+    """Unit tests for the migration filling in the normalized endpoints."""
+
+    def test_existing_instances_are_normalized(self):
+        """test_existing_instances_are_normalized"""
+        instance = instance_models.Instance(
+            name="name", endpoint="HTTPS://Host.test//cdcs/"
+        )
+        instance.save()
+        # instances saved before the migration have no normalized endpoint
+        instance_models.Instance.objects.update(
+            endpoint_scheme="", endpoint_host="", endpoint_path=""
+        )
+
+        normalized_endpoint_migration.normalize_instance_endpoints(apps, None)
+
+        instance = instance_models.Instance.get_by_id(instance.pk)
+        self.assertEqual(instance.endpoint_scheme, "https")
+        self.assertEqual(instance.endpoint_host, "host.test")
+        self.assertEqual(instance.endpoint_port, 443)
+        self.assertEqual(instance.endpoint_path, "/cdcs")
+
+
+class TestGetByUrl(DjangoTestCase):
+    """Unit tests for `get_by_url` method."""
+
+    def setUp(self):
+        """setUp"""
+        for name, endpoint in (
+            ("root", "https://host.test"),
+            ("cdcs1", "https://host.test/cdcs1"),
+            ("cdcs2", "https://host.test/cdcs2/"),
+        ):
+            instance_models.Instance(
+                name=name, endpoint=endpoint
+            ).save_object()
+
+    def test_instances_sharing_a_host_are_resolved(self):
+        """test_instances_sharing_a_host_are_resolved"""
+        self.assertEqual(
+            instance_models.Instance.get_by_url(
+                "https://host.test/cdcs2/rest/blob/download/1/"
+            ).name,
+            "cdcs2",
+        )
+
+    def test_longest_prefix_is_returned(self):
+        """test_longest_prefix_is_returned"""
+        self.assertEqual(
+            instance_models.Instance.get_by_url(
+                "https://HOST.test:443/cdcs1/rest/blob/download/1/"
+            ).name,
+            "cdcs1",
+        )
+
+    def test_prefix_must_end_on_a_path_segment(self):
+        """test_prefix_must_end_on_a_path_segment"""
+        self.assertEqual(
+            instance_models.Instance.get_by_url(
+                "https://host.test/cdcs10/rest/blob/download/1/"
+            ).name,
+            "root",
+        )
+
+    def test_unknown_url_raises_does_not_exist(self):
+        """test_unknown_url_raises_does_not_exist"""
+        with self.assertRaises(DoesNotExist):
+            instance_models.Instance.get_by_url(
+                "https://evil.test/?x=https://host.test/cdcs1"
+            )
+
+    def test_invalid_url_raises_model_error(self):
+        """test_invalid_url_raises_model_error"""
+        with self.assertRaises(ModelError):
+            instance_models.Instance.get_by_url("http://[invalid")
+
+
+class TestGetByEndpointStartingWith(DjangoTestCase):
+    """Unit tests for `get_by_endpoint_starting_with` method."""
+
+    def setUp(self):
+        """setUp"""
+        for name, endpoint in (
+            ("cdcs1", "https://host.test/cdcs1"),
+            ("cdcs2", "https://host.test/cdcs2"),
+        ):
+            instance_models.Instance(
+                name=name, endpoint=endpoint
+            ).save_object()
+
+    def test_matching_instance_is_returned(self):
+        """test_matching_instance_is_returned"""
+        self.assertEqual(
+            instance_models.Instance.get_by_endpoint_starting_with(
+                "https://host.test/cdcs1"
+            ).name,
+            "cdcs1",
+        )
+
+    def test_unknown_endpoint_raises_does_not_exist(self):
+        """test_unknown_endpoint_raises_does_not_exist"""
+        with self.assertRaises(DoesNotExist):
+            instance_models.Instance.get_by_endpoint_starting_with(
+                "https://other.test"
+            )
+
+    def test_ambiguous_endpoint_raises_model_error(self):
+        """test_ambiguous_endpoint_raises_model_error"""
+        with self.assertRaises(ModelError):
+            instance_models.Instance.get_by_endpoint_starting_with(
+                "https://host.test/cdcs"
+            )
+
+
+class TestGetByIdForUpdate(DjangoTestCase):
+    """Unit tests for `get_by_id_for_update` method."""
+
+    def test_instance_is_returned(self):
+        """test_instance_is_returned"""
+        instance = instance_models.Instance(
+            name="name", endpoint="http://host.test"
+        )
+        instance.save()
+
+        self.assertEqual(
+            instance_models.Instance.get_by_id_for_update(instance.pk),
+            instance,
+        )
+
+    def test_unknown_id_raises_does_not_exist(self):
+        """test_unknown_id_raises_does_not_exist"""
+        with self.assertRaises(DoesNotExist):
+            instance_models.Instance.get_by_id_for_update(1)
+
+    def test_malformed_id_raises_model_error(self):
+        """test_malformed_id_raises_model_error"""
+        with self.assertRaises(ModelError):
+            instance_models.Instance.get_by_id_for_update("test")
+
+
+class TestClientCredentials(DjangoTestCase):
+    """Unit tests for the encrypted client credentials fields."""
+
+    def test_credentials_are_encrypted_at_rest(self):
+        """test_credentials_are_encrypted_at_rest"""
+        instance = instance_models.Instance(
+            name="name",
+            endpoint="https://host.test",
+            client_id="my_client_id",
+            client_secret="my_client_secret",
+        )
+        instance.save_object()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT client_id, client_secret FROM "
+                f"{instance_models.Instance._meta.db_table} WHERE id = %s",
+                [instance.pk],
+            )
+            raw_client_id, raw_client_secret = cursor.fetchone()
+
+        self.assertNotEqual(raw_client_id, "my_client_id")
+        self.assertNotEqual(raw_client_secret, "my_client_secret")
+
+    def test_credentials_are_decrypted_on_read(self):
+        """test_credentials_are_decrypted_on_read"""
+        instance = instance_models.Instance(
+            name="name",
+            endpoint="https://host.test",
+            client_id="my_client_id",
+            client_secret="my_client_secret",
+        )
+        instance.save_object()
+
+        instance = instance_models.Instance.objects.get(pk=instance.pk)
+
+        self.assertEqual(instance.client_id, "my_client_id")
+        self.assertEqual(instance.client_secret, "my_client_secret")
+
+
+class TestSaveObjectTokens(DjangoTestCase):
+    """Unit tests for the token columns saved by `save_object`"""
+
+    def setUp(self):
+        """setUp"""
+        instance = instance_models.Instance(
+            name="name",
+            endpoint="https://host.test",
+            access_token="access_token_0",
+            refresh_token="refresh_token_0",
+        )
+        instance.save_object()
+        self.instance_id = instance.pk
+
+    def test_stale_copy_does_not_overwrite_refreshed_tokens(self):
+        """test_stale_copy_does_not_overwrite_refreshed_tokens"""
+        stale_instance = instance_models.Instance.get_by_id(self.instance_id)
+        instance_models.Instance.objects.filter(pk=self.instance_id).update(
+            access_token="access_token_1", refresh_token="refresh_token_1"
+        )
+
+        stale_instance.name = "new_name"
+        stale_instance.save_object()
+
+        instance = instance_models.Instance.get_by_id(self.instance_id)
+        self.assertEqual(instance.name, "new_name")
+        self.assertEqual(instance.access_token, "access_token_1")
+        self.assertEqual(instance.refresh_token, "refresh_token_1")
+
+    def test_changed_tokens_are_saved(self):
+        """test_changed_tokens_are_saved"""
+        instance = instance_models.Instance.get_by_id(self.instance_id)
+
+        instance.access_token = "access_token_1"
+        instance.save_object()
+
+        instance = instance_models.Instance.get_by_id(self.instance_id)
+        self.assertEqual(instance.access_token, "access_token_1")
+        self.assertEqual(instance.refresh_token, "refresh_token_0")
@@ -0,0 +1,314 @@
+"""Unit tests for `core_federated_search_app.components.instance.registry` package."""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from core_federated_search_app.components.instance import (
+    registry as instance_registry_module,
+)
+from core_federated_search_app.components.instance.models import Instance
+from core_main_app.commons import exceptions
+
+
+def _get_instance(pk, name):
+    """Return an unsaved instance with the given primary key and name."""
+    return Instance(pk=pk, name=name, endpoint=f"http://{name}.test")
+
+
+class TestInstanceRegistry(TestCase):
+    """Unit tests for `InstanceRegistry` class."""
+
+    def setUp(self):
+        """setUp"""
+        cache.delete(instance_registry_module.REGISTRY_VERSION_CACHE_KEY)
+        self.registry = instance_registry_module.InstanceRegistry()
+        self.instances = [_get_instance(1, "one"), _get_instance(2, "two")]
+
+    @patch.object(Instance, "get_all")
+    def test_lookups_are_served_from_a_single_load(self, mock_get_all):
+        """test_lookups_are_served_from_a_single_load"""
+        mock_get_all.return_value = self.instances
+
+        self.registry.get_all()
+        self.registry.get_by_id(1)
+        self.registry.get_by_id("2")
+        self.registry.get_by_name("one")
+
+        mock_get_all.assert_called_once()
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_id_returns_copy(self, mock_get_all):
+        """test_get_by_id_returns_copy"""
+        mock_get_all.return_value = self.instances
+
+        instance = self.registry.get_by_id(1)
+        instance.name = "renamed"
+
+        self.assertEqual(self.registry.get_by_id(1).name, "one")
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_id_raises_does_not_exist(self, mock_get_all):
+        """test_get_by_id_raises_does_not_exist"""
+        mock_get_all.return_value = self.instances
+
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_id(3)
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_id_with_malformed_id_raises_model_error(
+        self, mock_get_all
+    ):
+        """test_get_by_id_with_malformed_id_raises_model_error"""
+        mock_get_all.return_value = self.instances
+
+        with self.assertRaises(exceptions.ModelError):
+            self.registry.get_by_id("test")
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_name_raises_does_not_exist(self, mock_get_all):
+        """test_get_by_name_raises_does_not_exist"""
+        mock_get_all.return_value = self.instances
+
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_name("three")
+
+    @patch.object(Instance, "get_all")
+    def test_invalidate_reloads_snapshot(self, mock_get_all):
+        """test_invalidate_reloads_snapshot"""
+        mock_get_all.return_value = self.instances
+        self.registry.get_all()
+
+        self.registry.invalidate()
+        self.registry.get_all()
+
+        self.assertEqual(mock_get_all.call_count, 2)
+
+    @patch.object(Instance, "get_all")
+    def test_version_bumped_by_other_worker_reloads_snapshot(
+        self, mock_get_all
+    ):
+        """test_version_bumped_by_other_worker_reloads_snapshot"""
+        mock_get_all.return_value = self.instances
+        self.registry.get_all()
+
+        instance_registry_module.InstanceRegistry().invalidate()
+        self.registry.get_all()
+
+        self.assertEqual(mock_get_all.call_count, 2)
+
+    @patch.object(Instance, "get_all")
+    def test_evicted_version_reloads_snapshot(self, mock_get_all):
+        """test_evicted_version_reloads_snapshot"""
+        mock_get_all.return_value = self.instances
+        self.registry.get_all()
+
+        cache.delete(instance_registry_module.REGISTRY_VERSION_CACHE_KEY)
+        self.registry.get_all()
+
+        self.assertEqual(mock_get_all.call_count, 2)
+
+
+class TestInstanceRegistryGetByUrl(TestCase):
+    """Unit tests for `InstanceRegistry.get_by_url` method."""
+
+    def setUp(self):
+        """setUp"""
+        cache.delete(instance_registry_module.REGISTRY_VERSION_CACHE_KEY)
+        self.registry = instance_registry_module.InstanceRegistry()
+        self.instances = [
+            Instance(pk=1, name="root", endpoint="https://host.test"),
+            Instance(pk=2, name="cdcs1", endpoint="https://host.test/cdcs1"),
+            Instance(pk=3, name="cdcs2", endpoint="https://host.test/cdcs2/"),
+        ]
+
+    @patch.object(Instance, "get_all")
+    def test_instances_sharing_a_host_are_resolved(self, mock_get_all):
+        """test_instances_sharing_a_host_are_resolved"""
+        mock_get_all.return_value = self.instances
+
+        self.assertEqual(
+            self.registry.get_by_url(
+                "https://HOST.test:443/cdcs2/rest/blob/download/1/"
+            ).name,
+            "cdcs2",
+        )
+
+    @patch.object(Instance, "get_all")
+    def test_prefix_must_end_on_a_path_segment(self, mock_get_all):
+        """test_prefix_must_end_on_a_path_segment"""
+        mock_get_all.return_value = self.instances
+
+        self.assertEqual(
+            self.registry.get_by_url("https://host.test/cdcs10/blob").name,
+            "root",
+        )
+
+    @patch.object(Instance, "get_all")
+    def test_endpoint_in_query_string_raises_does_not_exist(
+        self, mock_get_all
+    ):
+        """test_endpoint_in_query_string_raises_does_not_exist"""
+        mock_get_all.return_value = self.instances
+
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_url(
+                "https://evil.test/?x=https://host.test/cdcs1"
+            )
+
+    @patch.object(Instance, "get_all")
+    def test_invalid_url_raises_does_not_exist(self, mock_get_all):
+        """test_invalid_url_raises_does_not_exist"""
+        mock_get_all.return_value = self.instances
+
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_url("https://host.test:port/cdcs1")
+
+
+class TestInstanceRegistryNegativeCache(TestCase):
+    """Unit tests for the urls and endpoints remembered as missing."""
+
+    def setUp(self):
+        """setUp"""
+        cache.delete(instance_registry_module.REGISTRY_VERSION_CACHE_KEY)
+        self.registry = instance_registry_module.InstanceRegistry()
+        self.instances = [
+            Instance(pk=1, name="cdcs1", endpoint="https://host.test/cdcs1"),
+            Instance(pk=2, name="cdcs2", endpoint="https://host.test/cdcs2"),
+        ]
+
+    @patch.object(Instance, "get_all")
+    def test_unknown_url_is_not_routed_again(self, mock_get_all):
+        """test_unknown_url_is_not_routed_again"""
+        mock_get_all.return_value = self.instances
+        url = "https://unknown.test/rest/blob/download/1/"
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_url(url)
+
+        with patch.object(
+            instance_registry_module, "_get_routing_key"
+        ) as mock_get_routing_key:
+            with self.assertRaises(exceptions.DoesNotExist):
+                self.registry.get_by_url(url)
+            mock_get_routing_key.assert_not_called()
+
+    @patch.object(Instance, "get_all")
+    def test_registry_change_forgets_unknown_urls(self, mock_get_all):
+        """test_registry_change_forgets_unknown_urls"""
+        mock_get_all.return_value = self.instances
+        url = "https://host.test/cdcs3/rest/blob/download/1/"
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_url(url)
+
+        mock_get_all.return_value = self.instances + [
+            Instance(pk=3, name="cdcs3", endpoint="https://host.test/cdcs3")
+        ]
+        self.registry.invalidate()
+
+        self.assertEqual(self.registry.get_by_url(url).name, "cdcs3")
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_endpoint_starting_with(self, mock_get_all):
+        """test_get_by_endpoint_starting_with"""
+        mock_get_all.return_value = self.instances
+
+        self.assertEqual(
+            self.registry.get_by_endpoint_starting_with(
+                "https://host.test/cdcs2"
+            ).name,
+            "cdcs2",
+        )
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_endpoint_starting_with("https://other.test")
+        with self.assertRaises(exceptions.ModelError):
+            self.registry.get_by_endpoint_starting_with("https://host.test")
+        self.assertEqual(len(self.registry.misses), 1)
+
+    @patch.object(Instance, "get_all")
+    def test_unknown_endpoint_is_not_searched_again(self, mock_get_all):
+        """test_unknown_endpoint_is_not_searched_again"""
+        mock_get_all.return_value = self.instances
+        with self.assertRaises(exceptions.DoesNotExist):
+            self.registry.get_by_endpoint_starting_with("https://other.test")
+
+        snapshot = self.registry.get_snapshot()
+        with patch.object(
+            snapshot,
+            "instances",
+            (Instance(pk=3, name="other", endpoint="https://other.test"),),
+        ):
+            with self.assertRaises(exceptions.DoesNotExist):
+                self.registry.get_by_endpoint_starting_with(
+                    "https://other.test"
+                )
+
+
+class TestInstanceRegistryBulkLookups(TestCase):
+    """Unit tests for `InstanceRegistry` bulk lookup methods."""
+
+    def setUp(self):
+        """setUp"""
+        cache.delete(instance_registry_module.REGISTRY_VERSION_CACHE_KEY)
+        self.registry = instance_registry_module.InstanceRegistry()
+        self.instances = [
+            Instance(pk=1, name="one", endpoint="https://host.test/one"),
+            Instance(pk=2, name="two", endpoint="https://host.test/two"),
+        ]
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_ids_reports_missing_ids(self, mock_get_all):
+        """test_get_by_ids_reports_missing_ids"""
+        mock_get_all.return_value = self.instances
+
+        instances, missing = self.registry.get_by_ids(["1", 2, 3, "test"])
+
+        self.assertEqual(
+            {key: instance.name for key, instance in instances.items()},
+            {"1": "one", 2: "two"},
+        )
+        self.assertEqual(missing, [3, "test"])
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_names_reports_missing_names(self, mock_get_all):
+        """test_get_by_names_reports_missing_names"""
+        mock_get_all.return_value = self.instances
+
+        instances, missing = self.registry.get_by_names(["two", "three"])
+
+        self.assertEqual(list(instances), ["two"])
+        self.assertEqual(missing, ["three"])
+
+    @patch.object(Instance, "get_all")
+    def test_get_by_endpoints_is_keyed_by_normalized_endpoint(
+        self, mock_get_all
+    ):
+        """test_get_by_endpoints_is_keyed_by_normalized_endpoint"""
+        mock_get_all.return_value = self.instances
+
+        instances, missing = self.registry.get_by_endpoints(
+            [
+                "HTTPS://host.test/one/",
+                "https://host.test/three",
+                "https://host.test:port/one",
+            ]
+        )
+
+        self.assertEqual(
+            {key: instance.name for key, instance in instances.items()},
+            {"https://host.test:443/one": "one"},
+        )
+        self.assertEqual(
+            missing, ["https://host.test/three", "https://host.test:port/one"]
+        )
+
+    @patch.object(Instance, "get_all")
+    def test_bulk_lookups_use_a_single_load(self, mock_get_all):
+        """test_bulk_lookups_use_a_single_load"""
+        mock_get_all.return_value = self.instances
+
+        self.registry.get_by_ids([1, 2])
+        self.registry.get_by_names(["one", "two"])
+        self.registry.get_by_endpoints(["https://host.test/one"])
+
+        mock_get_all.assert_called_once()
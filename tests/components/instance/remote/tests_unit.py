@@ -0,0 +1,264 @@
+"""Unit tests for `core_federated_search_app.components.instance.remote` package."""
+
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from core_explore_common_app.commons.exceptions import (
+    UsernamePasswordRequiredError,
+)
+from core_federated_search_app.components.instance import latency, remote
+
+
+class TestSendGetRequest(TestCase):
+    """Unit tests for `send_get_request` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.mock_session = MagicMock()
+        session_pool_patcher = patch.object(remote, "session_pool")
+        self.mock_session_pool = session_pool_patcher.start()
+        self.mock_session_pool.get.return_value = (
+            self.mock_session,
+            remote.get_session_config(),
+        )
+        self.addCleanup(session_pool_patcher.stop)
+
+    def test_access_token_is_sent_as_bearer(self):
+        """test_access_token_is_sent_as_bearer"""
+        remote.send_get_request(
+            "http://remote.test/blob",
+            "token",
+            instance_name="remote",
+            headers={"Range": "bytes=0-1"},
+        )
+
+        self.mock_session_pool.get.assert_called_with(
+            "http://remote.test/blob", "remote"
+        )
+        self.assertEqual(
+            self.mock_session.request.call_args.kwargs["headers"],
+            {"Range": "bytes=0-1", "Authorization": "Bearer token"},
+        )
+
+    def test_public_instance_request_has_no_authorization(self):
+        """test_public_instance_request_has_no_authorization"""
+        remote.send_get_request("http://remote.test/blob", None, stream=True)
+
+        self.assertEqual(
+            self.mock_session.request.call_args.kwargs["headers"], {}
+        )
+        self.assertTrue(self.mock_session.request.call_args.kwargs["stream"])
+
+    def test_head_request_sends_access_token(self):
+        """test_head_request_sends_access_token"""
+        remote.send_head_request("http://remote.test/blob", "token")
+
+        self.assertEqual(
+            self.mock_session.request.call_args.args,
+            ("HEAD", "http://remote.test/blob"),
+        )
+        self.assertEqual(
+            self.mock_session.request.call_args.kwargs["headers"],
+            {"Authorization": "Bearer token"},
+        )
+
+    def test_configured_timeouts_are_used_by_default(self):
+        """test_configured_timeouts_are_used_by_default"""
+        remote.send_get_request("http://remote.test/blob", None)
+
+        self.assertEqual(
+            self.mock_session.request.call_args.kwargs["timeout"],
+            (
+                remote.DEFAULT_SESSION_CONFIG["connect_timeout"],
+                remote.DEFAULT_SESSION_CONFIG["read_timeout"],
+            ),
+        )
+
+    def test_read_timeout_adapts_to_instance_latency(self):
+        """test_read_timeout_adapts_to_instance_latency"""
+        tracker = latency.LatencyTracker()
+        for _ in range(20):
+            tracker.record("remote", 2)
+
+        with patch.object(latency, "latency_tracker", tracker):
+            remote.send_get_request(
+                "http://remote.test/blob", None, instance_name="remote"
+            )
+
+        read_timeout = self.mock_session.request.call_args.kwargs["timeout"][1]
+        self.assertGreaterEqual(read_timeout, 3)
+        self.assertLess(read_timeout, 4)
+
+    def test_streamed_request_keeps_configured_read_timeout(self):
+        """test_streamed_request_keeps_configured_read_timeout"""
+        tracker = latency.LatencyTracker()
+        for _ in range(20):
+            tracker.record("remote", 2)
+
+        with patch.object(latency, "latency_tracker", tracker):
+            remote.send_get_request(
+                "http://remote.test/blob",
+                None,
+                instance_name="remote",
+                stream=True,
+            )
+
+        self.assertEqual(
+            self.mock_session.request.call_args.kwargs["timeout"][1],
+            remote.DEFAULT_SESSION_CONFIG["read_timeout"],
+        )
+
+    def test_get_request_is_hedged_when_enabled(self):
+        """test_get_request_is_hedged_when_enabled"""
+        config = dict(remote.get_session_config(), hedging=True)
+        self.mock_session_pool.get.return_value = (self.mock_session, config)
+        tracker = latency.LatencyTracker()
+        for _ in range(20):
+            tracker.record("remote", 0.5)
+
+        with patch.object(remote, "latency_tracker", tracker), patch.object(
+            remote, "send_hedged_request"
+        ) as mock_send_hedged_request:
+            remote.send_get_request(
+                "http://remote.test/blob", None, instance_name="remote"
+            )
+            remote.post_refresh_token(
+                "http://remote.test", "id", "secret", 1, "token", "remote"
+            )
+
+        mock_send_hedged_request.assert_called_once()
+        delay = mock_send_hedged_request.call_args.args[1]
+        self.assertGreaterEqual(delay, 0.5)
+        self.assertLess(delay, 0.6)
+
+    def test_get_request_is_not_hedged_without_samples(self):
+        """test_get_request_is_not_hedged_without_samples"""
+        config = dict(remote.get_session_config(), hedging=True)
+        self.mock_session_pool.get.return_value = (self.mock_session, config)
+
+        with patch.object(
+            remote, "latency_tracker", latency.LatencyTracker()
+        ), patch.object(remote, "send_hedged_request") as mock_send_hedged:
+            remote.send_get_request(
+                "http://remote.test/blob", None, instance_name="remote"
+            )
+
+        mock_send_hedged.assert_not_called()
+        self.mock_session.request.assert_called_once()
+
+    def test_latency_is_recorded_on_timeout(self):
+        """test_latency_is_recorded_on_timeout"""
+        tracker = latency.LatencyTracker()
+        self.mock_session.request.side_effect = requests.ReadTimeout()
+
+        with patch.object(remote, "latency_tracker", tracker):
+            with self.assertRaises(requests.ReadTimeout):
+                remote.send_get_request(
+                    "http://remote.test/blob", None, instance_name="remote"
+                )
+
+        self.assertEqual(tracker.get_stats("remote")["samples"], 1)
+
+    def test_post_request_token_without_password_raises_error(self):
+        """test_post_request_token_without_password_raises_error"""
+        with self.assertRaises(UsernamePasswordRequiredError):
+            remote.post_request_token(
+                "http://remote.test", "id", "secret", 1, "user", None
+            )
+
+    def test_post_request_token_is_sent_to_token_url(self):
+        """test_post_request_token_is_sent_to_token_url"""
+        remote.post_request_token(
+            "http://remote.test", "id", "secret", 1, "user", "password"
+        )
+
+        args, kwargs = self.mock_session.request.call_args
+        self.assertEqual(args, ("POST", "http://remote.test/o/token/"))
+        self.assertEqual(kwargs["data"]["grant_type"], "password")
+        self.assertEqual(kwargs["data"]["username"], "user")
+
+    def test_post_refresh_token_is_sent_to_token_url(self):
+        """test_post_refresh_token_is_sent_to_token_url"""
+        remote.post_refresh_token(
+            "http://remote.test", "id", "secret", "1", "refresh"
+        )
+
+        args, kwargs = self.mock_session.request.call_args
+        self.assertEqual(args, ("POST", "http://remote.test/o/token/"))
+        self.assertEqual(kwargs["data"]["grant_type"], "refresh_token")
+        self.assertEqual(kwargs["timeout"], 1)
+
+
+class TestInstanceSessionPool(TestCase):
+    """Unit tests for `InstanceSessionPool` class."""
+
+    def setUp(self):
+        """setUp"""
+        self.pool = remote.InstanceSessionPool()
+        self.addCleanup(self.pool.close_all)
+
+    def test_session_is_reused_for_same_instance_and_origin(self):
+        """test_session_is_reused_for_same_instance_and_origin"""
+        session, _ = self.pool.get("https://remote.test/a", "remote")
+        same_session, _ = self.pool.get("https://remote.test:443/b", "remote")
+
+        self.assertIs(session, same_session)
+        self.assertEqual(len(self.pool), 1)
+
+    def test_new_endpoint_origin_gets_new_session(self):
+        """test_new_endpoint_origin_gets_new_session"""
+        session, _ = self.pool.get("https://remote.test/a", "remote")
+        other_session, _ = self.pool.get("https://moved.test/a", "remote")
+
+        self.assertIsNot(session, other_session)
+
+    @patch.object(
+        remote,
+        "INSTANCE_HTTP_SESSIONS",
+        {"default": {"read_timeout": 30}, "remote": {"max_retries": 5}},
+    )
+    def test_instance_config_overrides_default(self):
+        """test_instance_config_overrides_default"""
+        session, config = self.pool.get("https://remote.test/a", "remote")
+
+        self.assertEqual(config["read_timeout"], 30)
+        self.assertEqual(config["max_retries"], 5)
+        self.assertEqual(
+            session.get_adapter("https://remote.test").max_retries.total, 5
+        )
+
+    @patch.object(
+        remote, "INSTANCE_HTTP_SESSIONS", {"default": {"idle_timeout": 0}}
+    )
+    def test_idle_sessions_are_closed(self):
+        """test_idle_sessions_are_closed"""
+        session, _ = self.pool.get("https://remote.test/a", "remote")
+
+        with patch.object(session, "close") as mock_close:
+            self.pool.close_idle_sessions()
+
+        mock_close.assert_called_once()
+        self.assertEqual(len(self.pool), 0)
+
+    @patch.object(
+        remote, "INSTANCE_HTTP_SESSIONS", {"default": {"keep_alive": False}}
+    )
+    def test_session_without_keep_alive_closes_connections(self):
+        """test_session_without_keep_alive_closes_connections"""
+        session, _ = self.pool.get("https://remote.test/a", "remote")
+
+        self.assertEqual(session.headers["Connection"], "close")
+
+    @patch.object(
+        remote, "INSTANCE_HTTP_SESSIONS", {"default": {"idle_timeout": 0}}
+    )
+    def test_session_close_error_is_not_raised(self):
+        """test_session_close_error_is_not_raised"""
+        session, _ = self.pool.get("https://remote.test/a", "remote")
+
+        with patch.object(session, "close", side_effect=Exception("error")):
+            self.pool.close_idle_sessions()
+
+        self.assertEqual(len(self.pool), 0)
@@ -0,0 +1,184 @@
+"""Unit tests for `core_federated_search_app.components.instance.token_store` package."""
+
+import json
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from django.core.cache import cache
+
+from core_federated_search_app.components.instance import (
+    token_store as token_store_module,
+)
+from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.components.instance.token_store import (
+    CacheTokenStore,
+    DatabaseTokenStore,
+    MemoryTokenStore,
+    TokenGrant,
+    TokenStore,
+)
+from core_main_app.commons import exceptions
+from core_main_app.utils.datetime import datetime_now, datetime_timedelta
+
+
+def _get_instance():
+    """Return an unsaved instance with a token."""
+    return Instance(
+        pk=1,
+        name="one",
+        endpoint="http://one.test",
+        access_token="access",
+        refresh_token="refresh",
+        expires=datetime_now() + datetime_timedelta(seconds=3600),
+    )
+
+
+class TestTokenGrant(TestCase):
+    """Unit tests for `TokenGrant` class."""
+
+    def test_from_response_content_parses_token(self):
+        """test_from_response_content_parses_token"""
+        content = json.dumps(
+            {
+                "access_token": "access",
+                "refresh_token": "refresh",
+                "expires_in": 3600,
+            }
+        )
+
+        grant = TokenGrant.from_response_content(content)
+
+        self.assertEqual(grant.access_token, "access")
+        self.assertEqual(grant.refresh_token, "refresh")
+        self.assertFalse(grant.is_expiring(60))
+        self.assertTrue(grant.is_expiring(7200))
+
+    def test_apply_to_sets_instance_fields(self):
+        """test_apply_to_sets_instance_fields"""
+        instance = _get_instance()
+        grant = TokenGrant("new_access", "new_refresh", None)
+
+        grant.apply_to(instance)
+
+        self.assertEqual(TokenGrant.from_instance(instance), grant)
+
+    def test_grant_without_expiration_is_not_expiring(self):
+        """test_grant_without_expiration_is_not_expiring"""
+        self.assertFalse(TokenGrant(None, None, None).is_expiring(60))
+
+    def test_repr_does_not_expose_tokens(self):
+        """test_repr_does_not_expose_tokens"""
+        self.assertNotIn("access", repr(TokenGrant("access", "refresh", None)))
+
+    def test_grant_is_not_equal_to_other_types(self):
+        """test_grant_is_not_equal_to_other_types"""
+        self.assertNotEqual(TokenGrant("access", "refresh", None), "access")
+
+
+class TestTokenStore(TestCase):
+    """Unit tests for `TokenStore` abstract classes."""
+
+    def test_abstract_methods_raise_not_implemented_error(self):
+        """test_abstract_methods_raise_not_implemented_error"""
+        grant = TokenGrant("access", "refresh", None)
+        write_through_store = token_store_module._WriteThroughTokenStore
+
+        for method, args in (
+            (TokenStore.get, (None,)),
+            (TokenStore.set, (None, grant)),
+            (write_through_store._get_cached, (1,)),
+            (write_through_store._set_cached, (1, grant)),
+        ):
+            with self.assertRaises(NotImplementedError):
+                method(None, *args)
+
+
+@patch.object(token_store_module, "instance_registry")
+@patch.object(Instance, "objects")
+class TestDatabaseTokenStore(TestCase):
+    """Unit tests for `DatabaseTokenStore` class."""
+
+    def test_get_reads_instance_fields(self, mock_objects, mock_registry):
+        """test_get_reads_instance_fields"""
+        instance = _get_instance()
+
+        grant = DatabaseTokenStore().get(instance)
+
+        self.assertEqual(grant.access_token, "access")
+        mock_objects.filter.assert_not_called()
+
+    def test_set_updates_token_columns_and_invalidates_registry(
+        self, mock_objects, mock_registry
+    ):
+        """test_set_updates_token_columns_and_invalidates_registry"""
+        instance = _get_instance()
+        grant = TokenGrant("new_access", "new_refresh", None)
+
+        DatabaseTokenStore().set(instance, grant)
+
+        mock_objects.filter.assert_called_with(pk=1)
+        mock_objects.filter.return_value.update.assert_called_with(
+            access_token="new_access",
+            refresh_token="new_refresh",
+            expires=None,
+        )
+        self.assertEqual(instance.access_token, "new_access")
+        mock_registry.invalidate_on_commit.assert_called_once()
+
+
+@patch.object(token_store_module, "instance_registry")
+@patch.object(Instance, "objects")
+class TestWriteThroughTokenStores(TestCase):
+    """Unit tests for `MemoryTokenStore` and `CacheTokenStore` classes."""
+
+    def setUp(self):
+        """setUp"""
+        cache.delete(f"{CacheTokenStore.cache_key_prefix}1")
+
+    def _test_set_is_read_back(self, store, mock_objects, mock_registry):
+        """Store a grant and read it back from an outdated instance."""
+        instance = _get_instance()
+        grant = TokenGrant("new_access", "new_refresh", None)
+
+        store.set(instance, grant)
+
+        self.assertEqual(store.get(_get_instance()), grant)
+        mock_objects.filter.return_value.update.assert_called_once()
+        mock_registry.invalidate_on_commit.assert_not_called()
+
+    def test_memory_store_set_is_read_back(self, mock_objects, mock_registry):
+        """test_memory_store_set_is_read_back"""
+        self._test_set_is_read_back(
+            MemoryTokenStore(), mock_objects, mock_registry
+        )
+
+    def test_cache_store_set_is_read_back(self, mock_objects, mock_registry):
+        """test_cache_store_set_is_read_back"""
+        self._test_set_is_read_back(
+            CacheTokenStore(), mock_objects, mock_registry
+        )
+
+    @patch.object(Instance, "get_by_id")
+    def test_get_loads_missing_grant_once(
+        self, mock_get_by_id, mock_objects, mock_registry
+    ):
+        """test_get_loads_missing_grant_once"""
+        mock_get_by_id.return_value = _get_instance()
+        store = MemoryTokenStore()
+
+        store.get(MagicMock(pk=1))
+        grant = store.get(MagicMock(pk=1))
+
+        self.assertEqual(grant.access_token, "access")
+        mock_get_by_id.assert_called_once_with(1)
+
+    @patch.object(Instance, "get_by_id")
+    def test_load_error_falls_back_to_instance_fields(
+        self, mock_get_by_id, mock_objects, mock_registry
+    ):
+        """test_load_error_falls_back_to_instance_fields"""
+        mock_get_by_id.side_effect = exceptions.DoesNotExist("error")
+
+        grant = MemoryTokenStore().get(_get_instance())
+
+        self.assertEqual(grant.access_token, "access")
@@ -0,0 +1,66 @@
+"""Unit tests for `core_federated_search_app.discover` package."""
+
+from unittest.mock import patch
+
+from django.test import TestCase as DjangoTestCase
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from core_federated_search_app import discover
+
+
+class TestInitPeriodicTasks(DjangoTestCase):
+    """Unit tests for `init_periodic_tasks` function."""
+
+    def test_periodic_task_is_created(self):
+        """test_periodic_task_is_created"""
+        PeriodicTask.objects.all().delete()
+
+        discover.init_periodic_tasks()
+
+        periodic_task = PeriodicTask.objects.get(
+            name="refresh_expiring_tokens"
+        )
+        self.assertEqual(
+            periodic_task.task,
+            "core_federated_search_app.tasks.refresh_expiring_tokens",
+        )
+        self.assertEqual(
+            periodic_task.interval.every,
+            discover.INSTANCE_TOKEN_REFRESH_INTERVAL,
+        )
+
+    def test_periodic_task_interval_is_updated(self):
+        """test_periodic_task_interval_is_updated"""
+        PeriodicTask.objects.all().delete()
+        old_schedule = IntervalSchedule.objects.create(
+            every=discover.INSTANCE_TOKEN_REFRESH_INTERVAL + 1,
+            period=IntervalSchedule.SECONDS,
+        )
+        PeriodicTask.objects.create(
+            interval=old_schedule,
+            name="refresh_expiring_tokens",
+            task="core_federated_search_app.tasks.refresh_expiring_tokens",
+        )
+
+        discover.init_periodic_tasks()
+
+        periodic_task = PeriodicTask.objects.get(
+            name="refresh_expiring_tokens"
+        )
+        self.assertEqual(
+            periodic_task.interval.every,
+            discover.INSTANCE_TOKEN_REFRESH_INTERVAL,
+        )
+        self.assertEqual(PeriodicTask.objects.count(), 1)
+
+    @patch.object(discover, "logger")
+    @patch.object(discover, "IntervalSchedule")
+    def test_error_is_logged(self, mock_interval_schedule, mock_logger):
+        """test_error_is_logged"""
+        mock_interval_schedule.objects.get_or_create.side_effect = Exception(
+            "error"
+        )
+
+        discover.init_periodic_tasks()
+
+        mock_logger.error.assert_called_once_with("error")
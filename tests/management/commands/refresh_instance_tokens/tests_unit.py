@@ -0,0 +1,98 @@
+"""Unit tests for the `refresh_instance_tokens` management command."""
+
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from core_federated_search_app.management.commands import (
+    refresh_instance_tokens as command_module,
+)
+
+
+@patch.object(command_module, "close_old_connections")
+@patch.object(command_module.instance_api, "refresh_expiring_tokens")
+class TestRefreshInstanceTokensCommand(TestCase):
+    """Unit tests for the `refresh_instance_tokens` command."""
+
+    def test_results_are_written_once(
+        self, mock_refresh_expiring_tokens, mock_close_old_connections
+    ):
+        """test_results_are_written_once"""
+        mock_refresh_expiring_tokens.return_value = [
+            {"id": 1, "name": "remote1", "status": "ok", "message": ""},
+            {"id": 2, "name": "remote2", "status": "error", "message": "down"},
+        ]
+        stdout = StringIO()
+
+        call_command(
+            "refresh_instance_tokens",
+            "--window",
+            "600",
+            "--max-workers",
+            "2",
+            "--jitter",
+            "0",
+            stdout=stdout,
+        )
+
+        mock_refresh_expiring_tokens.assert_called_once_with(
+            window=600, max_workers=2, jitter=0
+        )
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            ["remote1: ok", "remote2: error (down)"],
+        )
+
+    def test_no_token_to_refresh(
+        self, mock_refresh_expiring_tokens, mock_close_old_connections
+    ):
+        """test_no_token_to_refresh"""
+        mock_refresh_expiring_tokens.return_value = []
+        stdout = StringIO()
+
+        call_command("refresh_instance_tokens", stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), "No token to refresh.\n")
+
+    @patch.object(command_module, "logger")
+    def test_error_is_logged(
+        self,
+        mock_logger,
+        mock_refresh_expiring_tokens,
+        mock_close_old_connections,
+    ):
+        """test_error_is_logged"""
+        mock_refresh_expiring_tokens.side_effect = Exception("error")
+        stdout = StringIO()
+
+        call_command("refresh_instance_tokens", stdout=stdout)
+
+        mock_logger.error.assert_called_once()
+        self.assertEqual(stdout.getvalue(), "")
+
+    @patch.object(command_module.time, "sleep")
+    def test_daemon_refreshes_every_interval(
+        self,
+        mock_sleep,
+        mock_refresh_expiring_tokens,
+        mock_close_old_connections,
+    ):
+        """test_daemon_refreshes_every_interval"""
+        mock_refresh_expiring_tokens.return_value = []
+        # stop the daemon during its second sleep
+        mock_sleep.side_effect = [None, KeyboardInterrupt]
+
+        with self.assertRaises(KeyboardInterrupt):
+            call_command(
+                "refresh_instance_tokens",
+                "--daemon",
+                "--interval",
+                "300",
+                stdout=StringIO(),
+            )
+
+        self.assertEqual(mock_refresh_expiring_tokens.call_count, 2)
+        mock_sleep.assert_called_with(300)
+        self.assertEqual(mock_close_old_connections.call_count, 2)
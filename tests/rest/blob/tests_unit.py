@@ -0,0 +1,389 @@
+"""Unit tests for `core_federated_search_app.rest.blob.views` package."""
+
+from unittest.mock import patch, MagicMock
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase
+from rest_framework import status
+
+import core_federated_search_app.rest.blob.views as blob_views
+from core_federated_search_app.commons.exceptions import (
+    InstanceUnavailableError,
+)
+from core_main_app.commons import exceptions
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+from core_main_app.utils.tests_tools.RequestMock import RequestMock
+
+
+class TestGetBlobDownload(SimpleTestCase):
+    """TestGetBlobDownload"""
+
+    def setUp(self):
+        """setUp"""
+
+        super().setUp()
+        self.user = create_mock_user("1")
+        self.url = "http://remote.test/rest/blob/download/1/"
+
+    @patch.object(
+        blob_views.blob_proxy.instance_api, "get_blob_response_from_url"
+    )
+    def test_get_streams_remote_blob(self, mock_get_blob_response_from_url):
+        """test_get_streams_remote_blob"""
+
+        # Arrange
+        upstream_response = MagicMock()
+        upstream_response.status_code = 200
+        upstream_response.headers = {"Content-Type": "text/plain"}
+        upstream_response.iter_content.return_value = iter([b"blob"])
+        mock_get_blob_response_from_url.return_value = upstream_response
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobDownload.as_view(),
+            self.user,
+            data={"url": self.url},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"blob")
+        mock_get_blob_response_from_url.assert_called_with(
+            None,
+            self.url,
+            stream=True,
+            headers={"Accept-Encoding": "gzip, deflate"},
+        )
+
+    def test_get_without_url_returns_400(self):
+        """test_get_without_url_returns_400"""
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobDownload.as_view(), self.user
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(
+        blob_views.blob_proxy.instance_api, "get_blob_response_from_url"
+    )
+    def test_get_unknown_url_returns_404(
+        self, mock_get_blob_response_from_url
+    ):
+        """test_get_unknown_url_returns_404"""
+
+        # Arrange
+        mock_get_blob_response_from_url.side_effect = exceptions.DoesNotExist(
+            "error"
+        )
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobDownload.as_view(),
+            self.user,
+            data={"url": self.url},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch.object(
+        blob_views.blob_proxy.instance_api, "get_blob_response_from_url"
+    )
+    def test_get_unavailable_instance_returns_503(
+        self, mock_get_blob_response_from_url
+    ):
+        """test_get_unavailable_instance_returns_503"""
+
+        # Arrange
+        mock_get_blob_response_from_url.side_effect = InstanceUnavailableError(
+            "error"
+        )
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobDownload.as_view(),
+            self.user,
+            data={"url": self.url},
+        )
+
+        # Assert
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    @patch.object(
+        blob_views.blob_proxy.instance_api, "get_blob_response_from_url"
+    )
+    def test_get_returns_500_on_error(self, mock_get_blob_response_from_url):
+        """test_get_returns_500_on_error"""
+
+        # Arrange
+        mock_get_blob_response_from_url.side_effect = Exception("error")
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobDownload.as_view(),
+            self.user,
+            data={"url": self.url},
+        )
+
+        # Assert
+        self.assertEqual(
+            response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+        self.assertEqual(response.data["message"], "error")
+
+    def test_get_returns_403_if_user_is_anonymous(self):
+        """test_get_returns_403_if_user_is_anonymous"""
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobDownload.as_view(),
+            create_mock_user("1", is_anonymous=True),
+            data={"url": self.url},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestPostBlobZipDownload(SimpleTestCase):
+    """TestPostBlobZipDownload"""
+
+    def setUp(self):
+        """setUp"""
+
+        super().setUp()
+        self.user = create_mock_user("1")
+
+    @patch.object(blob_views, "get_zip_response")
+    def test_post_streams_archive(self, mock_get_zip_response):
+        """test_post_streams_archive"""
+
+        # Arrange
+        mock_get_zip_response.return_value = HttpResponse(b"zip")
+        urls = ["http://remote.test/1", "http://remote.test/2"]
+
+        # Act
+        response = RequestMock.do_request_post(
+            blob_views.BlobZipDownload.as_view(),
+            self.user,
+            data={"urls": urls},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_get_zip_response.assert_called_with(urls, "blobs.zip")
+
+    @patch.object(blob_views, "get_zip_response")
+    def test_post_returns_500_on_error(self, mock_get_zip_response):
+        """test_post_returns_500_on_error"""
+
+        # Arrange
+        mock_get_zip_response.side_effect = Exception("error")
+
+        # Act
+        response = RequestMock.do_request_post(
+            blob_views.BlobZipDownload.as_view(),
+            self.user,
+            data={"urls": ["http://remote.test/1"]},
+        )
+
+        # Assert
+        self.assertEqual(
+            response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    def test_post_without_urls_returns_400(self):
+        """test_post_without_urls_returns_400"""
+
+        # Act
+        response = RequestMock.do_request_post(
+            blob_views.BlobZipDownload.as_view(),
+            self.user,
+            data={"urls": "http://remote.test/1"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(blob_views, "BLOB_ARCHIVE_MAX_URLS", 1)
+    def test_post_too_many_urls_returns_400(self):
+        """test_post_too_many_urls_returns_400"""
+
+        # Act
+        response = RequestMock.do_request_post(
+            blob_views.BlobZipDownload.as_view(),
+            self.user,
+            data={"urls": ["http://remote.test/1", "http://remote.test/2"]},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestBlobMetadata(SimpleTestCase):
+    """TestBlobMetadata"""
+
+    def setUp(self):
+        """setUp"""
+
+        super().setUp()
+        self.user = create_mock_user("1")
+        self.urls = ["http://remote.test/1", "http://remote.test/2"]
+
+    @patch.object(blob_views, "get_blobs_metadata")
+    def test_get_returns_metadata_of_url_parameters(
+        self, mock_get_blobs_metadata
+    ):
+        """test_get_returns_metadata_of_url_parameters"""
+
+        # Arrange
+        mock_get_blobs_metadata.return_value = [
+            {"url": "http://remote.test/1"}
+        ]
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobMetadata.as_view(),
+            self.user,
+            data={"url": self.urls},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data, {"results": [{"url": "http://remote.test/1"}]}
+        )
+        mock_get_blobs_metadata.assert_called_with(self.urls)
+
+    @patch.object(blob_views, "get_blobs_metadata")
+    def test_post_returns_metadata_of_urls(self, mock_get_blobs_metadata):
+        """test_post_returns_metadata_of_urls"""
+
+        # Arrange
+        mock_get_blobs_metadata.return_value = []
+
+        # Act
+        response = RequestMock.do_request_post(
+            blob_views.BlobMetadata.as_view(),
+            self.user,
+            data={"urls": self.urls},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_get_blobs_metadata.assert_called_with(self.urls)
+
+    @patch.object(blob_views, "get_blobs_metadata")
+    def test_post_returns_500_on_error(self, mock_get_blobs_metadata):
+        """test_post_returns_500_on_error"""
+
+        # Arrange
+        mock_get_blobs_metadata.side_effect = Exception("error")
+
+        # Act
+        response = RequestMock.do_request_post(
+            blob_views.BlobMetadata.as_view(),
+            self.user,
+            data={"urls": self.urls},
+        )
+
+        # Assert
+        self.assertEqual(
+            response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    def test_get_without_url_returns_400(self):
+        """test_get_without_url_returns_400"""
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobMetadata.as_view(), self.user
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(blob_views, "BLOB_METADATA_MAX_URLS", 1)
+    def test_post_too_many_urls_returns_400(self):
+        """test_post_too_many_urls_returns_400"""
+
+        # Act
+        response = RequestMock.do_request_post(
+            blob_views.BlobMetadata.as_view(),
+            self.user,
+            data={"urls": self.urls},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestGetBlobCacheStats(SimpleTestCase):
+    """TestGetBlobCacheStats"""
+
+    @patch.object(blob_views, "get_blob_cache")
+    def test_get_returns_stats(self, mock_get_blob_cache):
+        """test_get_returns_stats"""
+
+        # Arrange
+        mock_get_blob_cache.return_value.get_stats.return_value = {"hits": 1}
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobCacheStats.as_view(),
+            create_mock_user("1", is_staff=True),
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"hits": 1})
+
+    @patch.object(blob_views, "get_blob_cache")
+    def test_get_returns_404_if_cache_is_disabled(self, mock_get_blob_cache):
+        """test_get_returns_404_if_cache_is_disabled"""
+
+        # Arrange
+        mock_get_blob_cache.return_value = None
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobCacheStats.as_view(),
+            create_mock_user("1", is_staff=True),
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch.object(blob_views, "get_blob_cache")
+    def test_get_returns_500_on_error(self, mock_get_blob_cache):
+        """test_get_returns_500_on_error"""
+
+        # Arrange
+        mock_get_blob_cache.side_effect = Exception("error")
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobCacheStats.as_view(),
+            create_mock_user("1", is_staff=True),
+        )
+
+        # Assert
+        self.assertEqual(
+            response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    def test_get_returns_403_if_user_is_not_admin(self):
+        """test_get_returns_403_if_user_is_not_admin"""
+
+        # Act
+        response = RequestMock.do_request_get(
+            blob_views.BlobCacheStats.as_view(), create_mock_user("1")
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
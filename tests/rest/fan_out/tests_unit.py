@@ -0,0 +1,245 @@
+"""Unit tests for `core_federated_search_app.rest.fan_out.views` package."""
+
+import json
+from unittest.mock import patch, MagicMock
+
+import requests
+from django.test import SimpleTestCase
+from rest_framework import status
+
+import core_federated_search_app.rest.fan_out.views as fan_out_views
+from core_federated_search_app.components.instance.models import Instance
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+from core_main_app.utils.tests_tools.RequestMock import RequestMock
+
+
+def _parse_events(content):
+    """Parse Server-Sent Events into (event, data) tuples."""
+    events = []
+    for message in content.decode().strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@patch.object(fan_out_views.instance_api, "send_get_request_to_instance")
+@patch.object(fan_out_views.instance_api, "get_all_registered")
+class TestGetFanOutStream(SimpleTestCase):
+    """TestGetFanOutStream"""
+
+    def setUp(self):
+        """setUp"""
+
+        super().setUp()
+        self.user = create_mock_user("1")
+        self.instances = [
+            Instance(pk=1, name="up", endpoint="http://up.test"),
+            Instance(pk=2, name="down", endpoint="http://down.test"),
+        ]
+
+    def _send_get_request(self, instance, url, **kwargs):
+        """Answer for the up instance, fail for the other one."""
+        if instance.name == "down":
+            raise requests.ConnectionError("refused")
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"url": url, "params": kwargs["params"]}
+        return response
+
+    def test_get_streams_results_then_summary(
+        self, mock_get_all, mock_send_get_request
+    ):
+        """test_get_streams_results_then_summary"""
+
+        # Arrange
+        mock_get_all.return_value = self.instances
+        mock_send_get_request.side_effect = self._send_get_request
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            self.user,
+            data={"path": "rest/data/", "title": "test"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = _parse_events(b"".join(response.streaming_content))
+        results = {data["instance"]: data for _, data in events[:-1]}
+        self.assertEqual(
+            [event for event, _ in events], ["result", "result", "summary"]
+        )
+        self.assertEqual(results["up"]["status"], "ok")
+        self.assertEqual(
+            results["up"]["result"],
+            {
+                "url": "http://up.test/rest/data/",
+                "params": {"title": ["test"]},
+            },
+        )
+        self.assertEqual(results["down"]["status"], "error")
+        self.assertEqual(results["down"]["error"], "refused")
+        self.assertEqual(events[-1][1]["instances"], 2)
+        self.assertEqual(events[-1][1]["ok"], 1)
+        self.assertEqual(events[-1][1]["error"], 1)
+
+    def test_get_streams_ndjson(self, mock_get_all, mock_send_get_request):
+        """test_get_streams_ndjson"""
+
+        # Arrange
+        mock_get_all.return_value = self.instances[:1]
+        mock_send_get_request.side_effect = self._send_get_request
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            self.user,
+            data={"path": "rest/data/", "format": "ndjson"},
+        )
+
+        # Assert
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            [(line["event"], line.get("instance")) for line in lines],
+            [("result", "up"), ("summary", None)],
+        )
+        self.assertEqual(lines[0]["result"]["params"], {})
+
+    @patch.object(fan_out_views.instance_api, "get_by_names")
+    def test_get_streams_text_results_of_named_instances(
+        self, mock_get_by_names, mock_get_all, mock_send_get_request
+    ):
+        """test_get_streams_text_results_of_named_instances"""
+
+        # Arrange
+        mock_get_by_names.return_value = ({"up": self.instances[0]}, [])
+        response = MagicMock(status_code=200, text="text")
+        response.json.side_effect = ValueError("not json")
+        mock_send_get_request.return_value = response
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            self.user,
+            data={"path": "rest/data/", "name": "up"},
+        )
+
+        # Assert
+        events = _parse_events(b"".join(response.streaming_content))
+        self.assertEqual(events[0][1]["instance"], "up")
+        self.assertEqual(events[0][1]["result"], "text")
+        mock_get_by_names.assert_called_with(["up"])
+        mock_get_all.assert_not_called()
+
+    def test_get_without_path_returns_400(
+        self, mock_get_all, mock_send_get_request
+    ):
+        """test_get_without_path_returns_400"""
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(), self.user
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_path_not_allowed_returns_400(
+        self, mock_get_all, mock_send_get_request
+    ):
+        """test_get_path_not_allowed_returns_400"""
+
+        # Arrange
+        mock_get_all.return_value = self.instances
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            self.user,
+            data={"path": "rest/data/../user/"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_send_get_request.assert_not_called()
+
+    @patch.object(fan_out_views.instance_api, "get_by_names")
+    def test_get_unknown_instance_returns_400(
+        self, mock_get_by_names, mock_get_all, mock_send_get_request
+    ):
+        """test_get_unknown_instance_returns_400"""
+
+        # Arrange
+        mock_get_by_names.return_value = ({}, ["unknown"])
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            self.user,
+            data={"path": "rest/data/", "name": "unknown"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_send_get_request.assert_not_called()
+
+    def test_get_returns_403_if_user_is_anonymous(
+        self, mock_get_all, mock_send_get_request
+    ):
+        """test_get_returns_403_if_user_is_anonymous"""
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            create_mock_user("1", is_anonymous=True),
+            data={"path": "rest/data/"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_get_returns_500_on_error(
+        self, mock_get_all, mock_send_get_request
+    ):
+        """test_get_returns_500_on_error"""
+
+        # Arrange
+        mock_get_all.side_effect = Exception("error")
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            self.user,
+            data={"path": "rest/data/"},
+        )
+
+        # Assert
+        self.assertEqual(
+            response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+        self.assertEqual(
+            _parse_events(response.rendered_content),
+            [("error", {"message": "error"})],
+        )
+
+    def test_ndjson_error_is_rendered_as_a_line(
+        self, mock_get_all, mock_send_get_request
+    ):
+        """test_ndjson_error_is_rendered_as_a_line"""
+
+        # Act
+        response = RequestMock.do_request_get(
+            fan_out_views.FanOutStream.as_view(),
+            self.user,
+            data={"format": "ndjson"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            json.loads(response.rendered_content)["event"], "error"
+        )
@@ -52,6 +52,33 @@ class TestGetAllInstanceList(IntegrationBaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class TestGetBulkInstanceList(IntegrationBaseTestCase):
+    """Test Get Bulk Instance List"""
+
+    fixture = fixture_data
+
+    def test_get_by_ids_returns_found_and_missing_instances(self):
+        """test_get_by_ids_returns_found_and_missing_instances"""
+
+        # Arrange
+        user = create_mock_user("1", is_staff=True)
+        instance_id = str(self.fixture.data_1.id)
+
+        # Act
+        response = RequestMock.do_request_get(
+            instance_views.InstanceList.as_view(),
+            user,
+            {"id": [instance_id, "-1"]},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["instances"][instance_id]["name"], "name_1"
+        )
+        self.assertEqual(response.data["missing"], ["-1"])
+
+
 class TestGetInstanceDetail(IntegrationBaseTestCase):
     """Test Get Instance Detail"""
 
@@ -81,6 +108,25 @@ class TestGetInstanceDetail(IntegrationBaseTestCase):
         # Assert
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_get_returns_circuit_state(self):
+        """test_get_returns_circuit_state"""
+
+        # Arrange
+        user = create_mock_user("0", True)
+        self.param = {"pk": self.fixture.data_1.id}
+
+        # Act
+        response = RequestMock.do_request_get(
+            instance_views.InstanceDetail.as_view(),
+            user,
+            self.data,
+            self.param,
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["circuit_state"], "closed")
+
     def test_get_raise_404_when_not_found(self):
         """test_get_raise_404_when_not_found"""
 
@@ -39,7 +39,7 @@ class TestInstanceListGetPermission(SimpleTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch.object(Instance, "get_all")
+    @patch("core_federated_search_app.components.instance.api.get_all")
     @patch.object(InstanceSerializerModel, "data")
     def test_is_staff_returns_http_200(
         self, instance_serializer_data, instance_get_all
@@ -131,7 +131,7 @@ class TestInstanceDetailGetPermission(SimpleTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch.object(Instance, "get_by_id")
+    @patch("core_federated_search_app.components.instance.api.get_by_id")
     @patch.object(InstanceSerializerModel, "data")
     def test_is_staff_returns_http_200(
         self, instance_serializer_data, instance_get_all
@@ -180,7 +180,7 @@ class TestInstanceDetailPatchPermission(SimpleTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch.object(Instance, "get_by_id")
+    @patch("core_federated_search_app.components.instance.api.get_by_id")
     @patch.object(InstanceSerializerModel, "is_valid")
     @patch.object(InstanceSerializerModel, "save")
     @patch.object(InstanceSerializerModel, "data")
@@ -240,7 +240,7 @@ class TestInstanceDetailDeletePermission(SimpleTestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
     @patch.object(Instance, "delete")
-    @patch.object(Instance, "get_by_id")
+    @patch("core_federated_search_app.components.instance.api.get_by_id")
     def test_is_staff_returns_http_204(
         self, instance_get_by_id, instance_delete
     ):
@@ -296,7 +296,7 @@ class TestInstanceRefreshTokenPatchPermission(SimpleTestCase):
     @patch(
         "core_federated_search_app.components.instance.api.refresh_instance_token"
     )
-    @patch.object(Instance, "get_by_id")
+    @patch("core_federated_search_app.components.instance.api.get_by_id")
     @patch.object(InstanceSerializerModel, "is_valid")
     @patch.object(InstanceSerializerModel, "data")
     def test_is_staff_returns_http_200(
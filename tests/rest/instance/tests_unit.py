@@ -20,7 +20,7 @@ class TestGetAllInstanceList(SimpleTestCase):
         super().setUp()
         self.data = None
 
-    @patch.object(Instance, "get_all")
+    @patch("core_federated_search_app.components.instance.api.get_all")
     def test_get_all_returns_status_403_with_no_permission(self, mock_get_all):
         """test_get_all_returns_status_403_with_no_permission"""
 
@@ -35,7 +35,7 @@ class TestGetAllInstanceList(SimpleTestCase):
         # Assert
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch.object(Instance, "get_all")
+    @patch("core_federated_search_app.components.instance.api.get_all")
     def test_get_all_returns_status_200_if_staff(self, mock_get_all):
         """test_get_all_returns_status_200_if_staff"""
 
@@ -51,6 +51,65 @@ class TestGetAllInstanceList(SimpleTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
+class TestGetBulkInstanceList(SimpleTestCase):
+    """Test Get Bulk Instance List"""
+
+    @patch("core_federated_search_app.components.instance.api.get_by_ids")
+    def test_get_with_ids_returns_instances_and_missing(self, mock_get_by_ids):
+        """test_get_with_ids_returns_instances_and_missing"""
+
+        # Arrange
+        user = create_mock_user("0", is_staff=True)
+        mock_get_by_ids.return_value = (
+            {"1": Instance(pk=1, name="one", endpoint="http://one.test")},
+            ["2"],
+        )
+
+        # Act
+        response = RequestMock.do_request_get(
+            instance_views.InstanceList.as_view(), user, {"id": ["1", "2"]}
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_get_by_ids.assert_called_with(["1", "2"])
+        self.assertEqual(response.data["instances"]["1"]["name"], "one")
+        self.assertEqual(response.data["missing"], ["2"])
+
+    @patch("core_federated_search_app.components.instance.api.get_by_names")
+    def test_get_with_names_calls_get_by_names(self, mock_get_by_names):
+        """test_get_with_names_calls_get_by_names"""
+
+        # Arrange
+        user = create_mock_user("0", is_staff=True)
+        mock_get_by_names.return_value = ({}, ["one"])
+
+        # Act
+        response = RequestMock.do_request_get(
+            instance_views.InstanceList.as_view(), user, {"name": "one"}
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_get_by_names.assert_called_with(["one"])
+
+    def test_get_with_several_filters_returns_status_400(self):
+        """test_get_with_several_filters_returns_status_400"""
+
+        # Arrange
+        user = create_mock_user("0", is_staff=True)
+
+        # Act
+        response = RequestMock.do_request_get(
+            instance_views.InstanceList.as_view(),
+            user,
+            {"id": "1", "name": "one"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class TestPatchInstanceRefreshToken(SimpleTestCase):
     """TestPatchInstanceRefreshToken"""
 
@@ -74,3 +133,109 @@ class TestPatchInstanceRefreshToken(SimpleTestCase):
 
         # Assert
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestPatchInstanceRefreshAllTokens(SimpleTestCase):
+    """TestPatchInstanceRefreshAllTokens"""
+
+    def setUp(self):
+        """setUp"""
+
+        super().setUp()
+        self.user = create_mock_user("1", is_staff=True)
+        self.instance = Instance(pk=1, name="one")
+        self.results = [
+            {"id": 1, "name": "one", "status": "success", "message": ""}
+        ]
+
+    @patch.object(instance_views.instance_api, "refresh_all_tokens")
+    @patch.object(instance_views.instance_api, "get_by_ids")
+    def test_patch_refreshes_given_instances(
+        self, mock_get_by_ids, mock_refresh_all_tokens
+    ):
+        """test_patch_refreshes_given_instances"""
+
+        # Arrange
+        mock_get_by_ids.return_value = ({"1": self.instance}, ["2"])
+        mock_refresh_all_tokens.return_value = self.results
+
+        # Act
+        response = RequestMock.do_request_patch(
+            instance_views.InstanceRefreshAllTokens.as_view(),
+            self.user,
+            data={"ids": ["1", "2"], "timeout": "1"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data, {"results": self.results, "missing": ["2"]}
+        )
+        mock_refresh_all_tokens.assert_called_with([self.instance], timeout=1)
+
+    @patch.object(instance_views.instance_api, "refresh_all_tokens")
+    def test_patch_without_ids_refreshes_all_instances(
+        self, mock_refresh_all_tokens
+    ):
+        """test_patch_without_ids_refreshes_all_instances"""
+
+        # Arrange
+        mock_refresh_all_tokens.return_value = self.results
+
+        # Act
+        response = RequestMock.do_request_patch(
+            instance_views.InstanceRefreshAllTokens.as_view(), self.user
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_refresh_all_tokens.assert_called_with(None, timeout=None)
+
+    @patch.object(instance_views.instance_api, "refresh_all_tokens")
+    def test_patch_with_invalid_timeout_returns_status_400(
+        self, mock_refresh_all_tokens
+    ):
+        """test_patch_with_invalid_timeout_returns_status_400"""
+
+        for timeout in ("0.5", "0", "-1", "abc"):
+            # Act
+            response = RequestMock.do_request_patch(
+                instance_views.InstanceRefreshAllTokens.as_view(),
+                self.user,
+                data={"timeout": timeout},
+            )
+
+            # Assert
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST, timeout
+            )
+        mock_refresh_all_tokens.assert_not_called()
+
+    @patch.object(instance_views.instance_api, "refresh_all_tokens")
+    def test_patch_returns_status_500_on_error(self, mock_refresh_all_tokens):
+        """test_patch_returns_status_500_on_error"""
+
+        # Arrange
+        mock_refresh_all_tokens.side_effect = Exception("error")
+
+        # Act
+        response = RequestMock.do_request_patch(
+            instance_views.InstanceRefreshAllTokens.as_view(), self.user
+        )
+
+        # Assert
+        self.assertEqual(
+            response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    def test_patch_returns_status_403_if_user_is_not_admin(self):
+        """test_patch_returns_status_403_if_user_is_not_admin"""
+
+        # Act
+        response = RequestMock.do_request_patch(
+            instance_views.InstanceRefreshAllTokens.as_view(),
+            create_mock_user("0"),
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,33 @@
+"""Unit tests for `core_federated_search_app.rest.urls` package."""
+
+from django.test import SimpleTestCase
+from django.urls import resolve
+
+import core_federated_search_app.rest.blob.views as blob_views
+import core_federated_search_app.rest.fan_out.views as fan_out_views
+
+REST_URLCONF = "core_federated_search_app.rest.urls"
+
+
+class TestRestUrls(SimpleTestCase):
+    """Unit tests for the REST API routes."""
+
+    def test_blob_routes_are_resolved(self):
+        """test_blob_routes_are_resolved"""
+        for path, view_class in (
+            ("/blob/", blob_views.BlobDownload),
+            ("/blob/zip/", blob_views.BlobZipDownload),
+            ("/blob/metadata/", blob_views.BlobMetadata),
+            ("/blob/cache/", blob_views.BlobCacheStats),
+        ):
+            self.assertIs(
+                resolve(path, urlconf=REST_URLCONF).func.view_class,
+                view_class,
+            )
+
+    def test_fan_out_route_is_resolved(self):
+        """test_fan_out_route_is_resolved"""
+        self.assertIs(
+            resolve("/fan-out/stream/", urlconf=REST_URLCONF).func.view_class,
+            fan_out_views.FanOutStream,
+        )
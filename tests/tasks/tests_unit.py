@@ -0,0 +1,35 @@
+"""Unit tests for `core_federated_search_app.tasks` package."""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from core_federated_search_app import tasks
+
+
+@patch.object(tasks, "logger")
+@patch.object(tasks.instance_api, "refresh_expiring_tokens")
+class TestRefreshExpiringTokens(TestCase):
+    """Unit tests for `refresh_expiring_tokens` task."""
+
+    def test_results_are_logged(
+        self, mock_refresh_expiring_tokens, mock_logger
+    ):
+        """test_results_are_logged"""
+        mock_refresh_expiring_tokens.return_value = [
+            {"id": 1, "name": "remote", "status": "ok", "message": ""}
+        ]
+
+        tasks.refresh_expiring_tokens()
+
+        mock_logger.info.assert_called_once_with(
+            "Periodic task: refresh token of %s: %s.", "remote", "ok"
+        )
+        mock_logger.error.assert_not_called()
+
+    def test_error_is_logged(self, mock_refresh_expiring_tokens, mock_logger):
+        """test_error_is_logged"""
+        mock_refresh_expiring_tokens.side_effect = Exception("error")
+
+        tasks.refresh_expiring_tokens()
+
+        mock_logger.error.assert_called_once()
@@ -0,0 +1,1619 @@
+"""Unit tests for `core_federated_search_app.utils.blob_proxy` package."""
+
+import gzip
+import io
+import os
+import tempfile
+import threading
+import zipfile
+import zlib
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+
+from core_federated_search_app.components.instance.models import Instance
+from core_main_app.commons import exceptions
+from core_federated_search_app.utils.blob_proxy import (
+    archive as blob_archive,
+    batch as blob_batch,
+    cache as blob_cache_module,
+    encoding as blob_encoding,
+    metadata as blob_metadata,
+    proxy as blob_proxy,
+)
+from core_federated_search_app.utils.blob_proxy.cache import BlobCache
+from core_federated_search_app.utils.blob_proxy.coalescing import (
+    BlobTransferError,
+    BlobTransferRegistry,
+    SharedBlobTransfer,
+)
+from core_federated_search_app.utils.blob_proxy.encoding import (
+    accepts_encoding,
+    iter_decoded,
+)
+from core_federated_search_app.utils.blob_proxy.ranges import (
+    RangeNotSatisfiable,
+    is_if_range_satisfied,
+    parse_range_header,
+)
+from core_federated_search_app.utils.blob_proxy import (
+    response as blob_response,
+)
+from core_federated_search_app.utils.blob_proxy.response import (
+    get_cached_response,
+    get_streaming_response,
+)
+
+
+def _get_upstream_response(
+    headers, chunks=(b"blob", b"content"), status_code=200
+):
+    """Return a mock remote response."""
+    upstream_response = MagicMock()
+    upstream_response.status_code = status_code
+    upstream_response.headers = headers
+    upstream_response.iter_content.return_value = iter(chunks)
+    return upstream_response
+
+
+class TestGetStreamingResponse(TestCase):
+    """Unit tests for `get_streaming_response` function."""
+
+    def test_content_is_streamed_in_chunks(self):
+        """test_content_is_streamed_in_chunks"""
+        upstream_response = _get_upstream_response({})
+
+        response = get_streaming_response(upstream_response, chunk_size=4)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            list(response.streaming_content), [b"blob", b"content"]
+        )
+        upstream_response.iter_content.assert_called_with(chunk_size=4)
+
+    def test_headers_are_forwarded(self):
+        """test_headers_are_forwarded"""
+        headers = {
+            "Content-Type": "application/pdf",
+            "Content-Length": "11",
+            "Content-Disposition": 'attachment; filename="blob.pdf"',
+            "Set-Cookie": "sessionid=remote",
+        }
+
+        response = get_streaming_response(_get_upstream_response(headers))
+
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Content-Length"], "11")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="blob.pdf"'
+        )
+        self.assertFalse(response.has_header("Set-Cookie"))
+
+    def test_length_of_encoded_content_is_not_forwarded(self):
+        """test_length_of_encoded_content_is_not_forwarded"""
+        headers = {"Content-Length": "11", "Content-Encoding": "gzip"}
+
+        response = get_streaming_response(_get_upstream_response(headers))
+
+        self.assertFalse(response.has_header("Content-Length"))
+
+    def test_upstream_is_closed_when_content_is_sent(self):
+        """test_upstream_is_closed_when_content_is_sent"""
+        upstream_response = _get_upstream_response({})
+
+        response = get_streaming_response(upstream_response)
+        list(response.streaming_content)
+
+        upstream_response.close.assert_called()
+
+    def test_upstream_is_closed_when_client_disconnects(self):
+        """test_upstream_is_closed_when_client_disconnects"""
+        upstream_response = _get_upstream_response({})
+
+        response = get_streaming_response(upstream_response)
+        next(iter(response.streaming_content))
+        response.close()
+
+        upstream_response.close.assert_called()
+
+
+def _get_gzip_upstream_response(content, headers=None):
+    """Return a mock remote response with gzip-encoded content."""
+    encoded = gzip.compress(content)
+    upstream_response = _get_upstream_response(
+        dict(
+            {
+                "Content-Encoding": "gzip",
+                "Content-Length": str(len(encoded)),
+            },
+            **(headers or {}),
+        )
+    )
+    upstream_response.raw.stream.return_value = iter(
+        [encoded[:10], encoded[10:]]
+    )
+    return upstream_response, encoded
+
+
+class TestContentEncoding(TestCase):
+    """Unit tests for `accepts_encoding` and `iter_decoded` functions."""
+
+    def test_accepts_encoding(self):
+        """test_accepts_encoding"""
+        self.assertTrue(accepts_encoding("gzip, deflate, br", "gzip"))
+        self.assertTrue(accepts_encoding("*", "deflate"))
+        self.assertFalse(accepts_encoding("gzip;q=0, *", "gzip"))
+        self.assertFalse(accepts_encoding("br", "gzip"))
+        self.assertFalse(accepts_encoding(None, "gzip"))
+        self.assertTrue(accepts_encoding(", gzip", "gzip"))
+        self.assertFalse(accepts_encoding("gzip;q=high", "gzip"))
+
+    def test_gzip_is_decoded(self):
+        """test_gzip_is_decoded"""
+        encoded = gzip.compress(b"blob content")
+
+        self.assertEqual(
+            b"".join(iter_decoded(iter([encoded[:5], encoded[5:]]), "gzip")),
+            b"blob content",
+        )
+
+    def test_zlib_and_raw_deflate_are_decoded(self):
+        """test_zlib_and_raw_deflate_are_decoded"""
+        raw_compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        raw_deflate = raw_compressor.compress(b"blob") + raw_compressor.flush()
+
+        for encoded in (zlib.compress(b"blob"), raw_deflate):
+            self.assertEqual(
+                b"".join(iter_decoded(iter([encoded]), "deflate")), b"blob"
+            )
+
+    def test_deflate_is_decoded_in_chunks(self):
+        """test_deflate_is_decoded_in_chunks"""
+        content = os.urandom(1000)
+        encoded = zlib.compress(content)
+
+        self.assertEqual(
+            b"".join(
+                iter_decoded(iter([encoded[:500], encoded[500:]]), "deflate")
+            ),
+            content,
+        )
+
+    def test_flushed_content_is_returned(self):
+        """test_flushed_content_is_returned"""
+        decoder = MagicMock()
+        decoder.decompress.return_value = b""
+        decoder.flush.return_value = b"blob"
+
+        with patch.object(blob_encoding, "get_decoder", return_value=decoder):
+            self.assertEqual(
+                list(iter_decoded(iter([b"encoded"]), "gzip")), [b"blob"]
+            )
+
+    def test_unsupported_coding_raises_value_error(self):
+        """test_unsupported_coding_raises_value_error"""
+        with self.assertRaises(ValueError):
+            blob_encoding.get_decoder("br")
+
+
+class TestGetStreamingResponseEncoding(TestCase):
+    """Unit tests for `get_streaming_response` with encoded content."""
+
+    def test_shared_content_is_decoded_if_not_accepted(self):
+        """test_shared_content_is_decoded_if_not_accepted"""
+        encoded = gzip.compress(b"blob")
+        transfer = SharedBlobTransfer()
+        transfer.start("path", {"Content-Encoding": "gzip"}, len(encoded))
+        transfer.join(1)
+        transfer.progress(len(encoded))
+        transfer.finish()
+
+        response = blob_response.get_shared_response(
+            transfer, io.BytesIO(encoded), 1, accept_encoding="br"
+        )
+
+        self.assertEqual(b"".join(response.streaming_content), b"blob")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_encoded_content_is_relayed_if_accepted(self):
+        """test_encoded_content_is_relayed_if_accepted"""
+        upstream_response, encoded = _get_gzip_upstream_response(b"blob")
+
+        response = get_streaming_response(
+            upstream_response, accept_encoding="gzip, deflate"
+        )
+
+        self.assertEqual(b"".join(response.streaming_content), encoded)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Length"], str(len(encoded)))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        upstream_response.raw.stream.assert_called_with(
+            64 * 1024, decode_content=False
+        )
+
+    def test_encoded_content_is_decoded_if_not_accepted(self):
+        """test_encoded_content_is_decoded_if_not_accepted"""
+        upstream_response, _ = _get_gzip_upstream_response(b"blob")
+
+        response = get_streaming_response(
+            upstream_response, accept_encoding="br"
+        )
+
+        self.assertEqual(b"".join(response.streaming_content), b"blob")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Content-Length"))
+        upstream_response.close.assert_called()
+
+
+class TestParseRangeHeader(TestCase):
+    """Unit tests for `parse_range_header` function."""
+
+    def test_byte_ranges(self):
+        """test_byte_ranges"""
+        self.assertEqual(parse_range_header("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range_header("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range_header("bytes=-100", 1000), (900, 999))
+        self.assertEqual(
+            parse_range_header("bytes=990-2000", 1000), (990, 999)
+        )
+
+    def test_unsupported_ranges_are_ignored(self):
+        """test_unsupported_ranges_are_ignored"""
+        self.assertIsNone(parse_range_header("bytes=0-1,5-6", 1000))
+        self.assertIsNone(parse_range_header("items=0-1", 1000))
+        self.assertIsNone(parse_range_header("bytes=5-1", 1000))
+        self.assertIsNone(parse_range_header("bytes=-", 1000))
+
+    def test_range_outside_blob_raises_error(self):
+        """test_range_outside_blob_raises_error"""
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range_header("bytes=1000-", 1000)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range_header("bytes=-0", 1000)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range_header("bytes=-100", 0)
+
+    def test_file_range_stops_at_end_of_file(self):
+        """test_file_range_stops_at_end_of_file"""
+        content = blob_response.iter_file_range(io.BytesIO(b"blob"), 2, 10, 1)
+
+        self.assertEqual(list(content), [b"o", b"b"])
+
+    def test_if_range(self):
+        """test_if_range"""
+        headers = {"ETag": '"1"', "Last-Modified": "date"}
+
+        self.assertTrue(is_if_range_satisfied(None, headers))
+        self.assertTrue(is_if_range_satisfied('"1"', headers))
+        self.assertFalse(is_if_range_satisfied('"2"', headers))
+        self.assertTrue(is_if_range_satisfied("date", headers))
+        self.assertFalse(is_if_range_satisfied('W/"1"', {"ETag": 'W/"1"'}))
+
+
+class BlobCacheTestCase(TestCase):
+    """Test case with an empty blob cache in a temporary directory."""
+
+    def setUp(self):
+        """setUp"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.blob_cache = BlobCache(directory.name, 10, 8)
+        for name in blob_cache_module.STATS:
+            cache.delete(f"{blob_cache_module.STATS_CACHE_KEY_PREFIX}{name}")
+
+    def _store(self, key, content, headers=None):
+        """Store a blob in the cache."""
+        writer = self.blob_cache.open_writer(key, headers or {"ETag": '"1"'})
+        writer.write(content)
+        writer.commit()
+
+
+class TestBlobCache(BlobCacheTestCase):
+    """Unit tests for `BlobCache` class."""
+
+    def test_stored_blob_is_returned(self):
+        """test_stored_blob_is_returned"""
+        self._store("key", b"blob", {"ETag": '"1"', "Set-Cookie": "a=b"})
+
+        entry = self.blob_cache.get("key")
+
+        with entry.open() as content:
+            self.assertEqual(content.read(), b"blob")
+        self.assertEqual(entry.headers, {"ETag": '"1"'})
+        self.assertEqual(entry.get_validators(), {"If-None-Match": '"1"'})
+
+    def test_missing_blob_returns_none(self):
+        """test_missing_blob_returns_none"""
+        self.assertIsNone(self.blob_cache.get("key"))
+
+    def test_discarded_blob_is_not_stored(self):
+        """test_discarded_blob_is_not_stored"""
+        writer = self.blob_cache.open_writer("key", {})
+        writer.write(b"blob")
+        writer.discard()
+
+        self.assertIsNone(self.blob_cache.get("key"))
+        self.assertEqual(os.listdir(self.blob_cache.tmp_directory), [])
+
+    def test_blob_larger_than_max_entry_size_is_not_stored(self):
+        """test_blob_larger_than_max_entry_size_is_not_stored"""
+        self._store("key", b"large blob")
+
+        self.assertIsNone(self.blob_cache.get("key"))
+
+    def test_least_recently_used_blob_is_evicted(self):
+        """test_least_recently_used_blob_is_evicted"""
+        self._store("first", b"1234")
+        self._store("second", b"1234")
+        os.utime(self.blob_cache._get_paths("first")[0], (0, 0))
+        os.utime(self.blob_cache._get_paths("second")[0], (1, 1))
+        self.blob_cache.touch("first")
+
+        self._store("third", b"1234")
+
+        self.assertIsNotNone(self.blob_cache.get("first"))
+        self.assertIsNone(self.blob_cache.get("second"))
+        self.assertIsNotNone(self.blob_cache.get("third"))
+        stats = self.blob_cache.get_stats()
+        self.assertEqual(stats["stores"], 3)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["size"], 8)
+
+    def test_store_does_not_scan_directory_below_max_size(self):
+        """test_store_does_not_scan_directory_below_max_size"""
+        with patch.object(self.blob_cache, "_list_entries") as mock_list:
+            self._store("first", b"1234")
+            self._store("first", b"12")
+            self._store("second", b"1234")
+
+        mock_list.assert_not_called()
+        self.assertEqual(
+            self.blob_cache.get_usage(),
+            {"entries": 2, "size": 6, "max_size": 10},
+        )
+
+    def test_index_is_rebuilt_from_directory(self):
+        """test_index_is_rebuilt_from_directory"""
+        self._store("first", b"1234")
+
+        blob_cache = BlobCache(self.blob_cache.directory, 10, 8)
+
+        self.assertEqual(blob_cache.get_usage()["size"], 4)
+
+    def test_deleted_blob_is_removed_from_index(self):
+        """test_deleted_blob_is_removed_from_index"""
+        self._store("first", b"1234")
+
+        self.blob_cache.delete("first")
+
+        self.assertEqual(self.blob_cache.get_usage()["entries"], 0)
+        self.assertEqual(self.blob_cache.get_usage()["size"], 0)
+
+
+class TestBlobCacheErrors(BlobCacheTestCase):
+    """Unit tests for the error paths of `BlobCache` class."""
+
+    def test_last_modified_is_a_validator(self):
+        """test_last_modified_is_a_validator"""
+        self._store("key", b"blob", {"Last-Modified": "date"})
+
+        self.assertEqual(
+            self.blob_cache.get("key").get_validators(),
+            {"If-Modified-Since": "date"},
+        )
+
+    def test_write_after_discard_is_ignored(self):
+        """test_write_after_discard_is_ignored"""
+        writer = self.blob_cache.open_writer("key", {})
+        writer.discard()
+
+        writer.write(b"blob")
+
+        self.assertEqual(writer.size, 0)
+
+    def test_touch_missing_blob_is_ignored(self):
+        """test_touch_missing_blob_is_ignored"""
+        self.blob_cache.touch("key")
+
+        self.assertEqual(self.blob_cache.get_usage()["entries"], 0)
+
+    def test_concurrently_created_stat_is_incremented(self):
+        """test_concurrently_created_stat_is_incremented"""
+        with patch.object(blob_cache_module.cache, "add", return_value=False):
+            with patch.object(
+                blob_cache_module.cache,
+                "incr",
+                side_effect=[ValueError("missing"), 1],
+            ) as mock_incr:
+                self.blob_cache.increment_stat("hits")
+
+        self.assertEqual(mock_incr.call_count, 2)
+
+    def test_metadata_without_content_is_not_listed(self):
+        """test_metadata_without_content_is_not_listed"""
+        self._store("key", b"blob")
+        os.remove(self.blob_cache._get_paths("key")[1])
+
+        blob_cache = BlobCache(self.blob_cache.directory, 10, 8)
+
+        self.assertEqual(blob_cache.get_usage()["entries"], 0)
+
+    @patch.object(blob_cache_module, "logger")
+    def test_delete_missing_blob_is_ignored(self, mock_logger):
+        """test_delete_missing_blob_is_ignored"""
+        self.blob_cache.delete("key")
+
+        self.assertEqual(self.blob_cache.get_usage()["entries"], 0)
+        mock_logger.warning.assert_not_called()
+
+    @patch.object(blob_cache_module, "logger")
+    def test_remove_error_is_logged(self, mock_logger):
+        """test_remove_error_is_logged"""
+        with patch.object(
+            blob_cache_module.os, "remove", side_effect=PermissionError
+        ):
+            self.blob_cache.delete("key")
+
+        self.assertEqual(mock_logger.warning.call_count, 2)
+
+
+class TestGetBlobCache(TestCase):
+    """Unit tests for `get_blob_cache` function."""
+
+    def setUp(self):
+        """setUp"""
+        patcher = patch.object(blob_cache_module, "_blob_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.object(blob_cache_module, "BLOB_CACHE_DIRECTORY", None)
+    def test_disabled_cache_returns_none(self):
+        """test_disabled_cache_returns_none"""
+        self.assertIsNone(blob_cache_module.get_blob_cache())
+
+    def test_configured_cache_is_created_once(self):
+        """test_configured_cache_is_created_once"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        with patch.object(
+            blob_cache_module, "BLOB_CACHE_DIRECTORY", directory.name
+        ):
+            blob_cache = blob_cache_module.get_blob_cache()
+
+            self.assertIs(blob_cache_module.get_blob_cache(), blob_cache)
+        self.assertEqual(blob_cache.directory, directory.name)
+        self.assertEqual(
+            blob_cache.max_size, blob_cache_module.BLOB_CACHE_MAX_SIZE
+        )
+
+
+class TestIsCacheable(TestCase):
+    """Unit tests for `is_cacheable` function."""
+
+    def _is_cacheable(self, headers):
+        """Check if a remote response with the given headers is cacheable."""
+        return blob_proxy.is_cacheable(_get_upstream_response(headers), 8)
+
+    def test_response_with_validator_is_cacheable(self):
+        """test_response_with_validator_is_cacheable"""
+        self.assertTrue(self._is_cacheable({"ETag": '"1"'}))
+        self.assertTrue(
+            self._is_cacheable(
+                {"Last-Modified": "date", "Content-Length": "8"}
+            )
+        )
+
+    def test_response_without_validator_is_not_cacheable(self):
+        """test_response_without_validator_is_not_cacheable"""
+        self.assertFalse(self._is_cacheable({}))
+
+    def test_unsupported_encoding_is_not_cacheable(self):
+        """test_unsupported_encoding_is_not_cacheable"""
+        self.assertFalse(
+            self._is_cacheable({"ETag": '"1"', "Content-Encoding": "br"})
+        )
+
+    def test_no_store_response_is_not_cacheable(self):
+        """test_no_store_response_is_not_cacheable"""
+        self.assertFalse(
+            self._is_cacheable(
+                {"ETag": '"1"', "Cache-Control": "private, No-Store"}
+            )
+        )
+
+    def test_response_larger_than_max_entry_size_is_not_cacheable(self):
+        """test_response_larger_than_max_entry_size_is_not_cacheable"""
+        self.assertFalse(
+            self._is_cacheable({"ETag": '"1"', "Content-Length": "9"})
+        )
+
+    def test_malformed_content_length_is_cacheable(self):
+        """test_malformed_content_length_is_cacheable"""
+        # the size is checked while the blob is written
+        self.assertTrue(
+            self._is_cacheable({"ETag": '"1"', "Content-Length": "abc"})
+        )
+
+
+class TestGetCachedResponseOffload(BlobCacheTestCase):
+    """Unit tests for `get_cached_response` with BLOB_CACHE_OFFLOAD."""
+
+    def setUp(self):
+        """setUp"""
+        super().setUp()
+        self._store("key", b"blob", {"ETag": '"1"', "Content-Type": "a/b"})
+        self.entry = self.blob_cache.get("key")
+
+    @patch.object(blob_response, "BLOB_CACHE_OFFLOAD", "x-accel-redirect")
+    def test_x_accel_redirect_points_to_internal_location(self):
+        """test_x_accel_redirect_points_to_internal_location"""
+        response = get_cached_response(self.entry)
+
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["X-Accel-Redirect"], "/blob-cache/key.blob")
+        self.assertEqual(response["Content-Type"], "a/b")
+        self.assertEqual(response["ETag"], '"1"')
+
+    @patch.object(blob_response, "BLOB_CACHE_OFFLOAD", "x-sendfile")
+    def test_x_sendfile_points_to_cached_file(self):
+        """test_x_sendfile_points_to_cached_file"""
+        response = get_cached_response(self.entry)
+
+        self.assertEqual(response["X-Sendfile"], self.entry.path)
+
+    @patch.object(blob_response, "BLOB_CACHE_OFFLOAD", "x-accel-redirect")
+    def test_encoded_blob_is_not_offloaded(self):
+        """test_encoded_blob_is_not_offloaded"""
+        # sent as is to a client accepting the coding
+        self._store("gzip", b"gzip", {"Content-Encoding": "gzip"})
+
+        response = get_cached_response(
+            self.blob_cache.get("gzip"), accept_encoding="gzip"
+        )
+
+        self.assertFalse(response.has_header("X-Accel-Redirect"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(b"".join(response.streaming_content), b"gzip")
+        response.close()
+
+    @patch.object(blob_response, "BLOB_CACHE_OFFLOAD", "x-sendfile")
+    def test_ranges_are_not_offloaded(self):
+        """test_ranges_are_not_offloaded"""
+        response = get_cached_response(self.entry, "bytes=1-2")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertFalse(response.has_header("X-Sendfile"))
+        self.assertEqual(b"".join(response.streaming_content), b"lo")
+
+    @patch.object(blob_response, "BLOB_CACHE_OFFLOAD", None)
+    def test_blob_is_sent_by_django_without_offload(self):
+        """test_blob_is_sent_by_django_without_offload"""
+        response = get_cached_response(self.entry)
+
+        self.assertEqual(b"".join(response.streaming_content), b"blob")
+        self.assertFalse(response.has_header("X-Accel-Redirect"))
+        response.close()
+
+    def test_unknown_offload_mode_raises_value_error(self):
+        """test_unknown_offload_mode_raises_value_error"""
+        with self.assertRaises(ValueError):
+            blob_response.get_offload_response(self.entry, "x-unknown")
+
+
+@patch.object(blob_proxy, "get_blob_cache")
+@patch.object(blob_proxy.instance_api, "get_blob_response_from_url")
+@patch.object(blob_proxy.instance_api, "get_by_url")
+class TestGetBlobResponse(BlobCacheTestCase):
+    """Unit tests for `get_blob_response` function."""
+
+    url = "http://remote.test/rest/blob/download/1/"
+
+    def setUp(self):
+        """setUp"""
+        super().setUp()
+        self.instance = Instance(pk=1, name="remote")
+
+    def test_cacheable_blob_is_stored(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_cacheable_blob_is_stored"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {"ETag": '"1"'}, chunks=(b"blob",)
+        )
+
+        response = blob_proxy.get_blob_response(self.url)
+        list(response.streaming_content)
+
+        key = BlobCache.get_key(
+            self.instance, blob_proxy.get_cache_url(self.url)
+        )
+        self.assertIsNotNone(self.blob_cache.get(key))
+        self.assertEqual(self.blob_cache.get_stats()["misses"], 1)
+
+    def test_not_modified_blob_is_served_from_cache(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_not_modified_blob_is_served_from_cache"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        key = BlobCache.get_key(
+            self.instance, blob_proxy.get_cache_url(self.url)
+        )
+        self._store(key, b"blob")
+        upstream_response = _get_upstream_response({}, status_code=304)
+        mock_get_blob_response.return_value = upstream_response
+
+        response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(b"".join(response.streaming_content), b"blob")
+        self.assertEqual(response["ETag"], '"1"')
+        mock_get_blob_response.assert_called_with(
+            None,
+            self.url,
+            stream=True,
+            headers={
+                "If-None-Match": '"1"',
+                "Accept-Encoding": "gzip, deflate",
+            },
+        )
+        upstream_response.close.assert_called()
+        stats = self.blob_cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["revalidations"], 1)
+        response.close()
+
+    def test_changed_blob_that_can_not_be_cached_is_dropped(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_changed_blob_that_can_not_be_cached_is_dropped"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        key = BlobCache.get_key(
+            self.instance, blob_proxy.get_cache_url(self.url)
+        )
+        self._store(key, b"blob")
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {"ETag": '"2"', "Cache-Control": "no-store"}, chunks=(b"new",)
+        )
+
+        response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(b"".join(response.streaming_content), b"new")
+        self.assertIsNone(self.blob_cache.get(key))
+
+    def test_range_of_cached_blob_is_served_locally(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_range_of_cached_blob_is_served_locally"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        key = BlobCache.get_key(
+            self.instance, blob_proxy.get_cache_url(self.url)
+        )
+        self._store(key, b"blob")
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {}, status_code=304
+        )
+
+        response = blob_proxy.get_blob_response(
+            self.url, {"Range": "bytes=1-2", "If-Range": '"1"'}
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"lo")
+        self.assertEqual(response["Content-Range"], "bytes 1-2/4")
+        self.assertEqual(response["Content-Length"], "2")
+
+    def test_unsatisfiable_range_of_cached_blob_returns_416(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_unsatisfiable_range_of_cached_blob_returns_416"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        key = BlobCache.get_key(
+            self.instance, blob_proxy.get_cache_url(self.url)
+        )
+        self._store(key, b"blob")
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {}, status_code=304
+        )
+
+        response = blob_proxy.get_blob_response(
+            self.url, {"Range": "bytes=9-"}
+        )
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */4")
+
+    def test_range_of_uncached_blob_is_forwarded(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_range_of_uncached_blob_is_forwarded"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {"ETag": '"1"', "Content-Range": "bytes 0-3/11"},
+            chunks=(b"blob",),
+            status_code=206,
+        )
+
+        response = blob_proxy.get_blob_response(
+            self.url, {"Range": "bytes=0-3"}
+        )
+        list(response.streaming_content)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 0-3/11")
+        mock_get_blob_response.assert_called_with(
+            None,
+            self.url,
+            stream=True,
+            headers={"Range": "bytes=0-3", "Accept-Encoding": "identity"},
+        )
+        self.assertEqual(self.blob_cache.get_usage()["entries"], 0)
+
+    def test_blob_without_validator_is_not_stored(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_blob_without_validator_is_not_stored"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {}, chunks=(b"blob",)
+        )
+
+        response = blob_proxy.get_blob_response(self.url)
+        list(response.streaming_content)
+
+        self.assertEqual(self.blob_cache.get_usage()["entries"], 0)
+
+    def test_disabled_cache_streams_remote_blob(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_disabled_cache_streams_remote_blob"""
+        mock_get_blob_cache.return_value = None
+        mock_get_blob_response.return_value = _get_upstream_response({})
+
+        response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(b"".join(response.streaming_content), b"blobcontent")
+        mock_get_by_url.assert_not_called()
+
+
+@patch.object(blob_proxy, "get_blob_cache")
+@patch.object(blob_proxy.instance_api, "get_blob_response_from_url")
+@patch.object(blob_proxy.instance_api, "get_by_url")
+class TestGetBlobResponseEncoding(BlobCacheTestCase):
+    """Unit tests for `get_blob_response` with encoded blobs."""
+
+    url = "http://remote.test/rest/blob/download/1/"
+
+    def setUp(self):
+        """setUp"""
+        super().setUp()
+        self.blob_cache.max_size = self.blob_cache.max_entry_size = 1024
+        self.instance = Instance(pk=1, name="remote")
+        self.key = BlobCache.get_key(
+            self.instance, blob_proxy.get_cache_url(self.url)
+        )
+
+    def test_encoded_blob_is_cached_compressed(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_encoded_blob_is_cached_compressed"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        upstream_response, encoded = _get_gzip_upstream_response(
+            b"blob", {"ETag": '"1"'}
+        )
+        mock_get_blob_response.return_value = upstream_response
+
+        response = blob_proxy.get_blob_response(
+            self.url, {"Accept-Encoding": "gzip"}
+        )
+        list(response.streaming_content)
+
+        entry = self.blob_cache.get(self.key)
+        with entry.open() as content:
+            self.assertEqual(content.read(), encoded)
+        self.assertEqual(entry.headers["Content-Encoding"], "gzip")
+
+    def test_cached_encoded_blob_is_decoded_if_not_accepted(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_cached_encoded_blob_is_decoded_if_not_accepted"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        self._store(
+            self.key,
+            gzip.compress(b"blob"),
+            {"ETag": '"1"', "Content-Encoding": "gzip"},
+        )
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {}, status_code=304
+        )
+
+        response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(b"".join(response.streaming_content), b"blob")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["ETag"], '"1"')
+
+    def test_cached_encoded_blob_is_sent_as_is_if_accepted(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_cached_encoded_blob_is_sent_as_is_if_accepted"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        encoded = gzip.compress(b"blob")
+        self._store(
+            self.key, encoded, {"ETag": '"1"', "Content-Encoding": "gzip"}
+        )
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {}, status_code=304
+        )
+
+        response = blob_proxy.get_blob_response(
+            self.url, {"Accept-Encoding": "gzip, deflate"}
+        )
+
+        self.assertEqual(b"".join(response.streaming_content), encoded)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        response.close()
+
+
+@patch.object(blob_proxy, "get_blob_cache")
+@patch.object(blob_proxy.instance_api, "get_blob_response_from_url")
+@patch.object(blob_proxy.instance_api, "get_by_url")
+class TestGetBlobResponseCoalescing(BlobCacheTestCase):
+    """Unit tests for the coalescing of identical `get_blob_response` calls."""
+
+    url = "http://remote.test/rest/blob/download/1/"
+
+    def setUp(self):
+        """setUp"""
+        super().setUp()
+        self.instance = Instance(pk=1, name="remote")
+        self.key = BlobCache.get_key(
+            self.instance, blob_proxy.get_cache_url(self.url)
+        )
+        self.blob_transfers = BlobTransferRegistry()
+        patcher = patch.object(
+            blob_proxy, "blob_transfers", self.blob_transfers
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _setup_mocks(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """Return a cacheable remote blob, in two chunks."""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        mock_get_blob_response.return_value = _get_upstream_response(
+            {"ETag": '"1"', "Content-Length": "4"}, chunks=(b"bl", b"ob")
+        )
+
+    def test_follower_shares_the_remote_download(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_shares_the_remote_download"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+
+        leader_response = blob_proxy.get_blob_response(self.url)
+        follower_response = blob_proxy.get_blob_response(self.url)
+        leader_content = b"".join(leader_response.streaming_content)
+        follower_content = b"".join(follower_response.streaming_content)
+
+        self.assertEqual(leader_content, b"blob")
+        self.assertEqual(follower_content, b"blob")
+        self.assertEqual(follower_response["ETag"], '"1"')
+        self.assertEqual(follower_response["Content-Length"], "4")
+        self.assertEqual(mock_get_blob_response.call_count, 1)
+        stats = self.blob_cache.get_stats()
+        self.assertEqual(stats["coalesced"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertIsNotNone(self.blob_cache.get(self.key))
+        self.assertFalse(self.blob_transfers.is_in_flight(self.key))
+
+    def test_follower_reads_content_while_it_is_downloaded(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_reads_content_while_it_is_downloaded"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+
+        leader_response = blob_proxy.get_blob_response(self.url)
+        follower_response = blob_proxy.get_blob_response(self.url)
+        leader_content = iter(leader_response.streaming_content)
+        follower_content = iter(follower_response.streaming_content)
+
+        self.assertEqual(next(leader_content), b"bl")
+        self.assertEqual(next(follower_content), b"bl")
+        self.assertEqual(list(leader_content), [b"ob"])
+        self.assertEqual(list(follower_content), [b"ob"])
+
+    def test_download_continues_for_followers_if_leader_disconnects(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_download_continues_for_followers_if_leader_disconnects"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+
+        leader_response = blob_proxy.get_blob_response(self.url)
+        follower_response = blob_proxy.get_blob_response(self.url)
+        next(iter(leader_response.streaming_content))
+        leader_response.close()
+
+        self.assertEqual(
+            b"".join(follower_response.streaming_content), b"blob"
+        )
+        self.assertIsNotNone(self.blob_cache.get(self.key))
+
+    @patch.object(blob_response, "logger")
+    def test_follower_fails_if_download_fails_after_leader_disconnects(
+        self,
+        mock_logger,
+        mock_get_by_url,
+        mock_get_blob_response,
+        mock_get_blob_cache,
+    ):
+        """test_follower_fails_if_download_fails_after_leader_disconnects"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+
+        def iter_failing_chunks(chunk_size):
+            yield b"bl"
+            raise IOError("reset")
+
+        upstream_response = mock_get_blob_response.return_value
+        upstream_response.iter_content.side_effect = iter_failing_chunks
+
+        leader_response = blob_proxy.get_blob_response(self.url)
+        follower_response = blob_proxy.get_blob_response(self.url)
+        next(iter(leader_response.streaming_content))
+        leader_response.close()
+
+        with self.assertRaises(BlobTransferError):
+            list(follower_response.streaming_content)
+        mock_logger.warning.assert_called_once()
+        self.assertIsNone(self.blob_cache.get(self.key))
+
+    def test_follower_fails_if_download_fails(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_fails_if_download_fails"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+        upstream_response = mock_get_blob_response.return_value
+        upstream_response.iter_content.side_effect = lambda chunk_size: (
+            _ for _ in ()
+        ).throw(IOError("reset"))
+
+        leader_response = blob_proxy.get_blob_response(self.url)
+        follower_response = blob_proxy.get_blob_response(self.url)
+        with self.assertRaises(IOError):
+            list(leader_response.streaming_content)
+
+        with self.assertRaises(BlobTransferError):
+            list(follower_response.streaming_content)
+        self.assertIsNone(self.blob_cache.get(self.key))
+
+    def test_follower_reads_blob_larger_than_max_entry_size(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_reads_blob_larger_than_max_entry_size"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+        # the remote announced 4 bytes, but sends more
+        mock_get_blob_response.return_value.iter_content.return_value = iter(
+            (b"blob", b"content")
+        )
+
+        leader_response = blob_proxy.get_blob_response(self.url)
+        follower_response = blob_proxy.get_blob_response(self.url)
+        leader_content = iter(leader_response.streaming_content)
+        follower_content = iter(follower_response.streaming_content)
+
+        self.assertEqual(next(leader_content), b"blob")
+        self.assertEqual(next(follower_content), b"blob")
+        self.assertEqual(list(leader_content), [b"content"])
+        self.assertEqual(list(follower_content), [b"content"])
+        self.assertIsNone(self.blob_cache.get(self.key))
+        self.assertEqual(os.listdir(self.blob_cache.tmp_directory), [])
+
+    def test_blob_larger_than_max_entry_size_is_no_longer_shared(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_blob_larger_than_max_entry_size_is_no_longer_shared"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+        mock_get_blob_response.return_value.iter_content.return_value = iter(
+            (b"blob", b"content")
+        )
+
+        leader_response = blob_proxy.get_blob_response(self.url)
+        leader_content = iter(leader_response.streaming_content)
+        next(leader_content)
+        next(leader_content)
+
+        self.assertFalse(self.blob_transfers.is_in_flight(self.key))
+        self.assertEqual(os.listdir(self.blob_cache.tmp_directory), [])
+
+    def test_blob_that_can_not_be_cached_is_not_shared(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_blob_that_can_not_be_cached_is_not_shared"""
+        mock_get_by_url.return_value = self.instance
+        mock_get_blob_cache.return_value = self.blob_cache
+        mock_get_blob_response.return_value = _get_upstream_response({})
+
+        blob_proxy.get_blob_response(self.url)
+
+        self.assertFalse(self.blob_transfers.is_in_flight(self.key))
+
+    def test_follower_reads_blob_committed_before_it_opens_the_file(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_reads_blob_committed_before_it_opens_the_file"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+        leader_response = blob_proxy.get_blob_response(self.url)
+        transfer, _ = self.blob_transfers.lead_or_follow(self.key, 10)
+        join = transfer.join
+
+        def join_after_commit(timeout):
+            # the leader commits the blob, and removes its temporary file
+            b"".join(leader_response.streaming_content)
+            return join(timeout)
+
+        with patch.object(transfer, "join", side_effect=join_after_commit):
+            follower_response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(
+            b"".join(follower_response.streaming_content), b"blob"
+        )
+        self.assertEqual(follower_response["ETag"], '"1"')
+        self.assertEqual(mock_get_blob_response.call_count, 1)
+        self.assertEqual(self.blob_cache.get_stats()["coalesced"], 1)
+        self.assertFalse(transfer.has_followers())
+
+    def test_follower_downloads_blob_dropped_before_it_opens_the_file(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_downloads_blob_dropped_before_it_opens_the_file"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+        leader_response = blob_proxy.get_blob_response(self.url)
+        transfer, _ = self.blob_transfers.lead_or_follow(self.key, 10)
+        join = transfer.join
+
+        def join_after_drop(timeout):
+            # the leader disconnects before the end of the blob
+            next(iter(leader_response.streaming_content))
+            leader_response.close()
+            return join(timeout)
+
+        mock_get_blob_response.side_effect = [
+            _get_upstream_response({"ETag": '"1"'}, chunks=(b"blob",))
+        ]
+        with patch.object(transfer, "join", side_effect=join_after_drop):
+            follower_response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(
+            b"".join(follower_response.streaming_content), b"blob"
+        )
+        self.assertEqual(mock_get_blob_response.call_count, 2)
+        self.assertEqual(self.blob_cache.get_stats()["coalesced"], 0)
+        self.assertFalse(transfer.has_followers())
+
+    def test_follower_downloads_blob_if_leader_abandons(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_downloads_blob_if_leader_abandons"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+        transfer, _ = self.blob_transfers.lead_or_follow(self.key, 10)
+        join = transfer.join
+
+        def join_after_abandon(timeout):
+            transfer.abandon()
+            return join(timeout)
+
+        with patch.object(transfer, "join", side_effect=join_after_abandon):
+            follower_response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(
+            b"".join(follower_response.streaming_content), b"blob"
+        )
+        self.assertEqual(mock_get_blob_response.call_count, 1)
+        self.assertEqual(self.blob_cache.get_stats()["coalesced"], 0)
+        self.assertFalse(transfer.has_followers())
+
+    @patch.object(blob_proxy, "BLOB_COALESCING_TIMEOUT", 0.01)
+    def test_follower_downloads_blob_if_leader_does_not_respond(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_follower_downloads_blob_if_leader_does_not_respond"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+        # the leader is still waiting for the remote response
+        transfer, _ = self.blob_transfers.lead_or_follow(self.key, 10)
+
+        follower_response = blob_proxy.get_blob_response(self.url)
+
+        self.assertEqual(
+            b"".join(follower_response.streaming_content), b"blob"
+        )
+        self.assertEqual(mock_get_blob_response.call_count, 1)
+        self.assertEqual(self.blob_cache.get_stats()["coalesced"], 0)
+        self.assertFalse(transfer.has_followers())
+
+    def test_range_requests_are_not_shared(
+        self, mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+    ):
+        """test_range_requests_are_not_shared"""
+        self._setup_mocks(
+            mock_get_by_url, mock_get_blob_response, mock_get_blob_cache
+        )
+
+        blob_proxy.get_blob_response(self.url)
+        blob_proxy.get_blob_response(self.url, {"Range": "bytes=0-1"})
+
+        self.assertEqual(mock_get_blob_response.call_count, 2)
+        self.assertEqual(self.blob_cache.get_stats()["coalesced"], 0)
+
+
+class TestSharedBlobTransfer(TestCase):
+    """Unit tests for `SharedBlobTransfer` class."""
+
+    def setUp(self):
+        """setUp"""
+        self.transfer = SharedBlobTransfer()
+        self.transfer.start("path", {})
+        self.assertTrue(self.transfer.join(1))
+
+    def test_content_is_read_until_download_is_done(self):
+        """test_content_is_read_until_download_is_done"""
+        self.transfer.progress(4)
+        self.transfer.finish()
+
+        content = self.transfer.iter_content(io.BytesIO(b"blob"), 2, 1)
+
+        self.assertEqual(list(content), [b"bl", b"ob"])
+        self.assertFalse(self.transfer.has_followers())
+
+    def test_failed_download_raises_error(self):
+        """test_failed_download_raises_error"""
+        self.transfer.progress(4)
+        self.transfer.fail()
+        content = self.transfer.iter_content(io.BytesIO(b"blob"), 4, 1)
+
+        self.assertEqual(next(content), b"blob")
+        with self.assertRaises(BlobTransferError):
+            next(content)
+
+    def test_truncated_file_raises_error(self):
+        """test_truncated_file_raises_error"""
+        self.transfer.progress(4)
+        content = self.transfer.iter_content(io.BytesIO(b"bl"), 4, 1)
+
+        self.assertEqual(next(content), b"bl")
+        with self.assertRaises(BlobTransferError):
+            next(content)
+
+    def test_download_without_progress_times_out(self):
+        """test_download_without_progress_times_out"""
+        content = self.transfer.iter_content(io.BytesIO(), 4, 0.01)
+
+        with self.assertRaises(BlobTransferError):
+            next(content)
+        self.assertFalse(self.transfer.has_followers())
+
+
+@patch.object(blob_batch.instance_api, "get_blob_response_from_url")
+@patch.object(blob_batch.instance_api, "get_by_url")
+class TestFetchBlobs(TestCase):
+    """Unit tests for `fetch_blobs` function."""
+
+    def setUp(self):
+        """setUp"""
+        self.instance = Instance(pk=1, name="remote")
+
+    def _get_by_url(self, url):
+        """Resolve the urls of remote.test only."""
+        if "remote.test" not in url:
+            raise exceptions.DoesNotExist("unknown")
+        return self.instance
+
+    def test_errors_are_reported_per_url(
+        self, mock_get_by_url, mock_get_blob_response
+    ):
+        """test_errors_are_reported_per_url"""
+        mock_get_by_url.side_effect = self._get_by_url
+        not_found_response = MagicMock(status_code=404)
+
+        def _get_blob_response(url_base, url, stream):
+            if url.endswith("/1"):
+                return MagicMock(status_code=200)
+            if url.endswith("/2"):
+                return not_found_response
+            raise ConnectionError("down")
+
+        mock_get_blob_response.side_effect = _get_blob_response
+
+        results = {
+            result.url: result
+            for result in blob_batch.fetch_blobs(
+                [
+                    "http://remote.test/1",
+                    "http://remote.test/2",
+                    "http://remote.test/3",
+                    "http://unknown.test/1",
+                ]
+            )
+        }
+
+        self.assertTrue(results["http://remote.test/1"].ok)
+        self.assertIs(
+            results["http://remote.test/2"].response, not_found_response
+        )
+        self.assertFalse(results["http://remote.test/2"].ok)
+        self.assertEqual(results["http://remote.test/3"].error, "down")
+        self.assertEqual(results["http://unknown.test/1"].error, "unknown")
+        self.assertIsNone(results["http://unknown.test/1"].instance)
+
+    def test_blobs_are_fetched_concurrently(
+        self, mock_get_by_url, mock_get_blob_response
+    ):
+        """test_blobs_are_fetched_concurrently"""
+        mock_get_by_url.side_effect = self._get_by_url
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _get_blob_response(url_base, url, stream):
+            # both downloads must be in flight at the same time
+            barrier.wait()
+            return MagicMock(status_code=200)
+
+        mock_get_blob_response.side_effect = _get_blob_response
+
+        results = list(
+            blob_batch.fetch_blobs(
+                ["http://remote.test/1", "http://remote.test/2"],
+                max_workers=2,
+                max_workers_per_instance=2,
+            )
+        )
+
+        self.assertTrue(all(result.ok for result in results))
+
+
+@patch.object(blob_metadata, "get_blob_cache")
+@patch.object(blob_metadata.instance_api, "get_blob_head_response_from_url")
+@patch.object(blob_metadata.instance_api, "get_by_url")
+class TestGetBlobsMetadata(BlobCacheTestCase):
+    """Unit tests for `get_blobs_metadata` function."""
+
+    def setUp(self):
+        """setUp"""
+        super().setUp()
+        self.instance = Instance(pk=1, name="remote")
+
+    def _get_by_url(self, url):
+        """Resolve the urls of remote.test only."""
+        if "remote.test" not in url:
+            raise exceptions.DoesNotExist("unknown")
+        return self.instance
+
+    def test_metadata_is_read_from_head_response(
+        self, mock_get_by_url, mock_get_head_response, mock_get_blob_cache
+    ):
+        """test_metadata_is_read_from_head_response"""
+        mock_get_by_url.side_effect = self._get_by_url
+        mock_get_blob_cache.return_value = None
+        mock_get_head_response.return_value = MagicMock(
+            status_code=200,
+            headers={
+                "Content-Length": "4",
+                "Content-Type": "text/xml",
+                "ETag": '"1"',
+                "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT",
+            },
+        )
+
+        results = blob_metadata.get_blobs_metadata(["http://remote.test/1"])
+
+        self.assertEqual(
+            results,
+            [
+                {
+                    "url": "http://remote.test/1",
+                    "size": 4,
+                    "content_type": "text/xml",
+                    "etag": '"1"',
+                    "last_modified": "Mon, 05 Oct 2026 10:00:00 GMT",
+                    "cached": False,
+                }
+            ],
+        )
+        mock_get_head_response.return_value.close.assert_called()
+
+    def test_single_blob_metadata_resolves_its_instance(
+        self, mock_get_by_url, mock_get_head_response, mock_get_blob_cache
+    ):
+        """test_single_blob_metadata_resolves_its_instance"""
+        mock_get_by_url.side_effect = self._get_by_url
+        mock_get_blob_cache.return_value = self.blob_cache
+        mock_get_head_response.return_value = MagicMock(
+            status_code=200, headers={"Content-Length": "unknown"}
+        )
+
+        metadata = blob_metadata.get_blob_metadata("http://remote.test/1")
+
+        mock_get_by_url.assert_called_with("http://remote.test/1")
+        self.assertIsNone(metadata["size"])
+        self.assertFalse(metadata["cached"])
+
+    def test_cached_blob_is_not_requested(
+        self, mock_get_by_url, mock_get_head_response, mock_get_blob_cache
+    ):
+        """test_cached_blob_is_not_requested"""
+        mock_get_by_url.side_effect = self._get_by_url
+        mock_get_blob_cache.return_value = self.blob_cache
+        url = "http://remote.test/1"
+        self._store(
+            BlobCache.get_key(self.instance, blob_proxy.get_cache_url(url)),
+            b"blob",
+        )
+
+        results = blob_metadata.get_blobs_metadata([url])
+
+        self.assertEqual(results[0]["size"], 4)
+        self.assertEqual(results[0]["etag"], '"1"')
+        self.assertTrue(results[0]["cached"])
+        mock_get_head_response.assert_not_called()
+
+    def test_errors_are_reported_in_url_order(
+        self, mock_get_by_url, mock_get_head_response, mock_get_blob_cache
+    ):
+        """test_errors_are_reported_in_url_order"""
+        mock_get_by_url.side_effect = self._get_by_url
+        mock_get_blob_cache.return_value = None
+
+        def _get_head_response(url):
+            if url.endswith("/1"):
+                return MagicMock(status_code=404, headers={})
+            raise ConnectionError("down")
+
+        mock_get_head_response.side_effect = _get_head_response
+        urls = [
+            "http://unknown.test/1",
+            "http://remote.test/1",
+            "http://remote.test/2",
+        ]
+
+        results = blob_metadata.get_blobs_metadata(urls)
+
+        self.assertEqual([result["url"] for result in results], urls)
+        self.assertEqual(results[0]["error"], "unknown")
+        self.assertEqual(
+            results[1]["error"], "Remote responded with status 404."
+        )
+        self.assertEqual(results[2]["error"], "down")
+
+
+def _get_blob_response(chunks, headers=None, status_code=200):
+    """Return a streaming blob proxy response."""
+    response = StreamingHttpResponse(iter(chunks), status=status_code)
+    for header, value in (headers or {}).items():
+        response[header] = value
+    return response
+
+
+@patch.object(blob_archive.blob_proxy, "get_blob_response")
+class TestIterZipArchive(TestCase):
+    """Unit tests for `iter_zip_archive` function."""
+
+    def test_archive_contains_blobs(self, mock_get_blob_response):
+        """test_archive_contains_blobs"""
+        mock_get_blob_response.side_effect = [
+            _get_blob_response(
+                [b"<a/>", b"<b/>"],
+                {"Content-Disposition": 'attachment; filename="data.xml"'},
+            ),
+            _get_blob_response([b"png"], {"Content-Type": "image/png"}),
+            _get_blob_response([b"other"]),
+        ]
+
+        archive = zipfile.ZipFile(
+            io.BytesIO(
+                b"".join(
+                    blob_archive.iter_zip_archive(
+                        [
+                            "http://remote.test/blob/1/",
+                            "http://remote.test/blob/image.png",
+                            "http://remote.test/blob/data.xml",
+                        ]
+                    )
+                )
+            )
+        )
+
+        self.assertEqual(
+            archive.namelist(), ["data.xml", "image.png", "data (2).xml"]
+        )
+        self.assertEqual(archive.read("data.xml"), b"<a/><b/>")
+        self.assertEqual(
+            archive.getinfo("image.png").compress_type, zipfile.ZIP_STORED
+        )
+        self.assertEqual(
+            archive.getinfo("data.xml").compress_type, zipfile.ZIP_DEFLATED
+        )
+        # the blobs are read by the proxy, never sent by the web server
+        mock_get_blob_response.assert_called_with(
+            "http://remote.test/blob/data.xml", offload=False
+        )
+
+    def test_errors_are_listed_in_archive(self, mock_get_blob_response):
+        """test_errors_are_listed_in_archive"""
+        mock_get_blob_response.side_effect = [
+            exceptions.DoesNotExist("unknown instance"),
+            _get_blob_response([b"missing"], status_code=404),
+        ]
+
+        archive = zipfile.ZipFile(
+            io.BytesIO(
+                b"".join(
+                    blob_archive.iter_zip_archive(
+                        ["http://unknown.test/1", "http://remote.test/2"]
+                    )
+                )
+            )
+        )
+
+        self.assertEqual(archive.namelist(), ["errors.txt"])
+        self.assertIn(b"unknown instance", archive.read("errors.txt"))
+        self.assertIn(b"404", archive.read("errors.txt"))
+
+    def test_small_blob_failing_halfway_is_not_archived(
+        self, mock_get_blob_response
+    ):
+        """test_small_blob_failing_halfway_is_not_archived"""
+
+        def iter_failing_chunks():
+            yield b"<a/>"
+            raise ConnectionError("connection reset")
+
+        mock_get_blob_response.side_effect = [
+            _get_blob_response(iter_failing_chunks()),
+            _get_blob_response([b"<b/>"]),
+        ]
+
+        archive = zipfile.ZipFile(
+            io.BytesIO(
+                b"".join(
+                    blob_archive.iter_zip_archive(
+                        ["http://remote.test/1", "http://remote.test/2"]
+                    )
+                )
+            )
+        )
+
+        self.assertEqual(archive.namelist(), ["2", "errors.txt"])
+        self.assertEqual(archive.read("2"), b"<b/>")
+        self.assertIn(b"connection reset", archive.read("errors.txt"))
+
+    @patch.object(blob_archive, "BUFFER_MAX_SIZE", 2)
+    def test_large_blob_failing_halfway_is_truncated(
+        self, mock_get_blob_response
+    ):
+        """test_large_blob_failing_halfway_is_truncated"""
+
+        def iter_failing_chunks():
+            yield b"<a/>"
+            yield b"<b/>"
+            raise ConnectionError("connection reset")
+
+        mock_get_blob_response.side_effect = [
+            _get_blob_response(iter_failing_chunks()),
+        ]
+
+        archive = zipfile.ZipFile(
+            io.BytesIO(
+                b"".join(
+                    blob_archive.iter_zip_archive(["http://remote.test/1"])
+                )
+            )
+        )
+
+        self.assertEqual(archive.namelist(), ["1", "errors.txt"])
+        self.assertEqual(archive.read("1"), b"<a/><b/>")
+        self.assertEqual(
+            archive.read("errors.txt"),
+            b"http://remote.test/1: 1 is truncated: connection reset\n",
+        )
+
+    @patch.object(blob_archive, "BUFFER_MAX_SIZE", 2)
+    def test_large_blob_is_sent_while_it_streams_in(
+        self, mock_get_blob_response
+    ):
+        """test_large_blob_is_sent_while_it_streams_in"""
+        sent_chunks = []
+
+        def iter_chunks():
+            for _ in range(3):
+                chunk = bytes(range(256)) * 4096
+                sent_chunks.append(chunk)
+                yield chunk
+
+        mock_get_blob_response.side_effect = [
+            _get_blob_response(iter_chunks()),
+        ]
+
+        archive_chunks = blob_archive.iter_zip_archive(
+            ["http://remote.test/1"]
+        )
+        next(chunk for chunk in archive_chunks if chunk)
+
+        self.assertLess(len(sent_chunks), 3)
+        archive_chunks.close()
+
+    def test_entry_name_cannot_escape_archive(self, mock_get_blob_response):
+        """test_entry_name_cannot_escape_archive"""
+        name = blob_archive.get_entry_name(
+            "http://remote.test/1",
+            _get_blob_response(
+                [], {"Content-Disposition": 'filename="../../etc/passwd"'}
+            ),
+            set(),
+        )
+
+        self.assertEqual(name, "passwd")
+
+    def test_compressed_extension_is_stored(self, mock_get_blob_response):
+        """test_compressed_extension_is_stored"""
+        self.assertEqual(
+            blob_archive.get_compress_type("data.tar.GZ", ""),
+            zipfile.ZIP_STORED,
+        )
+
+    def test_zip_response_is_an_attachment(self, mock_get_blob_response):
+        """test_zip_response_is_an_attachment"""
+        mock_get_blob_response.return_value = _get_blob_response([b"blob"])
+
+        response = blob_archive.get_zip_response(
+            ["http://remote.test/1"], "blobs.zip"
+        )
+        archive = zipfile.ZipFile(
+            io.BytesIO(b"".join(response.streaming_content))
+        )
+
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="blobs.zip"'
+        )
+        self.assertEqual(archive.read("1"), b"blob")
+
+    def test_sink_is_writable(self, mock_get_blob_response):
+        """test_sink_is_writable"""
+        self.assertTrue(blob_archive._ZipSink().writable())
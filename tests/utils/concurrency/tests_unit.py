@@ -0,0 +1,125 @@
+"""Unit tests for `core_federated_search_app.utils.concurrency` package."""
+
+import threading
+import time
+from unittest import TestCase
+
+from core_federated_search_app.utils.concurrency import iter_as_completed
+
+
+class _ConcurrencyRecorder:
+    """Record the maximum number of concurrent calls, overall and per key."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self.running = {}
+        self.max_running = {}
+
+    def __call__(self, item):
+        """Run a task for the item."""
+        key, delay = item
+        with self._lock:
+            self.running[key] = self.running.get(key, 0) + 1
+            self.running[None] = self.running.get(None, 0) + 1
+            for counter in (key, None):
+                self.max_running[counter] = max(
+                    self.max_running.get(counter, 0), self.running[counter]
+                )
+        time.sleep(delay)
+        with self._lock:
+            self.running[key] -= 1
+            self.running[None] -= 1
+        return item
+
+
+class TestIterAsCompleted(TestCase):
+    """Unit tests for `iter_as_completed` function."""
+
+    def test_results_are_yielded_as_tasks_complete(self):
+        """test_results_are_yielded_as_tasks_complete"""
+        results = iter_as_completed(
+            lambda delay: time.sleep(delay) or delay, [0.2, 0.01], 2
+        )
+
+        self.assertEqual([result.item for result in results], [0.01, 0.2])
+
+    def test_exceptions_are_reported_per_item(self):
+        """test_exceptions_are_reported_per_item"""
+
+        def _fail_on_odd(item):
+            if item % 2:
+                raise ValueError(str(item))
+            return item
+
+        results = {
+            result.item: result
+            for result in iter_as_completed(_fail_on_odd, range(4), 2)
+        }
+
+        self.assertEqual(results[2].result, 2)
+        self.assertIsInstance(results[3].exception, ValueError)
+
+    def test_global_and_per_key_caps_are_honored(self):
+        """test_global_and_per_key_caps_are_honored"""
+        recorder = _ConcurrencyRecorder()
+        items = [("a", 0.02)] * 6 + [("b", 0.02)] * 6 + [("c", 0.02)] * 6
+
+        results = list(
+            iter_as_completed(
+                recorder,
+                items,
+                max_workers=4,
+                key=lambda item: item[0],
+                max_workers_per_key=2,
+            )
+        )
+
+        self.assertEqual(len(results), 18)
+        self.assertEqual(recorder.max_running[None], 4)
+        for key in ("a", "b", "c"):
+            self.assertLessEqual(recorder.max_running[key], 2)
+
+    def test_no_items_yields_nothing(self):
+        """test_no_items_yields_nothing"""
+        self.assertEqual(list(iter_as_completed(str, [], 2)), [])
+
+    def test_items_not_completed_in_time_are_timed_out(self):
+        """test_items_not_completed_in_time_are_timed_out"""
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def _task(item):
+            if item == "slow":
+                release.wait(5)
+            return item
+
+        start = time.monotonic()
+        results = {
+            result.item: result
+            for result in iter_as_completed(
+                _task, ["fast", "slow", "queued"], 2, timeout=0.2
+            )
+        }
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(results["fast"].result, "fast")
+        self.assertIsInstance(results["slow"].exception, TimeoutError)
+        self.assertIn("queued", results)
+
+    def test_closing_does_not_wait_for_running_tasks(self):
+        """test_closing_does_not_wait_for_running_tasks"""
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def _task(item):
+            if item == "slow":
+                release.wait(5)
+            return item
+
+        start = time.monotonic()
+        results = iter_as_completed(_task, ["fast", "slow"], 2)
+        self.assertEqual(next(results).item, "fast")
+        results.close()
+
+        self.assertLess(time.monotonic() - start, 2)
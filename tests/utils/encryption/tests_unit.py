@@ -0,0 +1,30 @@
+"""Unit tests for `core_federated_search_app.utils.encryption` package."""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from core_federated_search_app.utils import encryption
+
+
+class TestEncryption(TestCase):
+    """Unit tests for `encrypt` and `decrypt` functions."""
+
+    def test_encrypted_value_is_not_plain_text(self):
+        """test_encrypted_value_is_not_plain_text"""
+        self.assertNotIn("my_secret", encryption.encrypt("my_secret"))
+
+    def test_decrypt_returns_original_value(self):
+        """test_decrypt_returns_original_value"""
+        self.assertEqual(
+            encryption.decrypt(encryption.encrypt("my_secret")), "my_secret"
+        )
+
+    @patch.object(encryption, "logger")
+    def test_decrypt_with_other_key_returns_none(self, mock_logger):
+        """test_decrypt_with_other_key_returns_none"""
+        encrypted_value = encryption.encrypt("my_secret")
+
+        with patch.object(
+            encryption, "INSTANCE_CREDENTIALS_SECRET_KEY", "other_key"
+        ):
+            self.assertIsNone(encryption.decrypt(encrypted_value))
@@ -1,8 +1,12 @@
 """Unit tests for `utils.model_admin` package."""
 
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+from django.contrib import messages
+from django.contrib.admin import AdminSite
+
+from core_federated_search_app.components.instance.models import Instance
 from core_federated_search_app.utils import model_admin
 from core_federated_search_app.utils.forms import OAuth2ApplicationAdminForm
 
@@ -40,3 +44,49 @@ class TestOAuth2ApplicationAdmin(TestCase):
         self.assertEqual(
             mock_oauth2_application_admin.form, OAuth2ApplicationAdminForm
         )
+
+
+class TestInstanceAdmin(TestCase):
+    """Unit tests for `InstanceAdmin` model"""
+
+    def setUp(self):
+        """setUp"""
+        self.instance_admin = model_admin.InstanceAdmin(Instance, AdminSite())
+        self.instance = Instance(pk=1, name="one")
+
+    @patch.object(model_admin.instance_api, "get_circuit_state")
+    def test_circuit_state_is_returned(self, mock_get_circuit_state):
+        """test_circuit_state_is_returned"""
+        mock_get_circuit_state.return_value = "open"
+
+        self.assertEqual(
+            self.instance_admin.circuit_state(self.instance), "open"
+        )
+        mock_get_circuit_state.assert_called_with(self.instance)
+
+    @patch.object(model_admin.InstanceAdmin, "message_user")
+    @patch.object(model_admin.instance_api, "refresh_all_tokens")
+    def test_refresh_tokens_reports_each_result(
+        self, mock_refresh_all_tokens, mock_message_user
+    ):
+        """test_refresh_tokens_reports_each_result"""
+        mock_refresh_all_tokens.return_value = [
+            {"id": 1, "name": "one", "status": "success", "message": ""},
+            {"id": 2, "name": "two", "status": "error", "message": "down"},
+        ]
+        request = MagicMock()
+
+        self.instance_admin.refresh_tokens(request, [self.instance])
+
+        mock_refresh_all_tokens.assert_called_with([self.instance])
+        self.assertEqual(
+            [call.args for call in mock_message_user.call_args_list],
+            [
+                (request, "Token of one refreshed.", messages.SUCCESS),
+                (
+                    request,
+                    "Unable to refresh the token of two: down",
+                    messages.ERROR,
+                ),
+            ],
+        )
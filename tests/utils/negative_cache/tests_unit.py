@@ -0,0 +1,63 @@
+"""Unit tests for `core_federated_search_app.utils.negative_cache` package."""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from core_federated_search_app.utils import negative_cache
+from core_federated_search_app.utils.negative_cache import NegativeCache
+
+
+class TestNegativeCache(TestCase):
+    """Unit tests for `NegativeCache` class."""
+
+    def test_added_key_is_returned(self):
+        """test_added_key_is_returned"""
+        misses = NegativeCache(10, 30)
+
+        misses.add("key", 1, "message")
+
+        self.assertEqual(misses.get("key", 1), "message")
+
+    def test_unknown_key_returns_none(self):
+        """test_unknown_key_returns_none"""
+        self.assertIsNone(NegativeCache(10, 30).get("key", 1))
+
+    def test_key_added_at_another_version_returns_none(self):
+        """test_key_added_at_another_version_returns_none"""
+        misses = NegativeCache(10, 30)
+        misses.add("key", 1)
+
+        self.assertIsNone(misses.get("key", 2))
+        self.assertEqual(len(misses), 0)
+
+    @patch.object(negative_cache.time, "monotonic")
+    def test_expired_key_returns_none(self, mock_monotonic):
+        """test_expired_key_returns_none"""
+        misses = NegativeCache(10, 30)
+        mock_monotonic.return_value = 100
+        misses.add("key", 1)
+
+        mock_monotonic.return_value = 129
+        self.assertTrue(misses.get("key", 1))
+        mock_monotonic.return_value = 130
+        self.assertIsNone(misses.get("key", 1))
+
+    def test_least_recently_used_key_is_dropped(self):
+        """test_least_recently_used_key_is_dropped"""
+        misses = NegativeCache(2, 30)
+        misses.add("first", 1)
+        misses.add("second", 1)
+        misses.get("first", 1)
+
+        misses.add("third", 1)
+
+        self.assertTrue(misses.get("first", 1))
+        self.assertIsNone(misses.get("second", 1))
+        self.assertTrue(misses.get("third", 1))
+
+    def test_zero_ttl_disables_cache(self):
+        """test_zero_ttl_disables_cache"""
+        misses = NegativeCache(10, 0)
+        misses.add("key", 1)
+
+        self.assertIsNone(misses.get("key", 1))
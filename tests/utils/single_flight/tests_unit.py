@@ -0,0 +1,74 @@
+"""Unit tests for `core_federated_search_app.utils.single_flight` package."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from core_federated_search_app.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(TestCase):
+    """Unit tests for `SingleFlight` class."""
+
+    def setUp(self):
+        """setUp"""
+        self.single_flight = SingleFlight()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def _blocking_function(self, result):
+        """Function blocking until the test releases it."""
+        self.started.set()
+        self.release.wait(5)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _run_concurrently(self, function, count=3):
+        """Run `count` identical calls while the first one is in flight."""
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [
+                executor.submit(self.single_flight.do_shared, "key", function)
+            ]
+            self.started.wait(5)
+            futures += [
+                executor.submit(self.single_flight.do_shared, "key", function)
+                for _ in range(count - 1)
+            ]
+            while self.single_flight._calls["key"].waiters < count - 1:
+                self.release.wait(0.01)
+            self.release.set()
+        return futures
+
+    def test_do_returns_function_result(self):
+        """test_do_returns_function_result"""
+        self.assertEqual(self.single_flight.do("key", lambda: 42), 42)
+
+    def test_concurrent_calls_run_function_once(self):
+        """test_concurrent_calls_run_function_once"""
+        function = MagicMock(side_effect=lambda: self._blocking_function(42))
+
+        futures = self._run_concurrently(function)
+
+        function.assert_called_once()
+        self.assertEqual(
+            [future.result() for future in futures],
+            [(42, True), (42, True), (42, True)],
+        )
+
+    def test_concurrent_calls_share_exception(self):
+        """test_concurrent_calls_share_exception"""
+        futures = self._run_concurrently(
+            lambda: self._blocking_function(ValueError("mock_error"))
+        )
+
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result()
+
+    def test_key_is_released_after_call(self):
+        """test_key_is_released_after_call"""
+        self.single_flight.do("key", lambda: None)
+
+        self.assertFalse(self.single_flight.is_in_flight("key"))
@@ -0,0 +1,61 @@
+"""Unit tests for `core_federated_search_app.utils.trie` package."""
+
+from unittest import TestCase
+
+from core_federated_search_app.utils.trie import RadixTrie
+
+
+class TestRadixTrie(TestCase):
+    """Unit tests for `RadixTrie` class."""
+
+    def setUp(self):
+        """setUp"""
+        self.trie = RadixTrie(
+            [
+                ("https://host/", "root"),
+                ("https://host/cdcs1/", "cdcs1"),
+                ("https://host/cdcs2/", "cdcs2"),
+                ("https://host/cdcs1/sub/", "sub"),
+            ]
+        )
+
+    def test_len_returns_number_of_keys(self):
+        """test_len_returns_number_of_keys"""
+        self.assertEqual(len(self.trie), 4)
+
+    def test_insert_existing_key_replaces_value(self):
+        """test_insert_existing_key_replaces_value"""
+        self.trie.insert("https://host/cdcs1/", "new")
+
+        self.assertEqual(len(self.trie), 4)
+        self.assertEqual(
+            self.trie.longest_prefix_value("https://host/cdcs1/x"), "new"
+        )
+
+    def test_longest_prefix_value_returns_longest_match(self):
+        """test_longest_prefix_value_returns_longest_match"""
+        self.assertEqual(
+            self.trie.longest_prefix_value("https://host/cdcs1/sub/blob"),
+            "sub",
+        )
+        self.assertEqual(
+            self.trie.longest_prefix_value("https://host/cdcs2/blob"),
+            "cdcs2",
+        )
+        self.assertEqual(
+            self.trie.longest_prefix_value("https://host/cdcs3/blob"),
+            "root",
+        )
+
+    def test_longest_prefix_value_returns_default_if_no_match(self):
+        """test_longest_prefix_value_returns_default_if_no_match"""
+        self.assertEqual(
+            self.trie.longest_prefix_value("https://other/", "default"),
+            "default",
+        )
+
+    def test_partial_edge_match_returns_parent_value(self):
+        """test_partial_edge_match_returns_parent_value"""
+        self.assertEqual(
+            self.trie.longest_prefix_value("https://host/cdcs1/su"), "cdcs1"
+        )
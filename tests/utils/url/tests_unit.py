@@ -0,0 +1,51 @@
+"""Unit tests for `core_federated_search_app.utils.url` package."""
+
+from unittest import TestCase
+
+from core_federated_search_app.utils import url as url_utils
+
+
+class TestNormalizeUrl(TestCase):
+    """Unit tests for `normalize_url` function."""
+
+    def test_scheme_and_host_are_lowercased(self):
+        """test_scheme_and_host_are_lowercased"""
+        normalized_url = url_utils.normalize_url("HTTP://Example.COM/Path")
+
+        self.assertEqual(normalized_url.scheme, "http")
+        self.assertEqual(normalized_url.host, "example.com")
+        self.assertEqual(normalized_url.path, "/Path")
+
+    def test_default_port_is_explicit(self):
+        """test_default_port_is_explicit"""
+        self.assertEqual(
+            url_utils.normalize_url("https://example.com").port, 443
+        )
+
+    def test_path_slashes_are_collapsed(self):
+        """test_path_slashes_are_collapsed"""
+        self.assertEqual(
+            url_utils.normalize_url("http://example.com//a///b/").path,
+            "/a/b",
+        )
+
+    def test_query_string_is_ignored(self):
+        """test_query_string_is_ignored"""
+        self.assertEqual(
+            str(url_utils.normalize_url("http://evil/?x=http://known")),
+            "http://evil:80",
+        )
+
+
+class TestGetPathPrefixes(TestCase):
+    """Unit tests for `get_path_prefixes` function."""
+
+    def test_prefixes_are_segment_aligned(self):
+        """test_prefixes_are_segment_aligned"""
+        self.assertEqual(
+            url_utils.get_path_prefixes("/a/b"), ["", "/a", "/a/b"]
+        )
+
+    def test_empty_path_returns_root_prefix(self):
+        """test_empty_path_returns_root_prefix"""
+        self.assertEqual(url_utils.get_path_prefixes(""), [""])
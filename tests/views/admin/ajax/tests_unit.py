@@ -0,0 +1,56 @@
+"""Unit tests for `views.admin.ajax` package."""
+
+import json
+from unittest.mock import patch
+
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+from django.test import RequestFactory, SimpleTestCase
+
+from core_federated_search_app.components.instance.models import Instance
+from core_federated_search_app.views.admin import ajax as admin_ajax
+
+
+@patch.object(admin_ajax.instance_api, "refresh_all_tokens")
+@patch.object(admin_ajax.instance_api, "get_by_ids")
+class TestRefreshRepositories(SimpleTestCase):
+    """Unit tests for `refresh_repositories` view."""
+
+    def setUp(self):
+        """setUp"""
+        self.request = RequestFactory().post(
+            "/refresh-repositories", {"ids[]": ["1", "2"]}
+        )
+        self.request.user = create_mock_user("1", is_staff=True)
+        self.instance = Instance(pk=1, name="one")
+
+    def test_results_and_missing_ids_are_returned(
+        self, mock_get_by_ids, mock_refresh_all_tokens
+    ):
+        """test_results_and_missing_ids_are_returned"""
+        mock_get_by_ids.return_value = ({"1": self.instance}, ["2"])
+        results = [
+            {"id": 1, "name": "one", "status": "success", "message": ""}
+        ]
+        mock_refresh_all_tokens.return_value = results
+
+        response = admin_ajax.refresh_repositories(self.request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content),
+            {"results": results, "missing": ["2"]},
+        )
+        mock_get_by_ids.assert_called_with(["1", "2"])
+        mock_refresh_all_tokens.assert_called_with([self.instance])
+
+    def test_error_returns_bad_request(
+        self, mock_get_by_ids, mock_refresh_all_tokens
+    ):
+        """test_error_returns_bad_request"""
+        mock_get_by_ids.return_value = ({"1": self.instance}, [])
+        mock_refresh_all_tokens.side_effect = Exception("<error>")
+
+        response = admin_ajax.refresh_repositories(self.request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, b"&lt;error&gt;")